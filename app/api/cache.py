@@ -0,0 +1,95 @@
+"""
+Cache de respostas para rotas de leitura
+As respostas ficam guardadas já serializadas e são identificadas por um ETag derivado da
+rota, dos parâmetros e da versão das tags que elas dependem. Uma requisição com
+If-None-Match igual ao ETag atual recebe 304 sem tocar no banco.
+As versões das tags são contadores em memória (recomeçam a cada boot e variam entre
+instâncias), por isso o ETag também leva um id único deste processo.
+"""
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Sequence, Tuple
+from fastapi import Request, Response
+from app.core import invalidation
+from app.api.serialization import dumps
+
+BOOT_ID = uuid.uuid4().hex
+
+
+class ResponseCache:
+    """Cache LRU de respostas JSON com suporte a GET condicional"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}"
+
+    @staticmethod
+    def _etag(key: str, tags: Sequence[str]) -> str:
+        raw = f"{BOOT_ID}|{key}|{invalidation.versions(tags)}".encode()
+        return f'W/"{hashlib.sha1(raw).hexdigest()[:20]}"'
+
+    @staticmethod
+    def _matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+    async def respond(
+        self,
+        request: Request,
+        tags: Sequence[str],
+        build: Callable[[], Awaitable[Any]],
+        vary: str = ""
+    ) -> Response:
+        """Responde do cache, com 304, ou monta a resposta com `build` e guarda
+
+        `vary` entra na chave para respostas que dependem de algo além das tags (ex: a data)
+        """
+        key = f"{self._key(request)}#{vary}"
+        etag = self._etag(key, tags)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if self._matches(request, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] == etag:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return Response(content=cached[1], media_type="application/json", headers=headers)
+
+        self.misses += 1
+        body = dumps(await build())
+
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+response_cache = ResponseCache()
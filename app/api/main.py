@@ -1,12 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
 from app.core.database import init_db
-from app.api.routes import users, commands
+from app.core.startup import profiler
+from app.core import runtime
+from app.api.routes import users, commands, bot, live, moderation, timers, analytics, emotes, streams, points, maintenance as maintenance_routes
+from app.services.maintenance import maintenance
+from app.services.live_feed import live_feed
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+BOT_STOP_TIMEOUT = 15.0
+
 # Cria a aplicação FastAPI
 app = FastAPI(
     title="Twitch Bot API",
@@ -26,19 +34,41 @@ app.add_middleware(
 # Registra rotas
 app.include_router(users.router)
 app.include_router(commands.router)
+app.include_router(bot.router)
+app.include_router(maintenance_routes.router)
+app.include_router(live.router)
+app.include_router(moderation.router)
+app.include_router(timers.router)
+app.include_router(analytics.router)
+app.include_router(emotes.router)
+app.include_router(streams.router)
+app.include_router(points.router)
 
 @app.on_event("startup")
 async def startup_event():
     """Executado quando a API inicia"""
     logger.info("Iniciando API...")
+    live_feed.attach_loop(asyncio.get_running_loop())
     await init_db()
     logger.info("Banco de dados inicializado!")
+    await maintenance.start()
+    profiler.ready("api")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Executado quando a API é desligada"""
     logger.info("Encerrando API...")
+    await maintenance.stop()
+
+    # O bot roda em outra thread: pede para ele gravar o pendente e encerrar a análise do chat
+    supervisor = runtime.get_supervisor()
+    if supervisor is not None:
+        stopped = await asyncio.get_running_loop().run_in_executor(
+            None, supervisor.stop_threadsafe, BOT_STOP_TIMEOUT
+        )
+        if not stopped:
+            logger.warning(f"Bot não encerrou em {BOT_STOP_TIMEOUT:.0f}s")
 
 
 @app.get("/")
@@ -53,5 +83,17 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check"""
-    return {"status": "healthy"}
\ No newline at end of file
+    """Health check (API e conexão do bot)"""
+    supervisor = runtime.get_supervisor()
+    if supervisor is None:
+        return JSONResponse({"status": "unhealthy", "bot": None}, status_code=503)
+
+    bot = supervisor.health()
+    if bot["state"] == "connected":
+        status = "healthy"
+    elif bot["state"] == "stopped":
+        status = "unhealthy"
+    else:
+        status = "degraded"
+
+    return JSONResponse({"status": status, "bot": bot}, status_code=503 if status == "unhealthy" else 200)
\ No newline at end of file
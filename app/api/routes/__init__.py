@@ -1,3 +1,3 @@
-from app.api.routes import users, commands
+from app.api.routes import users, commands, bot, maintenance, live, moderation, timers, analytics, emotes, streams, points
 
-__all__ = ["users", "commands"]
\ No newline at end of file
+__all__ = ["users", "commands", "bot", "maintenance", "live", "moderation", "timers", "analytics", "emotes", "streams", "points"]
\ No newline at end of file
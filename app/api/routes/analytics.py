@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+from app.core.database import get_db
+from app.api.cache import response_cache
+from app.services.analytics import analytics
+from app.models import ChatAnalytics
+from datetime import datetime, timedelta
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/")
+async def get_analytics(
+    request: Request,
+    days: int = 7,
+    analyzer: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Contagens por dia de cada analisador (ex: idioma e sentimento das mensagens)"""
+    days = max(1, min(days, 90))
+
+    async def build():
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        query = select(ChatAnalytics.day, ChatAnalytics.analyzer, ChatAnalytics.label, ChatAnalytics.count).where(
+            ChatAnalytics.day >= since
+        )
+        if analyzer:
+            query = query.where(ChatAnalytics.analyzer == analyzer)
+
+        result = await db.execute(query.order_by(ChatAnalytics.day, ChatAnalytics.analyzer, ChatAnalytics.label))
+
+        report = {}
+        for day, name, label, count in result.all():
+            report.setdefault(day.isoformat(), {}).setdefault(name, {})[label] = count
+        return report
+
+    # A janela de dias anda na virada do dia mesmo sem novas escritas
+    today = datetime.utcnow().date().isoformat()
+    return await response_cache.respond(request, ["analytics"], build, vary=today)
+
+
+@router.get("/today")
+async def get_analytics_today():
+    """Totais do dia em memória (inclui lotes ainda não gravados)"""
+    return analytics.today()
+
+
+@router.get("/status")
+async def get_analytics_status():
+    """Estado do pool de análise"""
+    return analytics.stats()
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from app.core import runtime
+from app.services.shared_state import shared_state
+
+router = APIRouter(prefix="/bot", tags=["bot"])
+
+
+def get_running_bot():
+    """Retorna o bot ativo ou 503 se ele não estiver rodando"""
+    bot = runtime.get_bot()
+    if bot is None:
+        raise HTTPException(status_code=503, detail="Bot não está rodando")
+    return bot
+
+
+@router.get("/outbound")
+async def get_outbound_metrics():
+    """Retorna métricas da fila de mensagens de saída"""
+    bot = get_running_bot()
+    return bot.outbound.metrics()
+
+
+@router.get("/eventsub")
+async def get_eventsub_status():
+    """Estado da conexão EventSub e últimos raids recebidos"""
+    bot = get_running_bot()
+    if not bot.eventsub:
+        return {"enabled": False}
+    return {"enabled": True, **bot.eventsub.status(), "recent_raids": bot.user_events.raids[-10:]}
+
+
+@router.get("/cluster")
+async def get_cluster_status():
+    """Estado compartilhado: backend, liderança desta instância e invalidações trocadas"""
+    return shared_state.stats()
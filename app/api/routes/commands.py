@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
 from app.core.database import get_db
+from app.core import invalidation
+from app.api.cache import response_cache
+from app.api.serialization import rows_to_dicts
 from app.models import Command, CommandType, UserRole
 from pydantic import BaseModel
 from datetime import datetime
@@ -13,6 +16,7 @@ router = APIRouter(prefix="/commands", tags=["commands"])
 class CommandCreate(BaseModel):
     name: str
     response: str
+    aliases: Optional[str] = None
     description: Optional[str] = None
     min_role: UserRole = UserRole.VIEWER
     global_cooldown: int = 5
@@ -21,6 +25,7 @@ class CommandCreate(BaseModel):
 
 class CommandUpdate(BaseModel):
     response: Optional[str] = None
+    aliases: Optional[str] = None
     description: Optional[str] = None
     is_enabled: Optional[bool] = None
     min_role: Optional[UserRole] = None
@@ -31,6 +36,7 @@ class CommandUpdate(BaseModel):
 class CommandResponse(BaseModel):
     id: int
     name: str
+    aliases: Optional[str]
     response: Optional[str]
     command_type: str
     is_enabled: bool
@@ -44,20 +50,29 @@ class CommandResponse(BaseModel):
         from_attributes = True
 
 
+COMMAND_FIELDS = list(CommandResponse.model_fields)
+COMMAND_COLUMNS = [getattr(Command, field) for field in COMMAND_FIELDS]
+
+
 @router.get("/", response_model=List[CommandResponse])
 async def get_commands(
+    request: Request,
     enabled_only: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
     """Lista todos os comandos"""
-    query = select(Command)
+    async def build():
+        # Só as colunas da resposta, montadas direto em dicts
+        query = select(*COMMAND_COLUMNS)
+
+        if enabled_only:
+            query = query.where(Command.is_enabled == True)
 
-    if enabled_only:
-        query = query.where(Command.is_enabled == True)
+        result = await db.execute(query.order_by(Command.name))
+        return rows_to_dicts(COMMAND_FIELDS, result.all())
 
-    result = await db.execute(query.order_by(Command.name))
-    commands = result.scalars().all()
-    return commands
+    # usage_count/last_used mudam com "command_usage"; "commands" fica para mudanças de definição
+    return await response_cache.respond(request, ["commands", "command_usage"], build)
 
 
 @router.post("/", response_model=CommandResponse, status_code=201)
@@ -74,6 +89,7 @@ async def create_command(
 
     new_command = Command(
         name=command.name.lower(),
+        aliases=command.aliases,
         response=command.response,
         description=command.description,
         command_type=CommandType.CUSTOM,
@@ -85,6 +101,7 @@ async def create_command(
     db.add(new_command)
     await db.commit()
     await db.refresh(new_command)
+    invalidation.bump("commands")
 
     return new_command
 
@@ -129,6 +146,7 @@ async def update_command(
 
     await db.commit()
     await db.refresh(command)
+    invalidation.bump("commands")
 
     return command
 
@@ -149,5 +167,6 @@ async def delete_command(command_name: str, db: AsyncSession = Depends(get_db)):
 
     await db.delete(command)
     await db.commit()
+    invalidation.bump("commands")
 
     return {"message": f"Comando {command_name} deletado com sucesso"}
\ No newline at end of file
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from pydantic import BaseModel
+from typing import List
+from app.core.database import get_db
+from app.api.cache import response_cache
+from app.services.emote_stats import emote_stats
+from app.models import EmoteUsage
+from datetime import datetime, timedelta
+
+router = APIRouter(prefix="/emotes", tags=["emotes"])
+
+
+class EmoteCount(BaseModel):
+    emote_id: str
+    name: str
+    count: int
+
+
+def _as_response(top) -> List[EmoteCount]:
+    return [EmoteCount(emote_id=emote_id, name=name, count=count) for emote_id, name, count in top]
+
+
+@router.get("/top", response_model=List[EmoteCount])
+async def get_top_emotes(scope: str = "stream", limit: int = 10):
+    """Emotes mais usados na live atual (scope=stream) ou na última hora (scope=hour)"""
+    return _as_response(emote_stats.top(max(1, min(limit, 100)), scope))
+
+
+@router.get("/users/{username}", response_model=List[EmoteCount])
+async def get_user_emotes(username: str, limit: int = 10):
+    """Emotes mais usados por um usuário na live atual"""
+    return _as_response(emote_stats.user_top(username, max(1, min(limit, 100))))
+
+
+@router.get("/history", response_model=List[EmoteCount])
+async def get_emote_history(request: Request, days: int = 7, limit: int = 10, db: AsyncSession = Depends(get_db)):
+    """Emotes mais usados nos últimos dias (a partir dos totais diários gravados)"""
+    days = max(1, min(days, 365))
+    limit = max(1, min(limit, 100))
+
+    async def build():
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        total = func.sum(EmoteUsage.count)
+        result = await db.execute(
+            select(EmoteUsage.emote_id, func.max(EmoteUsage.emote_name), total)
+            .where(EmoteUsage.day >= since)
+            .group_by(EmoteUsage.emote_id)
+            .order_by(total.desc())
+            .limit(limit)
+        )
+        return [{"emote_id": emote_id, "name": name, "count": count} for emote_id, name, count in result.all()]
+
+    today = datetime.utcnow().date().isoformat()
+    return await response_cache.respond(request, ["emotes"], build, vary=today)
+
+
+@router.get("/status")
+async def get_emote_status():
+    """Contadores gerais das estatísticas de emotes"""
+    return emote_stats.stats()
@@ -0,0 +1,84 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.services.live_feed import live_feed, DROP_POLICIES, DROP_OLDEST
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+KEEPALIVE_SECONDS = 15
+MAX_BUFFER = 4096
+
+
+def _validate(buffer: int, policy: str):
+    if policy not in DROP_POLICIES:
+        raise HTTPException(status_code=400, detail=f"Política inválida. Use: {', '.join(DROP_POLICIES)}")
+    if not 1 <= buffer <= MAX_BUFFER:
+        raise HTTPException(status_code=400, detail=f"buffer deve estar entre 1 e {MAX_BUFFER}")
+
+
+@router.get("/events")
+async def live_events(request: Request, buffer: int = 256, policy: str = DROP_OLDEST):
+    """Feed ao vivo via Server-Sent Events (chat, comandos e estatísticas)"""
+    _validate(buffer, policy)
+    subscriber = live_feed.subscribe(buffer, policy)
+
+    async def stream():
+        try:
+            yield b": conectado\n\n"
+            while not subscriber.closed:
+                batch = await subscriber.next_batch(timeout=KEEPALIVE_SECONDS)
+                if await request.is_disconnected():
+                    break
+                if batch:
+                    yield b"".join(event.sse for event in batch)
+                else:
+                    yield b": keepalive\n\n"
+        finally:
+            live_feed.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def live_websocket(websocket: WebSocket, buffer: int = 256, policy: str = DROP_OLDEST):
+    """Feed ao vivo via WebSocket (mesmos eventos do SSE)"""
+    if policy not in DROP_POLICIES or not 1 <= buffer <= MAX_BUFFER:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscriber = live_feed.subscribe(buffer, policy)
+
+    async def watch_disconnect():
+        # O cliente não manda nada útil, mas só lendo a desconexão é percebida sem esperar um evento
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            live_feed.unsubscribe(subscriber)
+            subscriber.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while not subscriber.closed:
+            batch = await subscriber.next_batch(timeout=KEEPALIVE_SECONDS)
+            for event in batch:
+                await websocket.send_text(event.json)
+        if not watcher.done():
+            # Encerrado pela política "disconnect" (cliente lento)
+            await websocket.close(code=1013)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        watcher.cancel()
+        live_feed.unsubscribe(subscriber)
+
+
+@router.get("/stats")
+async def live_stats():
+    """Clientes conectados e eventos publicados/descartados"""
+    return live_feed.stats()
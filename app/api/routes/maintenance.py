@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+from app.services.maintenance import maintenance
+
+router = APIRouter(prefix="/maintenance", tags=["maintenance"])
+
+
+@router.get("/status")
+async def get_maintenance_status():
+    """Progresso da manutenção atual e resultado da última execução"""
+    return maintenance.status()
+
+
+@router.post("/run", status_code=202)
+async def run_maintenance():
+    """Dispara a manutenção imediatamente (roda em segundo plano)"""
+    if not maintenance.trigger():
+        raise HTTPException(status_code=409, detail="Manutenção já está em andamento")
+    return {"message": "Manutenção iniciada"}
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from app.core.database import get_db
+from app.core import invalidation, runtime
+from app.models import ModerationRule, RuleKind, ModerationAction
+from app.utils.regex import combinable_pattern_error
+from pydantic import BaseModel
+from datetime import datetime
+
+router = APIRouter(prefix="/moderation", tags=["moderation"])
+
+
+class RuleCreate(BaseModel):
+    kind: RuleKind
+    pattern: str = ""
+    action: ModerationAction = ModerationAction.DELETE
+    timeout_seconds: int = 60
+    reason: Optional[str] = None
+
+
+class RuleUpdate(BaseModel):
+    pattern: Optional[str] = None
+    action: Optional[ModerationAction] = None
+    timeout_seconds: Optional[int] = None
+    reason: Optional[str] = None
+    is_enabled: Optional[bool] = None
+
+
+class RuleResponse(BaseModel):
+    id: int
+    kind: str
+    pattern: str
+    action: str
+    timeout_seconds: int
+    reason: Optional[str]
+    is_enabled: bool
+
+    class Config:
+        from_attributes = True
+
+
+def _validate_pattern(kind: RuleKind, pattern: str):
+    if kind == RuleKind.PHRASE and not pattern.strip():
+        raise HTTPException(status_code=400, detail="Frase não pode ser vazia")
+    if kind in (RuleKind.REGEX, RuleKind.LINK) and pattern:
+        problem = combinable_pattern_error(pattern)
+        if problem:
+            raise HTTPException(status_code=400, detail=f"Regex recusada: {problem}")
+    if kind == RuleKind.REGEX and not pattern:
+        raise HTTPException(status_code=400, detail="Regex não pode ser vazia")
+
+
+@router.get("/rules", response_model=List[RuleResponse])
+async def get_rules(db: AsyncSession = Depends(get_db)):
+    """Lista as regras de moderação"""
+    result = await db.execute(select(ModerationRule).order_by(ModerationRule.id))
+    return result.scalars().all()
+
+
+@router.post("/rules", response_model=RuleResponse, status_code=201)
+async def create_rule(rule: RuleCreate, db: AsyncSession = Depends(get_db)):
+    """Cria uma regra de moderação"""
+    _validate_pattern(rule.kind, rule.pattern)
+
+    new_rule = ModerationRule(**rule.model_dump())
+    db.add(new_rule)
+    await db.commit()
+    await db.refresh(new_rule)
+    invalidation.bump("moderation")
+
+    return new_rule
+
+
+@router.patch("/rules/{rule_id}", response_model=RuleResponse)
+async def update_rule(rule_id: int, updates: RuleUpdate, db: AsyncSession = Depends(get_db)):
+    """Atualiza uma regra de moderação"""
+    rule = await db.get(ModerationRule, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Regra não encontrada")
+
+    update_data = updates.model_dump(exclude_unset=True)
+    if "pattern" in update_data:
+        _validate_pattern(rule.kind, update_data["pattern"])
+
+    for field, value in update_data.items():
+        setattr(rule, field, value)
+    rule.updated_at = datetime.utcnow()
+
+    await db.commit()
+    await db.refresh(rule)
+    invalidation.bump("moderation")
+
+    return rule
+
+
+@router.delete("/rules/{rule_id}")
+async def delete_rule(rule_id: int, db: AsyncSession = Depends(get_db)):
+    """Remove uma regra de moderação"""
+    rule = await db.get(ModerationRule, rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Regra não encontrada")
+
+    await db.delete(rule)
+    await db.commit()
+    invalidation.bump("moderation")
+
+    return {"message": f"Regra {rule_id} removida com sucesso"}
+
+
+@router.get("/stats")
+async def get_moderation_stats():
+    """Mensagens verificadas/bloqueadas e fila de ações"""
+    bot = runtime.get_bot()
+    if bot is None:
+        raise HTTPException(status_code=503, detail="Bot não está rodando")
+    return {"filter": bot.moderation.stats(), "actions": bot.moderation_actions.stats()}
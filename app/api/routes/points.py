@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.core.database import get_db
+from app.api.cache import response_cache
+from app.services.points import points
+from app.models import User, PointsLedger
+
+router = APIRouter(prefix="/points", tags=["points"])
+
+
+class PointsBalance(BaseModel):
+    username: str
+    display_name: Optional[str] = None
+    points: int
+
+
+class LedgerEntry(BaseModel):
+    delta: int
+    reason: str
+    counterpart: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/top", response_model=List[PointsBalance])
+async def get_top_points(request: Request, limit: int = 10, db: AsyncSession = Depends(get_db)):
+    """Maiores saldos (gravados no banco; o acúmulo em memória entra no próximo flush)"""
+    limit = max(1, min(limit, 100))
+
+    async def build():
+        result = await db.execute(
+            select(User.username, User.display_name, User.points)
+            .order_by(User.points.desc())
+            .limit(limit)
+        )
+        return [
+            {"username": username, "display_name": display_name, "points": value or 0}
+            for username, display_name, value in result.all()
+        ]
+
+    return await response_cache.respond(request, ["points"], build)
+
+
+@router.get("/status")
+async def get_points_status():
+    """Contadores do sistema de pontos (cache, pendências, apostas e transferências)"""
+    return points.stats()
+
+
+@router.get("/{username}", response_model=PointsBalance)
+async def get_user_points(username: str, db: AsyncSession = Depends(get_db)):
+    """Saldo de um usuário, incluindo o que ainda não foi gravado"""
+    result = await db.execute(
+        select(User.username, User.display_name, User.points).where(User.username == username.lower())
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    name, display_name, stored = row
+    return {"username": name, "display_name": display_name, "points": (stored or 0) + points.pending_for(name)}
+
+
+@router.get("/{username}/ledger", response_model=List[LedgerEntry])
+async def get_user_ledger(username: str, limit: int = 20, db: AsyncSession = Depends(get_db)):
+    """Extrato recente de um usuário (lançamentos já gravados)"""
+    result = await db.execute(
+        select(PointsLedger)
+        .where(PointsLedger.username == username.lower())
+        .order_by(PointsLedger.id.desc())
+        .limit(max(1, min(limit, 200)))
+    )
+    return result.scalars().all()
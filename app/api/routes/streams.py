@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from app.core.database import get_db
+from app.api.cache import response_cache
+from app.services.streams import stream_tracker
+from app.models import StreamSession
+from datetime import datetime
+
+router = APIRouter(prefix="/streams", tags=["streams"])
+
+
+class StreamSessionResponse(BaseModel):
+    id: int
+    twitch_stream_id: Optional[str]
+    title: Optional[str]
+    game_name: Optional[str]
+    started_at: datetime
+    ended_at: Optional[datetime]
+    duration_seconds: int
+    peak_viewers: int
+    message_count: int
+    command_count: int
+    unique_chatters: int
+    new_chatters: int
+    emote_count: int
+    top_chatters: Optional[List[Dict[str, Any]]]
+    top_emotes: Optional[List[Dict[str, Any]]]
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/", response_model=List[StreamSessionResponse])
+async def get_streams(request: Request, skip: int = 0, limit: int = 20, db: AsyncSession = Depends(get_db)):
+    """Lista as lives (mais recentes primeiro) com o snapshot de cada uma"""
+    limit = max(1, min(limit, 100))
+
+    async def build():
+        result = await db.execute(
+            select(StreamSession).order_by(StreamSession.started_at.desc()).offset(skip).limit(limit)
+        )
+        return [StreamSessionResponse.model_validate(row) for row in result.scalars().all()]
+
+    return await response_cache.respond(request, ["streams"], build)
+
+
+@router.get("/current")
+async def get_current_stream():
+    """Agregados da live em andamento, direto da memória do bot"""
+    current = stream_tracker.current()
+    if current is None:
+        raise HTTPException(status_code=404, detail="O canal não está ao vivo")
+    return current
+
+
+@router.get("/{session_id}", response_model=StreamSessionResponse)
+async def get_stream(session_id: int, db: AsyncSession = Depends(get_db)):
+    """Relatório de uma live"""
+    row = await db.get(StreamSession, session_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Live não encontrada")
+    return row
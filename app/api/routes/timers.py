@@ -0,0 +1,152 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import get_db
+from app.core import invalidation, runtime
+from app.models import ScheduledMessage
+from pydantic import BaseModel
+from datetime import datetime
+
+router = APIRouter(prefix="/timers", tags=["timers"])
+
+MIN_INTERVAL_SECONDS = 60
+MAX_MESSAGE_LENGTH = 500
+
+
+class TimerCreate(BaseModel):
+    name: str
+    message: str
+    channel: Optional[str] = None
+    interval_seconds: int = 900
+    min_chat_messages: int = 0
+
+
+class TimerUpdate(BaseModel):
+    message: Optional[str] = None
+    channel: Optional[str] = None
+    interval_seconds: Optional[int] = None
+    min_chat_messages: Optional[int] = None
+    is_enabled: Optional[bool] = None
+
+
+class TimerResponse(BaseModel):
+    id: int
+    name: str
+    message: str
+    channel: Optional[str]
+    interval_seconds: int
+    min_chat_messages: int
+    is_enabled: bool
+    send_count: int
+    last_sent: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+def _joined_channels() -> set:
+    """Canais em que o bot está (ou entra ao conectar)"""
+    channels = {settings.twitch_channel.lower().lstrip("#")}
+    bot = runtime.get_bot()
+    if bot is not None:
+        channels.update(channel.name.lower() for channel in list(bot.connected_channels))
+    return channels
+
+
+def _validate(data: dict):
+    if "message" in data and not (0 < len(data["message"].strip()) <= MAX_MESSAGE_LENGTH):
+        raise HTTPException(status_code=400, detail=f"Mensagem deve ter entre 1 e {MAX_MESSAGE_LENGTH} caracteres")
+    if data.get("interval_seconds") is not None and data["interval_seconds"] < MIN_INTERVAL_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Intervalo mínimo é de {MIN_INTERVAL_SECONDS} segundos")
+    if data.get("min_chat_messages") is not None and data["min_chat_messages"] < 0:
+        raise HTTPException(status_code=400, detail="Mínimo de mensagens não pode ser negativo")
+    if data.get("channel"):
+        data["channel"] = data["channel"].lower().lstrip("#")
+        if data["channel"] not in _joined_channels():
+            raise HTTPException(status_code=400, detail=f"Bot não está no canal #{data['channel']}")
+
+
+async def _get_timer(db: AsyncSession, name: str) -> ScheduledMessage:
+    result = await db.execute(select(ScheduledMessage).where(ScheduledMessage.name == name.lower()))
+    timer = result.scalar_one_or_none()
+    if not timer:
+        raise HTTPException(status_code=404, detail="Timer não encontrado")
+    return timer
+
+
+@router.get("/", response_model=List[TimerResponse])
+async def get_timers(enabled_only: bool = False, db: AsyncSession = Depends(get_db)):
+    """Lista as mensagens temporizadas"""
+    query = select(ScheduledMessage)
+    if enabled_only:
+        query = query.where(ScheduledMessage.is_enabled == True)
+
+    result = await db.execute(query.order_by(ScheduledMessage.name))
+    return result.scalars().all()
+
+
+@router.get("/status")
+async def get_timers_status():
+    """Estado da agenda no bot (próximos envios, enviados e pulados)"""
+    bot = runtime.get_bot()
+    if bot is None:
+        raise HTTPException(status_code=503, detail="Bot não está rodando")
+    return bot.timers.stats()
+
+
+@router.post("/", response_model=TimerResponse, status_code=201)
+async def create_timer(timer: TimerCreate, db: AsyncSession = Depends(get_db)):
+    """Cria uma mensagem temporizada"""
+    data = timer.model_dump()
+    _validate(data)
+    data["name"] = data["name"].lower()
+
+    existing = await db.execute(select(ScheduledMessage).where(ScheduledMessage.name == data["name"]))
+    if existing.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="Timer já existe")
+
+    new_timer = ScheduledMessage(**data)
+    db.add(new_timer)
+    await db.commit()
+    await db.refresh(new_timer)
+    invalidation.bump("timers")
+
+    return new_timer
+
+
+@router.get("/{timer_name}", response_model=TimerResponse)
+async def get_timer(timer_name: str, db: AsyncSession = Depends(get_db)):
+    """Busca uma mensagem temporizada"""
+    return await _get_timer(db, timer_name)
+
+
+@router.patch("/{timer_name}", response_model=TimerResponse)
+async def update_timer(timer_name: str, updates: TimerUpdate, db: AsyncSession = Depends(get_db)):
+    """Atualiza uma mensagem temporizada"""
+    timer = await _get_timer(db, timer_name)
+
+    update_data = updates.model_dump(exclude_unset=True)
+    _validate(update_data)
+    for field, value in update_data.items():
+        setattr(timer, field, value)
+    timer.updated_at = datetime.utcnow()
+
+    await db.commit()
+    await db.refresh(timer)
+    invalidation.bump("timers")
+
+    return timer
+
+
+@router.delete("/{timer_name}")
+async def delete_timer(timer_name: str, db: AsyncSession = Depends(get_db)):
+    """Remove uma mensagem temporizada"""
+    timer = await _get_timer(db, timer_name)
+
+    await db.delete(timer)
+    await db.commit()
+    invalidation.bump("timers")
+
+    return {"message": f"Timer {timer_name} removido com sucesso"}
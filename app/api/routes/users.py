@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List
 from app.core.database import get_db
 from app.models import User
+from app.services.leaderboard import leaderboards
+from app.api.cache import response_cache
+from app.api.serialization import FastJSONResponse, rows_to_dicts
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -28,6 +31,10 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+USER_FIELDS = list(UserResponse.model_fields)
+USER_COLUMNS = [getattr(User, field) for field in USER_FIELDS]
+
+
 class UserStatsResponse(BaseModel):
     total_users: int
     total_messages: int
@@ -42,19 +49,25 @@ async def get_users(
     db: AsyncSession = Depends(get_db)
 ):
     """Lista todos os usuários"""
+    # Só as colunas da resposta, sem instanciar models nem validar com Pydantic
     result = await db.execute(
-        select(User)
+        select(*USER_COLUMNS)
         .order_by(User.last_seen.desc())
         .offset(skip)
         .limit(limit)
     )
-    users = result.scalars().all()
-    return users
+    return FastJSONResponse(rows_to_dicts(USER_FIELDS, result.all()))
 
 
 @router.get("/stats", response_model=UserStatsResponse)
-async def get_user_stats(db: AsyncSession = Depends(get_db)):
+async def get_user_stats(request: Request, db: AsyncSession = Depends(get_db)):
     """Retorna estatísticas gerais dos usuários"""
+    # active_today muda na virada do dia mesmo sem novas escritas
+    today = datetime.utcnow().date().isoformat()
+    return await response_cache.respond(request, ["users"], lambda: _build_user_stats(db), vary=today)
+
+
+async def _build_user_stats(db: AsyncSession):
     total_users = await db.scalar(select(func.count(User.id)))
     total_messages = await db.scalar(select(func.sum(User.message_count))) or 0
     total_commands = await db.scalar(select(func.sum(User.command_count))) or 0
@@ -89,12 +102,48 @@ async def get_user(username: str, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/top/chatters", response_model=List[UserResponse])
-async def get_top_chatters(limit: int = 10, db: AsyncSession = Depends(get_db)):
+async def get_top_chatters(request: Request, limit: int = 10, db: AsyncSession = Depends(get_db)):
     """Retorna os usuários mais ativos no chat"""
+    async def build():
+        users = await _top_chatters(limit, db)
+        return [UserResponse.model_validate(user) for user in users]
+
+    return await response_cache.respond(request, ["users"], build)
+
+
+async def _top_chatters(limit: int, db: AsyncSession):
+    if leaderboards.loaded:
+        # Ranking em memória: busca só as linhas do top, sem ordenar a tabela inteira
+        ids = [twitch_id for twitch_id, _, _ in leaderboards.messages.top(limit)]
+        result = await db.execute(select(User).where(User.twitch_id.in_(ids)))
+        by_id = {user.twitch_id: user for user in result.scalars().all()}
+        return [by_id[twitch_id] for twitch_id in ids if twitch_id in by_id]
+
     result = await db.execute(
         select(User)
         .order_by(User.message_count.desc())
         .limit(limit)
     )
     users = result.scalars().all()
-    return users
\ No newline at end of file
+    return users
+
+
+class RankResponse(BaseModel):
+    twitch_id: str
+    username: str
+    rank: int
+    value: int
+
+
+@router.get("/top/{board}", response_model=List[RankResponse])
+async def get_leaderboard(board: str, limit: int = 10):
+    """Ranking em memória por mensagens ou comandos"""
+    if board not in ("messages", "commands"):
+        raise HTTPException(status_code=404, detail="Ranking não encontrado")
+    if not leaderboards.loaded:
+        raise HTTPException(status_code=503, detail="Rankings ainda não carregados")
+
+    return [
+        {"twitch_id": twitch_id, "username": username, "rank": position, "value": value}
+        for position, (twitch_id, username, value) in enumerate(leaderboards.board(board).top(limit), start=1)
+    ]
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Serialização JSON rápida para rotas de listagem
+Usa orjson quando disponível (com fallback para o json da biblioteca padrão) e trabalha
+com dicts montados direto das colunas, sem passar pela validação do Pydantic.
+"""
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterable, List, Sequence
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    """Serializa para JSON (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def rows_to_dicts(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[dict]:
+    """Converte linhas de um select de colunas em dicts"""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """Resposta JSON serializada com orjson"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
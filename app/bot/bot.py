@@ -1,51 +1,437 @@
 from twitchio.ext import commands
-from typing import Optional, Dict, Callable
-from datetime import datetime, timedelta
+from typing import Any, Optional, Dict, Callable
+from datetime import datetime
 from app.core.config import settings
 from app.services.twitch_api import twitch_api
-from app.models import User, UserRole, Command, CommandType
+from app.services.eventsub import EventSubClient, UserEventWriter
+from app.services.leaderboard import leaderboards
+from app.services.live_feed import live_feed
+from app.services.analytics import analytics
+from app.services.emote_stats import emote_stats
+from app.services.streams import stream_tracker
+from app.services.shared_state import shared_state
+from app.services.points import points
+from app.models import User, UserRole, Command, CommandType, UserArchive
 from app.core.database import AsyncSessionLocal
-from sqlalchemy import select
+from app.core import runtime, invalidation
+from app.core.startup import profiler
+from app.bot.outbound import OutboundQueue
+from app.bot.presence import PresenceTracker
+from app.bot.moderation import ModerationEngine, ModerationActionQueue
+from app.bot.resolver import CommandResolver, Resolution
+from app.bot.timers import TimerScheduler
+from app.bot.permissions import PermissionEngine, RoleState, ROLE_LABEL, ROLE_RANK
+from sqlalchemy import select, update, bindparam
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+DENIAL_NOTICE_SECONDS = 30     # Janela mínima entre avisos de "comando só para ..." ao mesmo usuário
+
 
 class TwitchBot(commands.Bot):
     """Bot principal da Twitch com sistema de comandos"""
 
-    def __init__(self):
+    # Estado que sobrevive a uma reconexão (o supervisor recria o bot a cada queda).
+    # Cooldowns e liderança ficam no estado compartilhado (app.services.shared_state)
+    WARM_FIELDS = (
+        "broadcaster_id", "resolver", "moderation", "moderation_actions", "presence",
+        "user_events", "eventsub", "_command_usage", "permissions", "outbound",
+    )
+
+    def __init__(self, warm: Optional[Dict[str, Any]] = None):
         super().__init__(
             token=settings.twitch_bot_token,
             prefix=settings.command_prefix,
             initial_channels=[settings.twitch_channel]
         )
 
-        self.global_cooldowns: Dict[str, datetime] = {}
-        self.user_cooldowns: Dict[str, Dict[str, datetime]] = {}
         self.broadcaster_id: Optional[str] = None
         self.custom_command_handlers: Dict[str, Callable] = {}
+        # Cargo mínimo dos comandos nativos que ainda não têm linha no banco
+        self.builtin_roles: Dict[str, UserRole] = {}
+        self.permissions = PermissionEngine(settings.twitch_channel)
+        self.resolver = CommandResolver(settings.command_prefix)
+        self._command_usage: Dict[str, int] = {}
+        self.outbound = OutboundQueue(self._send_raw, is_moderator=settings.bot_is_moderator)
+        self.presence = PresenceTracker(idle_timeout=settings.watch_idle_timeout)
+        self.timers = TimerScheduler(self._send_timer, settings.twitch_channel)
+        self.moderation = ModerationEngine()
+        self.moderation_actions = ModerationActionQueue()
+        self._presence_task: Optional[asyncio.Task] = None
+        self.user_events = UserEventWriter()
+        self._stats_delta: Dict[str, int] = {"messages": 0, "commands": 0, "new_users": 0}
+        self._live_stats_task: Optional[asyncio.Task] = None
+        # Mensagens alteram users o tempo todo: o bump da tag sai uma vez por ciclo do _live_stats_loop
+        self._users_dirty = False
+        self.eventsub: Optional[EventSubClient] = None
+        self.supervisor = None
+
+        if warm:
+            self._adopt(warm)
+
+        if shared_state.elector:
+            shared_state.elector.on_change = self._on_leadership
+        runtime.set_bot(self)
+
+    def _adopt(self, warm: Dict[str, Any]):
+        """Reaproveita o estado aquecido de um bot anterior"""
+        for name in self.WARM_FIELDS:
+            if warm.get(name) is not None:
+                setattr(self, name, warm[name])
+        # Respostas pendentes seguem na fila e saem pela conexão nova
+        self.outbound.bind(self._send_raw)
+
+    async def prewarm(self):
+        """Carrega caches antes de conectar, para o bot já responder no event_ready"""
+        if not self.broadcaster_id:
+            user_data = await twitch_api.get_user(settings.twitch_channel)
+            if user_data:
+                self.broadcaster_id = user_data['id']
+                logger.info(f'Broadcaster ID: {self.broadcaster_id}')
+
+        if self.resolver.version != invalidation.version("commands"):
+            await self.resolver.refresh(self.builtin_defaults())
+        if settings.moderation_enabled and self.moderation.version != invalidation.version("moderation"):
+            try:
+                await self.moderation.reload()
+            except Exception as e:
+                logger.error(f"Erro ao carregar regras de moderação: {e}")
+        if not leaderboards.loaded:
+            await leaderboards.rebuild()
+
+    async def shutdown(self) -> Dict[str, Any]:
+        """Para as tarefas ligadas a esta conexão, grava o que está pendente e devolve o estado aquecido"""
+        for task in (self._presence_task, self._live_stats_task):
+            if task:
+                task.cancel()
+        await self.outbound.stop()
+        await self.timers.stop()
+
+        if self._users_dirty:
+            invalidation.bump("users")
+        self.presence.tick()
+        for flush in (self.presence.flush, self.flush_command_usage, self.timers.flush, points.flush):
+            try:
+                await flush()
+            except Exception as e:
+                logger.warning(f"Erro ao gravar pendências do bot: {e}")
+
+        # O pool de análise sobrevive às reconexões, mas não ao bot: sem isso os processos
+        # continuam vivos depois que o loop do bot termina
+        if self.supervisor is None or self.supervisor.stopping:
+            try:
+                await analytics.stop()
+            except Exception as e:
+                logger.warning(f"Erro ao encerrar a análise do chat: {e}")
+
+        return {name: getattr(self, name) for name in self.WARM_FIELDS}
 
     async def event_ready(self):
         """Evento quando o bot conecta"""
         logger.info(f'Bot conectado como | {self.nick}')
         logger.info(f'User ID: {self.user_id}')
 
-        user_data = await twitch_api.get_user(settings.twitch_channel)
-        if user_data:
-            self.broadcaster_id = user_data['id']
-            logger.info(f'Broadcaster ID: {self.broadcaster_id}')
+        if self.supervisor:
+            self.supervisor.mark_connected()
+
+        await self.outbound.start()
+        if self.resolver.version != invalidation.version("commands"):
+            await self.resolver.refresh(self.builtin_defaults())
+        await self.timers.start()
+        if settings.analytics_enabled:
+            await analytics.start(
+                settings.analyzers_list,
+                workers=settings.analytics_workers,
+                batch_size=settings.analytics_batch_size,
+                batch_interval=settings.analytics_batch_interval
+            )
+
+        if not leaderboards.loaded:
+            await leaderboards.rebuild()
+
+        if not self._presence_task or self._presence_task.done():
+            self._presence_task = asyncio.create_task(self._presence_loop())
+        if not self._live_stats_task or self._live_stats_task.done():
+            self._live_stats_task = asyncio.create_task(self._live_stats_loop())
+        profiler.ready("bot")
+
+        if not self.broadcaster_id:
+            user_data = await twitch_api.get_user(settings.twitch_channel)
+            if user_data:
+                self.broadcaster_id = user_data['id']
+                logger.info(f'Broadcaster ID: {self.broadcaster_id}')
+
+        if settings.moderation_enabled and self.broadcaster_id:
+            if self.moderation.version != invalidation.version("moderation"):
+                try:
+                    await self.moderation.reload()
+                except Exception as e:
+                    # Segue sem as regras; refresh_if_stale tenta de novo depois
+                    logger.error(f"Erro ao carregar regras de moderação: {e}")
+            await self.moderation_actions.start(self.broadcaster_id)
+
+        if self.is_leader:
+            await self._start_leader_services()
+        else:
+            logger.info("🪑 Instância em espera: outra instância é a líder e responde no chat")
+
+    @property
+    def is_leader(self) -> bool:
+        """Só a instância líder responde no chat e processa eventos"""
+        return shared_state.is_leader
+
+    async def _start_leader_services(self):
+        """Serviços que só podem rodar em uma instância por vez"""
+        await stream_tracker.start(settings.twitch_channel)
+        if settings.eventsub_enabled and self.broadcaster_id and not self.eventsub:
+            await self.user_events.start()
+            self.eventsub = EventSubClient(self.broadcaster_id, self._handle_eventsub)
+            await self.eventsub.start()
+
+    async def _stop_leader_services(self):
+        await stream_tracker.release()
+        if self.eventsub:
+            await self.eventsub.stop()
+            self.eventsub = None
+            await self.user_events.stop()
+        # Presença e pontos acumulados como líder são gravados agora; a nova líder começa do zero
+        self.presence.tick()
+        await self.presence.flush()
+        self.presence.clear()
+        await points.release()
+
+    async def _on_leadership(self, leader: bool):
+        """Chamado pelo eleitor quando esta instância ganha ou perde a liderança"""
+        try:
+            if leader:
+                # Em espera os rankings não recebem as mensagens: recarrega antes de assumir
+                await leaderboards.rebuild()
+                await self._start_leader_services()
+            else:
+                await self._stop_leader_services()
+        except Exception as e:
+            logger.error(f"Erro ao trocar os serviços da liderança: {e}")
+
+    async def _handle_eventsub(self, sub_type: str, event: Dict[str, Any]):
+        """Distribui os eventos do EventSub (usuários e início/fim da live)"""
+        if sub_type.startswith("stream."):
+            await stream_tracker.handle_event(sub_type, event)
+        else:
+            await self.user_events.handle(sub_type, event)
+
+    async def event_reconnect(self):
+        """Evento quando a Twitch pede reconexão (o twitchio reconecta sozinho)"""
+        if self.supervisor:
+            self.supervisor.mark_disconnected("RECONNECT da Twitch")
+
+    async def event_userstate(self, user):
+        """Evento com o estado do bot no canal (usado para ajustar o limite de envio)"""
+        is_broadcaster = user.name.lower() == settings.twitch_channel.lower()
+        self.outbound.set_moderator(settings.bot_is_moderator or user.is_mod or is_broadcaster)
+
+    async def event_join(self, channel, user):
+        """Evento quando um usuário entra no chat"""
+        if user.name and user.name.lower() != self.nick.lower() and self.is_leader:
+            self.presence.join(user.name)
+
+    async def event_part(self, user):
+        """Evento quando um usuário sai do chat"""
+        if user.name and self.is_leader:
+            self.presence.part(user.name)
+
+    async def _presence_loop(self):
+        """Credita o tempo assistido periodicamente, em lote"""
+        while True:
+            await asyncio.sleep(settings.watch_flush_interval)
+            # Cada etapa isolada: uma falha no banco não derruba a tarefa nem as outras etapas
+            if settings.points_enabled:
+                try:
+                    points.accrue(self.presence.accrual(), settings.points_per_minute, settings.points_per_message)
+                    await points.flush()
+                except Exception as e:
+                    logger.error(f"Erro no acúmulo de pontos: {e}")
+            try:
+                self.presence.tick()
+                if await self.presence.flush():
+                    invalidation.bump("users")
+            except Exception as e:
+                logger.error(f"Erro ao gravar tempo assistido: {e}")
+            for flush in (self.flush_command_usage, self.timers.flush, emote_stats.flush):
+                try:
+                    await flush()
+                except Exception as e:
+                    logger.warning(f"Erro ao gravar pendências do bot: {e}")
+            # Em espera, os rankings acompanham o que a líder grava (no máximo uma vez por ciclo)
+            if not self.is_leader and leaderboards.version != invalidation.version("users"):
+                try:
+                    await leaderboards.rebuild()
+                except Exception as e:
+                    logger.error(f"Erro ao recarregar os rankings: {e}")
+
+    async def _live_stats_loop(self):
+        """Publica no feed ao vivo os contadores acumulados e invalida users (no máximo a cada 2s)"""
+        while True:
+            await asyncio.sleep(2)
+            if self._users_dirty:
+                self._users_dirty = False
+                invalidation.bump("users")
+            if any(self._stats_delta.values()):
+                delta, self._stats_delta = self._stats_delta, dict.fromkeys(self._stats_delta, 0)
+                live_feed.publish("stats", delta)
+
+    async def global_before_invoke(self, ctx):
+        """Executado antes de qualquer comando"""
+        self._publish_command(ctx.command.name, ctx.author.name, ctx.channel.name)
+
+    def _publish_command(self, command: str, user: str, channel: str):
+        live_feed.publish("command", {
+            "command": command,
+            "user": user,
+            "channel": channel,
+        })
 
     async def event_message(self, message):
         """Evento quando uma mensagem é enviada no chat"""
         if message.echo:
             return
 
-        await self.update_user_stats(message)
-        await self.handle_commands(message)
+        if self.supervisor:
+            self.supervisor.message_seen()
+        # Instâncias em espera só mantêm a conexão; a líder conta, grava e responde
+        if not self.is_leader:
+            return
+
+        self.presence.activity(message.author.name)
+        self.timers.activity(message.channel.name)
+        self._stats_delta["messages"] += 1
+
+        # Cargo calculado uma vez por mensagem (badges do IRC, com cache por usuário)
+        role = self.permissions.for_message(message)
+
+        if self._is_moderated(message, role):
+            # Mensagem barrada conta como mensagem, mas o comando nunca rodou
+            await self.update_user_stats(message, role, count_command=False)
+            return
+
+        # Só depois da moderação: mensagens barradas não aparecem no feed
+        live_feed.publish("chat", {
+            "user": message.author.name,
+            "display_name": message.author.display_name,
+            "channel": message.channel.name,
+            "content": message.content,
+        })
+
+        analytics.submit(message.content)
+        stream_tracker.record_message(message.author.name, message.content.startswith(settings.command_prefix))
+        emote_stats.record(message.author.name, (message.tags or {}).get("emotes"), message.content)
+        if settings.points_enabled:
+            points.record_message(message.author.name)
+        await self.update_user_stats(message, role)
+        await self.dispatch_command(message, role)
+
+    def builtin_defaults(self) -> Dict[str, UserRole]:
+        """Cargo mínimo padrão de cada comando nativo registrado"""
+        return {name: self.builtin_roles.get(name, UserRole.VIEWER) for name in self.commands}
+
+    def require_role(self, command_name: str, min_role: UserRole):
+        """Define o cargo mínimo padrão de um comando nativo (o valor do banco tem prioridade)"""
+        self.builtin_roles[command_name] = min_role
+
+    async def dispatch_command(self, message, role: Optional[RoleState] = None):
+        """Resolve o comando pela trie e executa (nativo via twitchio, customizado via resposta do banco)"""
+        if self.resolver.version != invalidation.version("commands"):
+            await self.resolver.refresh(self.builtin_defaults())
+
+        resolution = self.resolver.resolve(message.content)
+        if not resolution:
+            return
+
+        entry = resolution.entry
+        role = role or self.permissions.for_message(message)
+        if not role.allows(entry.min_role):
+            # Só avisa uma vez por janela (comandos restritos costumam ter cooldown 0)
+            notice_window = max(entry.user_cooldown, DENIAL_NOTICE_SECONDS)
+            if await self.check_cooldown(f"{entry.name}:negado", str(message.author.id), 0, notice_window):
+                self.outbound.enqueue(
+                    message.channel.name,
+                    f"este comando é só para {ROLE_LABEL[entry.min_role]}!",
+                    mention=message.author.name
+                )
+            return
+
+        if not await self.check_cooldown(entry.name, str(message.author.id), entry.global_cooldown, entry.user_cooldown):
+            return
+
+        self._command_usage[entry.name] = self._command_usage.get(entry.name, 0) + 1
+
+        if entry.name in self.custom_command_handlers:
+            self._publish_command(entry.name, message.author.name, message.channel.name)
+            await self.custom_command_handlers[entry.name](message, resolution.args)
+        elif entry.name in self.commands:
+            # Reescreve a mensagem com o nome canônico para o parser do twitchio
+            # (o evento do feed sai no global_before_invoke)
+            message.content = f"{settings.command_prefix}{entry.name} {resolution.args}".rstrip()
+            await self.handle_commands(message)
+        elif entry.response:
+            self._publish_command(entry.name, message.author.name, message.channel.name)
+            self.send_custom_response(message, resolution)
+
+    def send_custom_response(self, message, resolution: Resolution):
+        """Responde um comando customizado (aceita {user} e {args} na resposta)"""
+        text = resolution.entry.response.replace("{user}", message.author.name).replace("{args}", resolution.args)
+        self.outbound.enqueue(message.channel.name, text)
+
+    async def flush_command_usage(self):
+        """Grava o uso acumulado dos comandos em um único UPDATE em lote"""
+        if not self._command_usage:
+            return
+
+        batch, self._command_usage = self._command_usage, {}
+        stmt = (
+            update(Command.__table__)
+            .where(Command.__table__.c.name == bindparam("b_name"))
+            .values(
+                usage_count=Command.__table__.c.usage_count + bindparam("b_count"),
+                last_used=datetime.utcnow()
+            )
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt, [{"b_name": name, "b_count": count} for name, count in batch.items()])
+                await session.commit()
+        except Exception as e:
+            # Devolve o lote para a próxima tentativa
+            for name, count in batch.items():
+                self._command_usage[name] = self._command_usage.get(name, 0) + count
+            logger.error(f"Erro ao gravar uso dos comandos: {e}")
+            return
+        # Não é "commands": uso não muda o roteamento e não deve recarregar os resolvers
+        invalidation.bump("command_usage")
+
+    def _is_moderated(self, message, role: RoleState) -> bool:
+        """Passa a mensagem pelo filtro; retorna True se ela foi barrada"""
+        if not settings.moderation_enabled or not self.moderation_actions.broadcaster_id:
+            return False
+        if role.rank >= ROLE_RANK[UserRole.MODERATOR]:
+            return False
+
+        verdict = self.moderation.check(str(message.author.id), message.content)
+        if not verdict:
+            return False
+
+        self.moderation_actions.enqueue(verdict, str(message.author.id), message.id)
+        logger.info(f"🛡️  Mensagem de {message.author.name} barrada: {verdict.reason}")
+        return True
+
+    async def update_user_stats(self, message, role: Optional[RoleState] = None, count_command: bool = True):
+        """Atualiza estatísticas do usuário no banco (count_command=False para mensagens moderadas)"""
+        role = role or self.permissions.for_message(message)
+        is_command = count_command and message.content.startswith(settings.command_prefix)
+        if is_command:
+            self._stats_delta["commands"] += 1
 
-    async def update_user_stats(self, message):
-        """Atualiza estatísticas do usuário no banco"""
         async with AsyncSessionLocal() as session:
             result = await session.execute(
                 select(User).where(User.twitch_id == str(message.author.id))
@@ -57,32 +443,32 @@ class TwitchBot(commands.Bot):
                     twitch_id=str(message.author.id),
                     username=message.author.name,
                     display_name=message.author.display_name or message.author.name,
-                    is_subscriber=message.author.is_subscriber,
-                    is_moderator=message.author.is_mod,
-                    is_broadcaster=message.author.name.lower() == settings.twitch_channel.lower()
                 )
+                self._apply_role(user, role)
 
-                if user.is_broadcaster:
-                    user.role = UserRole.BROADCASTER
-                elif user.is_moderator:
-                    user.role = UserRole.MODERATOR
-                elif message.author.is_subscriber:
-                    user.role = UserRole.SUBSCRIBER
-                else:
-                    user.role = UserRole.VIEWER
+                await self._restore_archived_user(session, user)
+                self._stats_delta["new_users"] += 1
+                stream_tracker.record_new_chatter()
+                user.message_count = (user.message_count or 0) + 1
+                user.command_count = (user.command_count or 0) + (1 if is_command else 0)
 
-                if self.broadcaster_id:
+                # Follows e subs chegam pelo EventSub; tipo sem inscrição ativa consulta a Helix
+                follows_live = self.eventsub is not None and self.eventsub.is_active("channel.follow")
+                subs_live = self.eventsub is not None and self.eventsub.is_active("channel.subscribe")
+                if self.broadcaster_id and not (follows_live and subs_live):
                     try:
-                        follower_info = await twitch_api.get_follower_info(
-                            self.broadcaster_id,
-                            str(message.author.id)
-                        )
+                        follower_info = None
+                        if not follows_live:
+                            follower_info = await twitch_api.get_follower_info(
+                                self.broadcaster_id,
+                                str(message.author.id)
+                            )
                         if follower_info:
                             user.followed_at = datetime.fromisoformat(
                                 follower_info.get('followed_at').replace('Z', '+00:00')
                             ).replace(tzinfo=None)
 
-                        if message.author.is_subscriber:
+                        if role.is_subscriber and not subs_live:
                             sub_info = await twitch_api.get_subscriber_info(
                                 self.broadcaster_id,
                                 str(message.author.id)
@@ -96,11 +482,44 @@ class TwitchBot(commands.Bot):
             else:
                 user.last_seen = datetime.utcnow()
                 user.message_count += 1
-                user.is_subscriber = message.author.is_subscriber
-                user.is_moderator = message.author.is_mod
+                if is_command:
+                    user.command_count += 1
+                self._apply_role(user, role)
 
             await session.commit()
 
+        leaderboards.record(user.twitch_id, user.username, user.message_count, user.command_count)
+        self._users_dirty = True
+
+    @staticmethod
+    def _apply_role(user: User, role: RoleState):
+        """Mantém cargo e flags do usuário em dia com as badges da última mensagem"""
+        user.role = role.role
+        user.is_subscriber = role.is_subscriber
+        user.is_vip = role.is_vip
+        user.is_moderator = role.is_moderator
+        user.is_broadcaster = role.is_broadcaster
+
+    async def _restore_archived_user(self, session, user: User):
+        """Recupera os contadores de um usuário que havia sido arquivado por inatividade"""
+        result = await session.execute(
+            select(UserArchive).where(UserArchive.twitch_id == user.twitch_id)
+        )
+        archive = result.scalar_one_or_none()
+        if not archive:
+            return
+
+        user.message_count = archive.message_count
+        user.command_count = archive.command_count
+        user.watch_seconds = archive.watch_seconds or (archive.watch_hours or 0) * 3600
+        user.watch_hours = user.watch_seconds // 3600
+        user.points = archive.points or 0
+        user.first_seen = archive.first_seen
+        user.followed_at = archive.followed_at
+        user.subscribed_at = archive.subscribed_at
+        user.subscription_tier = archive.subscription_tier
+        await session.delete(archive)
+
     async def get_user_from_db(self, twitch_id: str) -> Optional[User]:
         """Busca usuário no banco de dados"""
         async with AsyncSessionLocal() as session:
@@ -120,27 +539,32 @@ class TwitchBot(commands.Bot):
             )
             return result.scalar_one_or_none()
 
-    def check_cooldown(self, command_name: str, user_id: str, global_cd: int, user_cd: int) -> bool:
-        """Verifica se o comando está em cooldown"""
-        now = datetime.utcnow()
-
-        if command_name in self.global_cooldowns:
-            if now < self.global_cooldowns[command_name]:
-                return False
-
-        if user_id in self.user_cooldowns:
-            if command_name in self.user_cooldowns[user_id]:
-                if now < self.user_cooldowns[user_id][command_name]:
-                    return False
+    async def check_cooldown(self, command_name: str, user_id: str, global_cd: int, user_cd: int) -> bool:
+        """Verifica e inicia os cooldowns do comando (compartilhados entre instâncias)"""
+        return await shared_state.acquire_cooldown(command_name, user_id, global_cd, user_cd)
 
-        self.global_cooldowns[command_name] = now + timedelta(seconds=global_cd)
+    def register_command_handler(self, command_name: str, handler: Callable):
+        """Registra um handler customizado para um comando"""
+        self.custom_command_handlers[command_name] = handler
 
-        if user_id not in self.user_cooldowns:
-            self.user_cooldowns[user_id] = {}
-        self.user_cooldowns[user_id][command_name] = now + timedelta(seconds=user_cd)
+    def send_reply(self, ctx, text: str, mention: bool = False) -> bool:
+        """Enfileira uma resposta no canal do contexto, mencionando o autor se pedido"""
+        return self.outbound.enqueue(
+            ctx.channel.name,
+            text,
+            mention=ctx.author.name if mention else None
+        )
 
-        return True
+    def _send_timer(self, channel_name: str, text: str) -> bool:
+        """Envio das mensagens programadas (só a líder envia)"""
+        if not self.is_leader:
+            return False
+        return self.outbound.enqueue(channel_name, text)
 
-    def register_command_handler(self, command_name: str, handler: Callable):
-        """Registra um handler customizado para um comando"""
-        self.custom_command_handlers[command_name] = handler
\ No newline at end of file
+    async def _send_raw(self, channel_name: str, text: str):
+        """Envia uma mensagem diretamente ao canal (usado pela fila de saída)"""
+        channel = self.get_channel(channel_name)
+        if not channel:
+            logger.warning(f"Canal #{channel_name} não encontrado para envio")
+            return
+        await channel.send(text)
\ No newline at end of file
@@ -1,5 +1,10 @@
 from twitchio.ext import commands
 from app.services.twitch_api import twitch_api
+from app.services.leaderboard import leaderboards
+from app.services.emote_stats import emote_stats
+from app.services.streams import stream_tracker
+from app.services.points import points, PointsError
+from app.core.config import settings
 from app.models import UserRole
 from datetime import datetime
 import logging
@@ -16,7 +21,7 @@ def register_commands(bot):
         user = await bot.get_user_from_db(str(ctx.author.id))
 
         if not user:
-            await ctx.send(f"@{ctx.author.name}, não encontrei suas informações!")
+            bot.send_reply(ctx, "não encontrei suas informações!", mention=True)
             return
 
         # Calcula tempo seguindo
@@ -34,13 +39,9 @@ def register_commands(bot):
             meses = delta.days // 30
             tempo_sub = f"{meses} meses (Tier {user.subscription_tier or '1'})"
 
-        # Calcula horas assistidas aproximadas
-        if user.first_seen and user.last_seen:
-            delta_tempo = user.last_seen - user.first_seen
-            horas_totais = int(delta_tempo.total_seconds() / 3600)
-            horas_assistidas = max(1, int(horas_totais * 0.3))
-        else:
-            horas_assistidas = 0
+        # Horas assistidas: valor gravado mais a sessão em memória
+        segundos = bot.presence.watch_seconds(user.username, user.watch_seconds)
+        horas_assistidas = round(segundos / 3600, 1)
 
         # Status
         status = []
@@ -55,11 +56,12 @@ def register_commands(bot):
 
         status_str = " | ".join(status) if status else "Viewer"
 
-        await ctx.send(
+        bot.send_reply(
+            ctx,
             f"@{ctx.author.name} | ({status_str}) | "
             f"Segue há: {tempo_seguindo} | "
             f"Sub: {tempo_sub} | "
-            f"~{horas_assistidas}h assistidas"
+            f"{horas_assistidas}h assistidas"
         )
 
 
@@ -67,43 +69,39 @@ def register_commands(bot):
     async def titulo_command(ctx: commands.Context):
         """Mostra o título atual da live"""
         if not bot.broadcaster_id:
-            await ctx.send("Erro ao buscar informações do canal!")
+            bot.send_reply(ctx, "Erro ao buscar informações do canal!")
             return
 
         channel_info = await twitch_api.get_channel_info(bot.broadcaster_id)
 
         if channel_info:
             titulo = channel_info.get('title', 'Sem título')
-            await ctx.send(f"Título atual: {titulo}")
+            bot.send_reply(ctx, f"Título atual: {titulo}")
         else:
-            await ctx.send("Não foi possível buscar o título!")
+            bot.send_reply(ctx, "Não foi possível buscar o título!")
 
 
     @bot.command(name='jogo')
     async def jogo_command(ctx: commands.Context):
         """Mostra o jogo/categoria atual"""
         if not bot.broadcaster_id:
-            await ctx.send("Erro ao buscar informações do canal!")
+            bot.send_reply(ctx, "Erro ao buscar informações do canal!")
             return
 
         channel_info = await twitch_api.get_channel_info(bot.broadcaster_id)
 
         if channel_info:
             jogo = channel_info.get('game_name', 'Nenhum jogo definido')
-            await ctx.send(f"Jogando: {jogo}")
+            bot.send_reply(ctx, f"Jogando: {jogo}")
         else:
-            await ctx.send("Não foi possível buscar o jogo!")
+            bot.send_reply(ctx, "Não foi possível buscar o jogo!")
 
 
     @bot.command(name='settitulo')
     async def set_titulo_command(ctx: commands.Context, *, novo_titulo: str):
         """[MOD] Altera o título da live"""
-        if not (ctx.author.is_mod or ctx.author.name.lower() == bot._initial_channels[0].lower()):
-            await ctx.send(f"@{ctx.author.name}, você precisa ser moderador para usar este comando!")
-            return
-
         if not bot.broadcaster_id:
-            await ctx.send("Erro ao identificar o canal!")
+            bot.send_reply(ctx, "Erro ao identificar o canal!")
             return
 
         success = await twitch_api.update_channel_info(
@@ -112,24 +110,20 @@ def register_commands(bot):
         )
 
         if success:
-            await ctx.send(f"Título alterado para: {novo_titulo}")
+            bot.send_reply(ctx, f"Título alterado para: {novo_titulo}")
             logger.info(f"Título alterado por {ctx.author.name}: {novo_titulo}")
         else:
-            await ctx.send("Erro ao alterar o título!")
+            bot.send_reply(ctx, "Erro ao alterar o título!")
 
 
     @bot.command(name='setjogo')
     async def set_jogo_command(ctx: commands.Context, *, nome_jogo: str):
         """[MOD] Altera o jogo/categoria da live"""
-        if not (ctx.author.is_mod or ctx.author.name.lower() == bot._initial_channels[0].lower()):
-            await ctx.send(f"@{ctx.author.name}, você precisa ser moderador para usar este comando!")
-            return
-
         if not bot.broadcaster_id:
-            await ctx.send("Erro ao identificar o canal!")
+            bot.send_reply(ctx, "Erro ao identificar o canal!")
             return
 
-        await ctx.send(f"Para alterar o jogo, use o painel da Twitch por enquanto. Feature em desenvolvimento!")
+        bot.send_reply(ctx, "Para alterar o jogo, use o painel da Twitch por enquanto. Feature em desenvolvimento!")
 
 
     @bot.command(name='comandos')
@@ -139,9 +133,19 @@ def register_commands(bot):
             "!perfil - Mostra suas informações",
             "!titulo - Título atual da live",
             "!jogo - Jogo/categoria atual",
+            "!rank - Sua posição no ranking",
+            "!top - Quem mais conversa no chat",
+            "!topemotes [@usuário] - Emotes mais usados na live",
             "!comandos - Lista de comandos"
         ]
 
+        if settings.points_enabled:
+            comandos_basicos[-1:-1] = [
+                "!pontos [@usuário] - Saldo de pontos",
+                "!apostar <quantia|tudo> - Dobro ou nada",
+                "!dar @usuário <quantia> - Dá pontos a alguém",
+            ]
+
         comandos_mod = [
             "!settitulo <texto> - Altera o título",
             "!setjogo <nome> - Altera o jogo"
@@ -149,19 +153,20 @@ def register_commands(bot):
 
         msg = "📋 Comandos disponíveis: " + " | ".join(comandos_basicos)
 
-        if ctx.author.is_mod or ctx.author.name.lower() == bot._initial_channels[0].lower():
+        if bot.permissions.for_message(ctx.message).allows(UserRole.MODERATOR):
             msg += " | MOD: " + " | ".join(comandos_mod)
 
-        await ctx.send(msg)
+        bot.send_reply(ctx, msg)
 
 
     @bot.command(name='uptime')
     async def uptime_command(ctx: commands.Context):
         """Mostra há quanto tempo a live está online"""
-        stream = await twitch_api.get_stream(bot._initial_channels[0])
+        # Usa a consulta em cache do acompanhamento da live (não vai à Helix a cada uso)
+        stream = await stream_tracker.get_stream()
 
         if not stream:
-            await ctx.send("O canal não está ao vivo no momento!")
+            bot.send_reply(ctx, "O canal não está ao vivo no momento!", mention=True)
             return
 
         started_at = datetime.fromisoformat(stream['started_at'].replace('Z', '+00:00'))
@@ -170,7 +175,135 @@ def register_commands(bot):
         horas = uptime.seconds // 3600
         minutos = (uptime.seconds % 3600) // 60
 
-        await ctx.send(f"Live online há: {horas}h {minutos}min | Viewers: {stream.get('viewer_count', 0)}")
+        bot.send_reply(ctx, f"Live online há: {horas}h {minutos}min | Viewers: {stream.get('viewer_count', 0)}", mention=True)
+
+
+    @bot.command(name='rank')
+    async def rank_command(ctx: commands.Context):
+        """Mostra a posição do usuário nos rankings de mensagens e comandos"""
+        mensagens = leaderboards.messages.rank(str(ctx.author.id))
+        comandos = leaderboards.commands.rank(str(ctx.author.id))
+
+        if not mensagens:
+            bot.send_reply(ctx, "você ainda não está no ranking!", mention=True)
+            return
+
+        texto = f"#{mensagens[0]} em mensagens ({mensagens[1]})"
+        if comandos:
+            texto += f" | #{comandos[0]} em comandos ({comandos[1]})"
+        bot.send_reply(ctx, texto, mention=True)
+
+
+    @bot.command(name='top')
+    async def top_command(ctx: commands.Context):
+        """Mostra os usuários que mais mandaram mensagens"""
+        top = leaderboards.messages.top(5)
+
+        if not top:
+            bot.send_reply(ctx, "Ainda não há ninguém no ranking!")
+            return
+
+        ranking = " | ".join(
+            f"{posicao}. {username} ({total})"
+            for posicao, (_, username, total) in enumerate(top, start=1)
+        )
+        bot.send_reply(ctx, f"🏆 Top chatters: {ranking}")
+
+
+    @bot.command(name='topemotes')
+    async def topemotes_command(ctx: commands.Context, usuario: str = None):
+        """Mostra os emotes mais usados na live (geral ou de um usuário)"""
+        if usuario:
+            nome = usuario.lstrip("@").lower()
+            top = emote_stats.user_top(nome, 5)
+            titulo = f"😀 Emotes de {nome}"
+        else:
+            top = emote_stats.top(5)
+            titulo = "😀 Top emotes da live"
+
+        if not top:
+            bot.send_reply(ctx, "Nenhum emote contado ainda!", mention=True)
+            return
+
+        ranking = " | ".join(
+            f"{posicao}. {nome_emote} ({total})"
+            for posicao, (_, nome_emote, total) in enumerate(top, start=1)
+        )
+        bot.send_reply(ctx, f"{titulo}: {ranking}")
+
+
+    if settings.points_enabled:
+        register_points_commands(bot)
+
+    # Cargo mínimo verificado no despacho (vale também se o comando não tiver linha no banco)
+    bot.require_role('settitulo', UserRole.MODERATOR)
+    bot.require_role('setjogo', UserRole.MODERATOR)
+
+    logger.info("Comandos built-in registrados!")
+
+
+def register_points_commands(bot):
+    """Comandos dos pontos de fidelidade
+
+    Depois do `points.load`, checagem e alteração do saldo acontecem sem await no meio
+    """
+
+    @bot.command(name='pontos')
+    async def pontos_command(ctx: commands.Context, usuario: str = None):
+        """Mostra o saldo de pontos (seu ou de outro usuário)"""
+        nome = (usuario or ctx.author.name).lstrip("@").lower()
+        await points.load(nome)
+        saldo = points.balance(nome)
+
+        if saldo is None:
+            bot.send_reply(ctx, f"não encontrei {nome}!" if usuario else "você ainda não tem pontos!", mention=True)
+        elif usuario:
+            bot.send_reply(ctx, f"💰 {nome} tem {saldo} pontos")
+        else:
+            bot.send_reply(ctx, f"você tem {saldo} pontos 💰", mention=True)
+
+
+    @bot.command(name='apostar')
+    async def apostar_command(ctx: commands.Context, quantia: str = None):
+        """Aposta pontos: dobro ou nada"""
+        nome = ctx.author.name.lower()
+        await points.load(nome)
 
+        if quantia and quantia.lower() in ("tudo", "all"):
+            valor = points.balance(nome) or 0
+        elif quantia and quantia.isdigit():
+            valor = int(quantia)
+        else:
+            bot.send_reply(ctx, "use !apostar <quantia|tudo>", mention=True)
+            return
+
+        try:
+            ganhou, saldo = points.bet(nome, valor, settings.points_min_bet)
+        except PointsError as e:
+            bot.send_reply(ctx, str(e), mention=True)
+            return
+
+        if ganhou:
+            bot.send_reply(ctx, f"🎉 ganhou {valor} pontos! Saldo: {saldo}", mention=True)
+        else:
+            bot.send_reply(ctx, f"💸 perdeu {valor} pontos. Saldo: {saldo}", mention=True)
+
+
+    @bot.command(name='dar')
+    async def dar_command(ctx: commands.Context, usuario: str = None, quantia: str = None):
+        """Transfere pontos para outro usuário"""
+        if not usuario or not quantia or not quantia.isdigit():
+            bot.send_reply(ctx, "use !dar @usuário <quantia>", mention=True)
+            return
+
+        origem = ctx.author.name.lower()
+        destino = usuario.lstrip("@").lower()
+        await points.load(origem, destino)
+
+        try:
+            saldo = points.transfer(origem, destino, int(quantia))
+        except PointsError as e:
+            bot.send_reply(ctx, str(e), mention=True)
+            return
 
-    logger.info("Comandos built-in registrados!")
\ No newline at end of file
+        bot.send_reply(ctx, f"você deu {quantia} pontos para {destino}! Saldo: {saldo}", mention=True)
@@ -0,0 +1,333 @@
+"""
+Filtro de moderação do chat
+As regras são compiladas uma vez: frases proibidas viram um autômato Aho-Corasick e regex/links
+viram uma única expressão combinada, então cada mensagem é verificada em uma passada.
+Heurísticas de CAPS e repetição usam estado por usuário com tamanho limitado.
+As ações (apagar/timeout) passam por uma fila com limite de taxa.
+"""
+import re
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import ModerationRule, RuleKind, ModerationAction
+from app.services.twitch_api import twitch_api
+from app.bot.outbound import SlidingWindowLimiter
+from app.utils.text import normalize
+from app.utils.regex import combinable_pattern_error
+
+logger = logging.getLogger(__name__)
+
+LINK_PATTERN = r"(?:https?://|www\.)\S+|\b[a-z0-9-]+\.(?:com|net|org|tv|gg|io|br|ly|me|xyz)(?:/\S*)?\b"
+MAX_TRACKED_USERS = 5000
+ACTIONS_PER_WINDOW = 20
+ACTION_WINDOW_SECONDS = 10
+CAPS_TIMEOUT_REASON = "Excesso de letras maiúsculas"
+REPEAT_TIMEOUT_SECONDS = 60
+RELOAD_RETRY_SECONDS = 30
+
+
+@dataclass
+class Verdict:
+    action: ModerationAction
+    reason: str
+    timeout_seconds: int = 0
+    rule_id: Optional[int] = None
+
+
+class AhoCorasick:
+    """Autômato para buscar várias frases de uma vez em O(tamanho do texto)"""
+
+    def __init__(self, phrases: List[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Optional[int]] = [None]
+
+        for phrase, value in phrases:
+            if phrase:
+                self._add(phrase, value)
+        self._build()
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def _add(self, phrase: str, value: int):
+        node = 0
+        for char in phrase:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+            node = nxt
+        if self._out[node] is None:
+            self._out[node] = value
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Herda a saída do estado de falha (frase que é sufixo de outra)
+                if self._out[child] is None:
+                    self._out[child] = self._out[self._fail[child]]
+
+    def search(self, text: str) -> Optional[int]:
+        """Retorna o valor da primeira frase encontrada, ou None"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node] is not None:
+                return out[node]
+        return None
+
+
+class _CompiledRules:
+    def __init__(self, rules: List[ModerationRule]):
+        self.rules: Dict[int, ModerationRule] = {rule.id: rule for rule in rules}
+        self.phrases = AhoCorasick([
+            (normalize(rule.pattern), rule.id) for rule in rules if rule.kind == RuleKind.PHRASE
+        ])
+
+        alternatives = []
+        for rule in rules:
+            if rule.kind == RuleKind.LINK:
+                pattern = rule.pattern or LINK_PATTERN
+            elif rule.kind == RuleKind.REGEX:
+                pattern = rule.pattern
+            else:
+                continue
+            problem = combinable_pattern_error(pattern)
+            if problem:
+                logger.warning(f"Regra {rule.id} ignorada: {problem}")
+                continue
+            alternatives.append((rule.id, f"(?P<r{rule.id}>{pattern})"))
+        self.regex = self._combine(alternatives)
+
+    @staticmethod
+    def _combine(alternatives: List[Tuple[int, str]]) -> Optional["re.Pattern"]:
+        """Compila a expressão combinada; se falhar, descarta as regras que a quebram, uma a uma"""
+        if not alternatives:
+            return None
+        try:
+            return re.compile("|".join(alt for _, alt in alternatives), re.IGNORECASE)
+        except re.error:
+            pass
+
+        accepted: List[str] = []
+        for rule_id, alt in alternatives:
+            try:
+                re.compile("|".join(accepted + [alt]), re.IGNORECASE)
+            except re.error as e:
+                logger.warning(f"Regra {rule_id} ignorada, quebra a regex combinada: {e}")
+                continue
+            accepted.append(alt)
+        return re.compile("|".join(accepted), re.IGNORECASE) if accepted else None
+
+    def match(self, normalized: str) -> Optional[ModerationRule]:
+        if self.phrases:
+            rule_id = self.phrases.search(normalized)
+            if rule_id is not None:
+                return self.rules[rule_id]
+        if self.regex:
+            found = self.regex.search(normalized)
+            if found:
+                return self.rules[int(found.lastgroup[1:])]
+        return None
+
+
+class ModerationEngine:
+    """Etapa de moderação executada para cada mensagem"""
+
+    def __init__(self):
+        self._compiled = _CompiledRules([])
+        self.version = -1
+        self._reloading = False
+        self._retry_at = 0.0
+
+        # Estado por usuário: (hash da última mensagem, repetições, horário)
+        self._recent: "OrderedDict[str, Tuple[int, int, float]]" = OrderedDict()
+
+        self.checked = 0
+        self.flagged = 0
+
+    async def reload(self):
+        """Recompila as regras a partir do banco"""
+        version = invalidation.version("moderation")
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(ModerationRule).where(ModerationRule.is_enabled == True))
+            rules = result.scalars().all()
+
+        self._compiled = _CompiledRules(rules)
+        self.version = version
+        logger.info(f"🛡️  {len(rules)} regras de moderação compiladas")
+
+    async def _reload_in_background(self):
+        try:
+            await self.reload()
+        except Exception as e:
+            # Mantém as regras atuais e só tenta de novo depois de um intervalo
+            self._retry_at = time.monotonic() + RELOAD_RETRY_SECONDS
+            logger.error(f"Erro ao recarregar regras de moderação: {e}")
+        finally:
+            self._reloading = False
+
+    def refresh_if_stale(self):
+        """Agenda a recompilação se as regras mudaram (as regras antigas valem até lá)"""
+        if self._reloading or self.version == invalidation.version("moderation"):
+            return
+        if time.monotonic() < self._retry_at:
+            return
+        self._reloading = True
+        asyncio.create_task(self._reload_in_background())
+
+    def check(self, user_id: str, content: str) -> Optional[Verdict]:
+        """Verifica uma mensagem; retorna a ação a tomar ou None"""
+        self.checked += 1
+        self.refresh_if_stale()
+        normalized = normalize(content)
+
+        rule = self._compiled.match(normalized)
+        if rule:
+            self.flagged += 1
+            return Verdict(
+                action=rule.action,
+                reason=rule.reason or "Mensagem bloqueada pelo filtro",
+                timeout_seconds=rule.timeout_seconds or 0,
+                rule_id=rule.id
+            )
+
+        verdict = self._check_repetition(user_id, normalized) or self._check_caps(content)
+        if verdict:
+            self.flagged += 1
+        return verdict
+
+    def _check_caps(self, content: str) -> Optional[Verdict]:
+        letters = sum(1 for c in content if c.isalpha())
+        if letters < settings.moderation_caps_min_length:
+            return None
+        upper = sum(1 for c in content if c.isupper())
+        if upper / letters >= settings.moderation_caps_ratio:
+            return Verdict(ModerationAction.DELETE, CAPS_TIMEOUT_REASON)
+        return None
+
+    def _check_repetition(self, user_id: str, normalized: str) -> Optional[Verdict]:
+        now = time.monotonic()
+        digest = hash(normalized)
+        previous = self._recent.pop(user_id, None)
+
+        count = 1
+        if previous and previous[0] == digest and now - previous[2] <= settings.moderation_repeat_window:
+            count = previous[1] + 1
+
+        self._recent[user_id] = (digest, count, now)
+        if len(self._recent) > MAX_TRACKED_USERS:
+            self._recent.popitem(last=False)
+
+        if count >= settings.moderation_repeat_limit:
+            return Verdict(ModerationAction.TIMEOUT, "Mensagem repetida (spam)", REPEAT_TIMEOUT_SECONDS)
+        return None
+
+    def stats(self) -> Dict:
+        return {
+            "rules": len(self._compiled.rules),
+            "version": self.version,
+            "checked": self.checked,
+            "flagged": self.flagged,
+            "tracked_users": len(self._recent),
+        }
+
+
+class ModerationActionQueue:
+    """Executa as ações de moderação respeitando o limite de requisições"""
+
+    def __init__(self):
+        self._queue: Deque[Tuple[Verdict, str, str]] = deque()
+        self._limiter = SlidingWindowLimiter(ACTIONS_PER_WINDOW, ACTION_WINDOW_SECONDS)
+        self._timed_out: Dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.broadcaster_id: Optional[str] = None
+
+        self.executed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def enqueue(self, verdict: Verdict, user_id: str, message_id: str):
+        # Usuário já em timeout: as mensagens seguintes já somem junto
+        until = self._timed_out.get(user_id)
+        if until and until > time.monotonic():
+            self.skipped += 1
+            return
+        if verdict.action == ModerationAction.TIMEOUT:
+            self._timed_out[user_id] = time.monotonic() + verdict.timeout_seconds
+
+        self._queue.append((verdict, user_id, message_id))
+        self._wakeup.set()
+
+    async def start(self, broadcaster_id: str):
+        self.broadcaster_id = broadcaster_id
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = self._limiter.delay(time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            verdict, user_id, message_id = self._queue.popleft()
+            self._limiter.record(time.monotonic())
+            try:
+                if verdict.action == ModerationAction.TIMEOUT:
+                    ok = await twitch_api.timeout_user(
+                        self.broadcaster_id, self.broadcaster_id, user_id,
+                        verdict.timeout_seconds, verdict.reason
+                    )
+                else:
+                    ok = await twitch_api.delete_chat_message(self.broadcaster_id, self.broadcaster_id, message_id)
+            except Exception as e:
+                logger.error(f"Erro ao aplicar moderação: {e}")
+                ok = False
+
+            if ok:
+                self.executed += 1
+            else:
+                self.failed += 1
+
+            # Limpa timeouts expirados de vez em quando
+            if len(self._timed_out) > MAX_TRACKED_USERS:
+                now = time.monotonic()
+                self._timed_out = {uid: until for uid, until in self._timed_out.items() if until > now}
+
+    def stats(self) -> Dict:
+        return {
+            "queued": len(self._queue),
+            "executed": self.executed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
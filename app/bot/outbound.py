@@ -0,0 +1,268 @@
+"""
+Fila de mensagens de saída do bot
+Respeita os limites de PRIVMSG da Twitch, agrupa respostas idênticas e divide mensagens longas
+"""
+import asyncio
+import threading
+import time
+import logging
+from collections import deque, OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 500
+RATE_WINDOW_SECONDS = 30.0
+USER_RATE_LIMIT = 20       # Bot sem mod: 20 mensagens a cada 30s
+MOD_RATE_LIMIT = 100       # Bot mod/broadcaster: 100 mensagens a cada 30s
+USER_MIN_INTERVAL = 1.0    # Bot sem mod: 1 mensagem por segundo por canal
+LATENCY_SAMPLES = 1000
+
+
+class SlidingWindowLimiter:
+    """Limitador de janela deslizante (N envios a cada X segundos)"""
+
+    def __init__(self, limit: int, window: float = RATE_WINDOW_SECONDS):
+        self.limit = limit
+        self.window = window
+        self._sent: Deque[float] = deque()
+        # A API lê a janela de outra thread; só o loop do bot remove entradas
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        while self._sent and now - self._sent[0] >= self.window:
+            self._sent.popleft()
+
+    def delay(self, now: float) -> float:
+        """Retorna quantos segundos faltam para liberar um envio"""
+        with self._lock:
+            self._evict(now)
+            if len(self._sent) < self.limit:
+                return 0.0
+            return self.window - (now - self._sent[0])
+
+    def record(self, now: float):
+        with self._lock:
+            self._sent.append(now)
+
+    @property
+    def in_window(self) -> int:
+        """Envios dentro da janela atual (somente leitura, seguro fora do loop do bot)"""
+        now = time.monotonic()
+        with self._lock:
+            sent = list(self._sent)
+        return sum(1 for t in sent if now - t < self.window)
+
+
+@dataclass
+class OutgoingMessage:
+    channel: str
+    text: str
+    enqueued_at: float
+    mentions: List[str] = field(default_factory=list)
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Divide um texto em partes de até `limit` caracteres, quebrando em espaços"""
+    if len(text) <= limit:
+        return [text]
+
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        parts.append(text)
+    return parts
+
+
+def render_message(msg: OutgoingMessage, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Monta o texto final, agrupando as menções que couberem em cada mensagem"""
+    if not msg.mentions:
+        return split_message(msg.text, limit)
+
+    body = msg.text
+    # Espaço disponível para menções em cada mensagem ("@a @b, texto")
+    budget = limit - len(body) - 2
+    if budget < 32:
+        # Texto grande demais para agrupar: menções vão na primeira parte
+        prefix = " ".join(f"@{name}" for name in msg.mentions)
+        return split_message(f"{prefix}, {body}", limit)
+
+    messages = []
+    group: List[str] = []
+    used = 0
+    for name in msg.mentions:
+        tag = f"@{name}"
+        extra = len(tag) + (1 if group else 0)
+        if group and used + extra > budget:
+            messages.append(f"{' '.join(group)}, {body}")
+            group, used = [], 0
+            extra = len(tag)
+        group.append(tag)
+        used += extra
+    if group:
+        messages.append(f"{' '.join(group)}, {body}")
+    return messages
+
+
+class OutboundQueue:
+    """Agendador de envio de mensagens com limite de taxa e agrupamento"""
+
+    def __init__(
+        self,
+        send_func: Callable[[str, str], Awaitable[None]],
+        is_moderator: bool = False,
+        max_pending: int = 500
+    ):
+        self._send_func = send_func
+        self.max_pending = max_pending
+        self.is_moderator = is_moderator
+        self._limiter = SlidingWindowLimiter(MOD_RATE_LIMIT if is_moderator else USER_RATE_LIMIT)
+        self._last_sent: Dict[str, float] = {}
+
+        # Mensagens aguardando envio, agrupáveis por (canal, texto)
+        self._pending: "OrderedDict[Tuple[str, str], OutgoingMessage]" = OrderedDict()
+        # Partes já montadas, aguardando apenas o limitador
+        self._ready: Deque[Tuple[str, str, float]] = deque()
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._latency_lock = threading.Lock()
+        self.sent_count = 0
+        self.coalesced_count = 0
+        self.split_count = 0
+        self.dropped_count = 0
+        self.error_count = 0
+
+    def bind(self, send_func: Callable[[str, str], Awaitable[None]]):
+        """Troca a função de envio (a fila sobrevive ao bot que a criou, ver supervisor)"""
+        self._send_func = send_func
+
+    def set_moderator(self, is_moderator: bool):
+        """Ajusta o limite de taxa de acordo com o cargo do bot no canal"""
+        if is_moderator == self.is_moderator:
+            return
+        self.is_moderator = is_moderator
+        self._limiter.limit = MOD_RATE_LIMIT if is_moderator else USER_RATE_LIMIT
+        logger.info(f"Limite de envio ajustado para {self._limiter.limit}/{int(RATE_WINDOW_SECONDS)}s")
+
+    def enqueue(self, channel: str, text: str, mention: Optional[str] = None) -> bool:
+        """Coloca uma mensagem na fila. Retorna False se ela foi descartada"""
+        channel = channel.lower()
+        key = (channel, text)
+
+        existing = self._pending.get(key)
+        if existing is not None:
+            if mention and mention not in existing.mentions:
+                existing.mentions.append(mention)
+            self.coalesced_count += 1
+            return True
+
+        if len(self._pending) + len(self._ready) >= self.max_pending:
+            self.dropped_count += 1
+            logger.warning(f"Fila de saída cheia, mensagem descartada em #{channel}")
+            return False
+
+        msg = OutgoingMessage(channel=channel, text=text, enqueued_at=time.monotonic())
+        if mention:
+            msg.mentions.append(mention)
+        self._pending[key] = msg
+        self._wakeup.set()
+        return True
+
+    async def start(self):
+        """Inicia a tarefa de envio (idempotente)"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Para a tarefa de envio"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _next_delay(self, channel: str, now: float) -> float:
+        delay = self._limiter.delay(now)
+        if not self.is_moderator:
+            last = self._last_sent.get(channel)
+            if last is not None:
+                delay = max(delay, USER_MIN_INTERVAL - (now - last))
+        return delay
+
+    async def _run(self):
+        while True:
+            if not self._ready:
+                if not self._pending:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                _, msg = self._pending.popitem(last=False)
+                parts = render_message(msg)
+                if len(parts) > 1:
+                    self.split_count += 1
+                for part in parts:
+                    self._ready.append((msg.channel, part, msg.enqueued_at))
+
+            channel, text, enqueued_at = self._ready[0]
+            now = time.monotonic()
+            delay = self._next_delay(channel, now)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            self._ready.popleft()
+            self._limiter.record(now)
+            self._last_sent[channel] = now
+
+            try:
+                await self._send_func(channel, text)
+                self.sent_count += 1
+                with self._latency_lock:
+                    self._latencies.append((time.monotonic() - enqueued_at) * 1000)
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"Erro ao enviar mensagem em #{channel}: {e}")
+
+    def metrics(self) -> Dict:
+        """Retorna métricas da fila de saída (chamado também pela thread da API)"""
+        with self._latency_lock:
+            latencies = list(self._latencies)
+        latencies.sort()
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(len(latencies) * p))
+            return round(latencies[index], 2)
+
+        return {
+            "pending": len(self._pending),
+            "ready": len(self._ready),
+            "rate_limit": self._limiter.limit,
+            "rate_window_seconds": RATE_WINDOW_SECONDS,
+            "sent_in_window": self._limiter.in_window,
+            "is_moderator": self.is_moderator,
+            "sent": self.sent_count,
+            "coalesced": self.coalesced_count,
+            "split": self.split_count,
+            "dropped": self.dropped_count,
+            "errors": self.error_count,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+            },
+        }
@@ -0,0 +1,118 @@
+"""
+Permissões do chat
+O cargo de quem manda a mensagem é derivado uma vez por mensagem das badges do IRC
+(broadcaster, moderator, vip, subscriber/founder) e guardado em cache por usuário: enquanto
+as badges não mudam, o estado é reaproveitado. Cargos viram números (ROLE_RANK), então a
+checagem de `min_role` é uma comparação de inteiros.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from app.models import UserRole
+
+ROLE_RANK: Dict[UserRole, int] = {
+    UserRole.VIEWER: 0,
+    UserRole.SUBSCRIBER: 1,
+    UserRole.VIP: 2,
+    UserRole.MODERATOR: 3,
+    UserRole.BROADCASTER: 4,
+}
+
+ROLE_LABEL: Dict[UserRole, str] = {
+    UserRole.VIEWER: "viewers",
+    UserRole.SUBSCRIBER: "inscritos",
+    UserRole.VIP: "VIPs",
+    UserRole.MODERATOR: "moderadores",
+    UserRole.BROADCASTER: "o streamer",
+}
+
+MAX_CACHED_USERS = 5000
+
+
+@dataclass(frozen=True)
+class RoleState:
+    """Cargo e flags de um usuário no canal"""
+    role: UserRole = UserRole.VIEWER
+    is_subscriber: bool = False
+    is_vip: bool = False
+    is_moderator: bool = False
+    is_broadcaster: bool = False
+
+    @property
+    def rank(self) -> int:
+        return ROLE_RANK[self.role]
+
+    def allows(self, min_role: Optional[UserRole]) -> bool:
+        return self.rank >= ROLE_RANK[min_role or UserRole.VIEWER]
+
+
+VIEWER_STATE = RoleState()
+
+
+def parse_badges(raw: str) -> Dict[str, str]:
+    """"broadcaster/1,subscriber/12" -> {"broadcaster": "1", "subscriber": "12"}"""
+    badges = {}
+    for badge in raw.split(","):
+        name, _, version = badge.partition("/")
+        if name:
+            badges[name] = version
+    return badges
+
+
+def role_from_tags(tags: Dict[str, str], is_channel_owner: bool = False) -> RoleState:
+    """Monta o estado do usuário a partir das tags do IRC"""
+    badges = parse_badges(tags.get("badges") or "")
+    is_broadcaster = is_channel_owner or "broadcaster" in badges
+    is_moderator = is_broadcaster or "moderator" in badges or tags.get("mod") == "1"
+    is_vip = "vip" in badges or bool(tags.get("vip"))
+    is_subscriber = "subscriber" in badges or "founder" in badges or tags.get("subscriber") == "1"
+
+    if is_broadcaster:
+        role = UserRole.BROADCASTER
+    elif is_moderator:
+        role = UserRole.MODERATOR
+    elif is_vip:
+        role = UserRole.VIP
+    elif is_subscriber:
+        role = UserRole.SUBSCRIBER
+    else:
+        role = UserRole.VIEWER
+
+    return RoleState(role, is_subscriber, is_vip, is_moderator, is_broadcaster)
+
+
+class PermissionEngine:
+    """Resolve e guarda em cache o cargo de cada usuário"""
+
+    def __init__(self, channel: str):
+        self.channel = channel.lower()
+        # twitch_id -> (badges/flags vistos, estado)
+        self._cache: "OrderedDict[str, Tuple[Tuple[str, ...], RoleState]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, user_id: str, username: str, tags: Optional[Dict[str, str]]) -> RoleState:
+        tags = tags or {}
+        key = (tags.get("badges") or "", tags.get("mod") or "", tags.get("vip") or "", tags.get("subscriber") or "")
+
+        cached = self._cache.get(user_id)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        state = role_from_tags(tags, is_channel_owner=username.lower() == self.channel)
+        self._cache[user_id] = (key, state)
+        if len(self._cache) > MAX_CACHED_USERS:
+            self._cache.popitem(last=False)
+        return state
+
+    def for_message(self, message) -> RoleState:
+        """Cargo do autor de uma mensagem do twitchio"""
+        author = message.author
+        if author is None:
+            return VIEWER_STATE
+        return self.resolve(str(author.id), author.name, message.tags)
+
+    def stats(self) -> Dict:
+        return {"cached_users": len(self._cache), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,229 @@
+"""
+Rastreamento de presença e tempo assistido
+Sessões ativas ficam em arrays compactos (um slot por viewer) e o tempo é creditado
+no banco em lotes periódicos, não a cada evento.
+"""
+import time
+import logging
+from array import array
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, select
+from app.core.database import get_engine
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+QUERY_CHUNK = 500
+MAX_UNKNOWN_VIEWERS = 20000    # Viewers sem linha em users cujo tempo fica guardado até falarem no chat
+
+
+class PresenceTracker:
+    """Sessões de viewers alimentadas por JOIN/PART e atividade no chat"""
+
+    def __init__(self, idle_timeout: float = 600):
+        # Sem JOIN (canais grandes não recebem a lista de membros), a sessão vale
+        # até `idle_timeout` segundos após a última mensagem
+        self.idle_timeout = idle_timeout
+
+        self._slots: Dict[str, int] = {}
+        self._names: List[Optional[str]] = []
+        self._free: List[int] = []
+
+        self._joined = array("b")        # 1 se houve JOIN sem PART
+        self._last_active = array("d")   # Última atividade (JOIN ou mensagem)
+        self._credited_at = array("d")   # Até quando o tempo já foi creditado
+        self._accrued_at = array("d")    # Até quando os pontos já foram calculados
+
+        self._pending: Dict[str, int] = {}
+        self._pending_fraction: Dict[str, float] = {}
+        self.held_users = 0         # Viewers com tempo guardado à espera da linha em users
+        self.dropped_seconds = 0    # Tempo descartado por exceder MAX_UNKNOWN_VIEWERS
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _slot(self, username: str, now: float) -> int:
+        slot = self._slots.get(username)
+        if slot is not None:
+            return slot
+
+        if self._free:
+            slot = self._free.pop()
+            self._names[slot] = username
+            self._joined[slot] = 0
+            self._last_active[slot] = now
+            self._credited_at[slot] = now
+            self._accrued_at[slot] = now
+        else:
+            slot = len(self._names)
+            self._names.append(username)
+            self._joined.append(0)
+            self._last_active.append(now)
+            self._credited_at.append(now)
+            self._accrued_at.append(now)
+        self._slots[username] = slot
+        return slot
+
+    def _release(self, slot: int):
+        username = self._names[slot]
+        self._names[slot] = None
+        self._free.append(slot)
+        del self._slots[username]
+
+    def join(self, username: str, now: Optional[float] = None):
+        now = now or time.monotonic()
+        slot = self._slot(username.lower(), now)
+        self._joined[slot] = 1
+        self._last_active[slot] = now
+
+    def part(self, username: str, now: Optional[float] = None):
+        now = now or time.monotonic()
+        slot = self._slots.get(username.lower())
+        if slot is None:
+            return
+        self._credit(slot, now)
+        self._release(slot)
+
+    def activity(self, username: str, now: Optional[float] = None):
+        now = now or time.monotonic()
+        slot = self._slot(username.lower(), now)
+        self._last_active[slot] = now
+
+    def _session_end(self, slot: int, now: float) -> float:
+        if self._joined[slot]:
+            return now
+        return min(now, self._last_active[slot] + self.idle_timeout)
+
+    def _credit(self, slot: int, now: float):
+        end = self._session_end(slot, now)
+        seconds = end - self._credited_at[slot]
+        self._credited_at[slot] = end
+        if seconds <= 0:
+            return
+
+        username = self._names[slot]
+        total = self._pending_fraction.get(username, 0.0) + seconds
+        whole = int(total)
+        self._pending_fraction[username] = total - whole
+        if whole:
+            self._pending[username] = self._pending.get(username, 0) + whole
+
+    def tick(self, now: Optional[float] = None):
+        """Credita o tempo de todas as sessões e encerra as que ficaram ociosas"""
+        now = now or time.monotonic()
+        expired = []
+        for slot, username in enumerate(self._names):
+            if username is None:
+                continue
+            self._credit(slot, now)
+            if not self._joined[slot] and now - self._last_active[slot] >= self.idle_timeout:
+                expired.append(slot)
+
+        for slot in expired:
+            self._release(slot)
+        for username in [u for u in self._pending_fraction if u not in self._slots]:
+            del self._pending_fraction[username]
+
+    def clear(self):
+        """Descarta todas as sessões (o tempo pendente deve ser gravado antes)"""
+        self._slots.clear()
+        self._names.clear()
+        self._free.clear()
+        self._joined = array("b")
+        self._last_active = array("d")
+        self._credited_at = array("d")
+        self._accrued_at = array("d")
+        self._pending_fraction.clear()
+
+    def accrual(self, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Segundos assistidos por viewer desde a última chamada (base dos pontos)
+
+        Uma passada sobre os arrays de todos os slots, sem tocar no tempo a gravar no banco.
+        Retorna só os viewers presentes com tempo novo.
+        """
+        now = now or time.monotonic()
+        idle = self.idle_timeout
+        ends = array("d", (
+            now if joined else min(now, last_active + idle)
+            for joined, last_active in zip(self._joined, self._last_active)
+        ))
+        accrued = self._accrued_at
+        seconds = [end - start for end, start in zip(ends, accrued)]
+        self._accrued_at = array("d", map(max, ends, accrued))
+
+        names = self._names
+        return [(names[slot], elapsed) for slot, elapsed in enumerate(seconds) if elapsed > 0 and names[slot] is not None]
+
+    def pending_seconds(self, username: str) -> int:
+        """Tempo ainda não gravado no banco (inclui a sessão em andamento)"""
+        username = username.lower()
+        seconds = self._pending.get(username, 0)
+        slot = self._slots.get(username)
+        if slot is not None:
+            now = time.monotonic()
+            seconds += int(max(0.0, self._session_end(slot, now) - self._credited_at[slot]))
+        return seconds
+
+    def watch_seconds(self, username: str, stored_seconds: Optional[int]) -> int:
+        """Tempo total assistido: o que está no banco mais o que ainda está em memória"""
+        return (stored_seconds or 0) + self.pending_seconds(username)
+
+    async def flush(self) -> int:
+        """Grava o tempo acumulado em um único UPDATE em lote. Retorna quantos usuários foram atualizados
+
+        Viewers que ainda não têm linha em users (nunca falaram no chat) continuam pendentes até
+        ela existir, até o limite de MAX_UNKNOWN_VIEWERS.
+        """
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        table = User.__table__
+        stmt = (
+            table.update()
+            .where(table.c.username == bindparam("b_username"))
+            .values(
+                watch_seconds=table.c.watch_seconds + bindparam("b_seconds"),
+                watch_hours=(table.c.watch_seconds + bindparam("b_seconds")) / 3600,
+                # Creditar tempo não é atividade: sem isso o onupdate marcaria last_seen = agora
+                last_seen=table.c.last_seen,
+                updated_at=table.c.updated_at
+            )
+        )
+
+        names = list(batch)
+        try:
+            async with get_engine().begin() as conn:
+                existing = set()
+                for start in range(0, len(names), QUERY_CHUNK):
+                    result = await conn.execute(
+                        select(table.c.username).where(table.c.username.in_(names[start:start + QUERY_CHUNK]))
+                    )
+                    existing.update(result.scalars().all())
+
+                rows = [
+                    {"b_username": name, "b_seconds": seconds}
+                    for name, seconds in batch.items() if name in existing
+                ]
+                if rows:
+                    await conn.execute(stmt, rows)
+        except Exception as e:
+            # Devolve o lote para a próxima tentativa
+            for name, seconds in batch.items():
+                self._pending[name] = self._pending.get(name, 0) + seconds
+            logger.error(f"Erro ao gravar tempo assistido: {e}")
+            return 0
+
+        self._hold([(name, seconds) for name, seconds in batch.items() if name not in existing])
+        return len(rows)
+
+    def _hold(self, unknown: List[Tuple[str, int]]):
+        """Guarda o tempo de quem ainda não tem linha em users para o próximo flush"""
+        room = MAX_UNKNOWN_VIEWERS - len(self._pending)
+        kept, dropped = unknown[:max(0, room)], unknown[max(0, room):]
+        for name, seconds in kept:
+            self._pending[name] = self._pending.get(name, 0) + seconds
+        self.held_users = len(kept)
+        if dropped:
+            self.dropped_seconds += sum(seconds for _, seconds in dropped)
+            logger.warning(f"Tempo assistido de {len(dropped)} viewers sem cadastro descartado (limite atingido)")
@@ -0,0 +1,172 @@
+"""
+Resolução de comandos do chat
+A mensagem é normalizada uma única vez (sem acentos, sem diferenciar maiúsculas) e resolvida
+em uma trie de palavras que cobre nomes, aliases e subcomandos (ex: "!redes twitter").
+A trie é atualizada de forma incremental: só os comandos que mudaram são reinseridos.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import Command, CommandType, UserRole
+from app.utils.text import normalize
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CommandEntry:
+    """Cópia imutável dos dados de um comando usados na resolução"""
+    name: str
+    command_type: CommandType = CommandType.BUILTIN
+    response: Optional[str] = None
+    aliases: Tuple[str, ...] = ()
+    min_role: UserRole = UserRole.VIEWER
+    global_cooldown: int = 0
+    user_cooldown: int = 0
+
+    @classmethod
+    def from_model(cls, command: Command) -> "CommandEntry":
+        aliases = tuple(a.strip() for a in (command.aliases or "").split(",") if a.strip())
+        return cls(
+            name=command.name,
+            command_type=command.command_type or CommandType.CUSTOM,
+            response=command.response,
+            aliases=aliases,
+            min_role=command.min_role or UserRole.VIEWER,
+            global_cooldown=command.global_cooldown or 0,
+            user_cooldown=command.user_cooldown or 0,
+        )
+
+    def paths(self) -> List[Tuple[str, ...]]:
+        """Sequências de palavras (normalizadas) que ativam o comando"""
+        return [tuple(normalize(n).split()) for n in (self.name, *self.aliases) if n.strip()]
+
+
+@dataclass
+class Resolution:
+    entry: CommandEntry
+    args: str
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+    entry: Optional[CommandEntry] = None
+
+
+class CommandResolver:
+    """Trie de comandos com atualização incremental"""
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._root = _Node()
+        self._entries: Dict[str, CommandEntry] = {}
+        self.version = -1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[CommandEntry]:
+        return list(self._entries.values())
+
+    def _insert(self, entry: CommandEntry):
+        for path in entry.paths():
+            node = self._root
+            for token in path:
+                node = node.children.setdefault(token, _Node())
+            if node.entry is not None and node.entry.name != entry.name:
+                logger.warning(f"Alias '{' '.join(path)}' de !{entry.name} conflita com !{node.entry.name}")
+                continue
+            node.entry = entry
+
+    def _delete(self, entry: CommandEntry):
+        for path in entry.paths():
+            trail = [self._root]
+            for token in path:
+                child = trail[-1].children.get(token)
+                if child is None:
+                    break
+                trail.append(child)
+            else:
+                if trail[-1].entry is not None and trail[-1].entry.name == entry.name:
+                    trail[-1].entry = None
+                # Remove nós que ficaram vazios
+                for depth in range(len(path), 0, -1):
+                    node = trail[depth]
+                    if node.entry is None and not node.children:
+                        del trail[depth - 1].children[path[depth - 1]]
+                    else:
+                        break
+
+    def upsert(self, entry: CommandEntry) -> bool:
+        """Insere ou atualiza um comando. Retorna False se nada mudou"""
+        current = self._entries.get(entry.name)
+        if current == entry:
+            return False
+        if current is not None:
+            self._delete(current)
+        self._entries[entry.name] = entry
+        self._insert(entry)
+        return True
+
+    def remove(self, name: str) -> bool:
+        current = self._entries.pop(name, None)
+        if current is None:
+            return False
+        self._delete(current)
+        return True
+
+    def sync(self, entries: Iterable[CommandEntry]) -> int:
+        """Aplica um conjunto completo de comandos, tocando só no que mudou. Retorna o nº de mudanças"""
+        wanted = {entry.name: entry for entry in entries}
+        changes = 0
+        for name in [n for n in self._entries if n not in wanted]:
+            changes += self.remove(name)
+        for entry in wanted.values():
+            changes += self.upsert(entry)
+        return changes
+
+    def resolve(self, content: str) -> Optional[Resolution]:
+        """Resolve uma mensagem para um comando (o mais longo que casar), ou None"""
+        if not content.startswith(self.prefix):
+            return None
+
+        body = content[len(self.prefix):]
+        raw_tokens = body.split()
+        if not raw_tokens:
+            return None
+        tokens = normalize(body).split()
+
+        node, match, matched = self._root, None, 0
+        for depth, token in enumerate(tokens, start=1):
+            node = node.children.get(token)
+            if node is None:
+                break
+            if node.entry is not None:
+                match, matched = node.entry, depth
+        if match is None:
+            return None
+
+        return Resolution(entry=match, args=" ".join(raw_tokens[matched:]))
+
+    async def refresh(self, builtins: Optional[Dict[str, UserRole]] = None) -> int:
+        """Sincroniza com o banco. Comandos nativos sem linha no banco entram com o cargo mínimo padrão"""
+        version = invalidation.version("commands")
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Command))
+            commands = result.scalars().all()
+
+        entries = {c.name: CommandEntry.from_model(c) for c in commands if c.is_enabled}
+        disabled = {c.name for c in commands if not c.is_enabled}
+        for name, min_role in (builtins or {}).items():
+            if name not in disabled:
+                entries.setdefault(name, CommandEntry(name=name, min_role=min_role))
+
+        changes = self.sync(entries.values())
+        self.version = version
+        if changes:
+            logger.info(f"🔎 Resolvedor de comandos atualizado ({changes} mudanças, {len(self)} comandos)")
+        return changes
@@ -0,0 +1,255 @@
+"""
+Supervisor da conexão do bot
+Mantém o bot rodando: se a conexão cair ou `start()` falhar, cria um novo bot com backoff
+exponencial com jitter, reaproveitando o estado já aquecido (broadcaster id, trie de
+comandos, regras de moderação, presença). Também mede o tempo até reconectar e estima
+quantas mensagens do chat foram perdidas durante as quedas.
+"""
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+STABLE_AFTER_SECONDS = 60.0    # Conexão que durou isso zera o backoff
+STALL_SECONDS = 30.0           # Sem conectar por esse tempo, derruba o bot e recomeça
+SILENCE_SECONDS = 360.0        # A Twitch manda PING a cada ~5 min: sem PING nem mensagens, a conexão caiu
+WATCHDOG_INTERVAL = 5.0
+RATE_SAMPLES = 600             # Mensagens recentes usadas para estimar a taxa do chat
+RECONNECT_SAMPLES = 50
+
+STARTING = "starting"
+CONNECTED = "connected"
+RECONNECTING = "reconnecting"
+STOPPED = "stopped"
+
+
+class BotSupervisor:
+    """Roda o bot em laço, reconectando com backoff e contabilizando as quedas"""
+
+    def __init__(self, factory: Callable[[Optional[Dict[str, Any]]], Any]):
+        # factory(estado_aquecido) -> bot pronto para `start()`
+        self._factory = factory
+        self.bot: Optional[Any] = None
+        self.state = STARTING
+        self._stop = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._finished = threading.Event()
+
+        self.attempt = 0
+        self.restarts = 0
+        self.disconnects = 0
+        self.last_error: Optional[str] = None
+        self.connected_at: Optional[float] = None
+        self.attempt_started_at: Optional[float] = None
+        self.disconnected_at: Optional[float] = None
+
+        self._message_times: Deque[float] = deque(maxlen=RATE_SAMPLES)
+        self._reconnect_times: Deque[float] = deque(maxlen=RECONNECT_SAMPLES)
+        self.estimated_lost_messages = 0
+
+    def backoff(self) -> float:
+        """Espera antes da próxima tentativa (full jitter)"""
+        ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** self.attempt)
+        return random.uniform(0, ceiling)
+
+    @property
+    def stopping(self) -> bool:
+        """True quando o bot está sendo desligado de vez (e não só reconectando)"""
+        return self._stop.is_set()
+
+    def message_seen(self):
+        """Registra uma mensagem recebida (alimenta a estimativa de taxa do chat)"""
+        self._message_times.append(time.monotonic())
+
+    def message_rate(self) -> float:
+        """Mensagens por segundo nas últimas mensagens vistas"""
+        if len(self._message_times) < 2:
+            return 0.0
+        span = self._message_times[-1] - self._message_times[0]
+        return (len(self._message_times) - 1) / span if span > 0 else 0.0
+
+    def mark_connected(self):
+        """Chamado pelo bot no event_ready (inclusive após reconexões internas do twitchio)"""
+        now = time.monotonic()
+        if self.disconnected_at is not None:
+            gap = now - self.disconnected_at
+            lost = int(self.message_rate() * gap)
+            self._reconnect_times.append(gap)
+            self.estimated_lost_messages += lost
+            logger.info(f"🔌 Reconectado em {gap:.1f}s (~{lost} mensagens perdidas)")
+            self.disconnected_at = None
+        self.state = CONNECTED
+        self.connected_at = now
+
+    def mark_disconnected(self, reason: str):
+        """Chamado quando a conexão cai (RECONNECT da Twitch, queda detectada pelo watchdog ou `start()` encerrado)"""
+        if self.disconnected_at is None:
+            self.disconnected_at = time.monotonic()
+            self.disconnects += 1
+        if self.state != STOPPED:
+            if self.state == CONNECTED:
+                logger.warning(f"🔌 Conexão do bot perdida: {reason}")
+            self.state = RECONNECTING
+        self.last_error = reason
+
+    async def run(self):
+        """Laço principal: cria o bot, aquece, conecta e reinicia se cair"""
+        self._loop = asyncio.get_running_loop()
+        try:
+            await self._run()
+        finally:
+            self._finished.set()
+
+    async def _run(self):
+        warm: Optional[Dict[str, Any]] = None
+        while not self._stop.is_set():
+            self.bot = self._factory(warm)
+            self.bot.supervisor = self
+
+            try:
+                await self.bot.prewarm()
+            except Exception as e:
+                logger.warning(f"Aquecimento do bot incompleto: {e}")
+
+            self.attempt_started_at = time.monotonic()
+            try:
+                await self._run_bot()
+                reason = "conexão encerrada"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+                logger.error(f"❌ Bot caiu: {reason}")
+
+            self.mark_disconnected(reason)
+            warm = await self._shutdown_bot()
+            if self._stop.is_set():
+                break
+
+            if self.connected_at is not None and time.monotonic() - self.connected_at >= STABLE_AFTER_SECONDS:
+                self.attempt = 0
+            delay = self.backoff()
+            self.attempt += 1
+            self.restarts += 1
+            logger.info(f"🔁 Reconectando o bot em {delay:.1f}s (tentativa {self.attempt})")
+            try:
+                await asyncio.wait_for(self._stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+        self.state = STOPPED
+
+    def _silent_for(self, connection: Any) -> float:
+        """Segundos desde o último sinal de vida da conexão (PING da Twitch ou mensagem do chat)"""
+        now = time.monotonic()
+        last = self.connected_at or now
+        if self._message_times:
+            last = max(last, self._message_times[-1])
+        last_ping = getattr(connection, "_last_ping", 0)
+        if last_ping:
+            # _last_ping é time.time(); convertido para a base do monotonic
+            last = max(last, now - (time.time() - last_ping))
+        return now - last
+
+    def _check_connection(self):
+        """Detecta quedas silenciosas: o twitchio reconecta sozinho em _keep_alive sem avisar
+        (nem "reconnect" nem fim do start()), então o estado ficaria CONNECTED durante a queda"""
+        if self.state != CONNECTED:
+            return
+        connection = getattr(self.bot, "_connection", None)
+        if connection is None:
+            return
+        if not connection.is_alive:
+            self.mark_disconnected("conexão IRC caiu")
+        elif self._silent_for(connection) > SILENCE_SECONDS:
+            self.mark_disconnected(f"sem PING da Twitch há mais de {SILENCE_SECONDS:.0f}s")
+
+    def _stalled(self) -> bool:
+        if self.state == CONNECTED:
+            return False
+        since = self.disconnected_at or self.attempt_started_at
+        return since is not None and time.monotonic() - since > STALL_SECONDS
+
+    async def _run_bot(self):
+        """Roda `start()` vigiando a conexão: se ela não voltar a tempo, encerra o bot"""
+        task = asyncio.create_task(self.bot.start())
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=WATCHDOG_INTERVAL)
+                if not task.done():
+                    self._check_connection()
+                if not task.done() and self._stalled():
+                    logger.warning(f"⏱️  Bot sem conexão há mais de {STALL_SECONDS:.0f}s, reiniciando")
+                    try:
+                        await self.bot.close()
+                    except Exception as e:
+                        # Ex.: antes da primeira conexão o twitchio ainda não tem o keeper
+                        logger.warning(f"Erro ao fechar o bot travado: {e}")
+                    await asyncio.wait({task}, timeout=WATCHDOG_INTERVAL)
+                    break
+        finally:
+            # Nunca deixa um start() órfão (seria uma segunda conexão IRC respondendo em dobro).
+            # asyncio.wait não propaga o CancelledError da tarefa, só o do próprio supervisor
+            if not task.done():
+                task.cancel()
+                await asyncio.wait({task}, timeout=WATCHDOG_INTERVAL)
+                if not task.done():
+                    logger.error("❌ start() do bot não encerrou após o cancelamento")
+
+        if task.done() and not task.cancelled():
+            task.result()
+
+    async def _shutdown_bot(self) -> Optional[Dict[str, Any]]:
+        """Encerra o bot atual e devolve o estado que vale a pena reaproveitar"""
+        bot, warm = self.bot, None
+        try:
+            warm = await bot.shutdown()
+        except Exception as e:
+            logger.warning(f"Erro ao encerrar o bot: {e}")
+        try:
+            await bot.close()
+        except Exception:
+            pass
+        return warm
+
+    async def stop(self):
+        self._stop.set()
+        self.state = STOPPED
+        if self.bot is not None:
+            try:
+                await self.bot.close()
+            except Exception:
+                pass
+
+    def stop_threadsafe(self, timeout: float) -> bool:
+        """Pede o desligamento a partir de outra thread (ex.: a API) e espera o bot encerrar"""
+        if self._loop is None or self._finished.is_set():
+            return True
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop)
+        return self._finished.wait(timeout)
+
+    def health(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        samples = sorted(self._reconnect_times)
+        return {
+            "state": self.state,
+            "connected_for_seconds": round(now - self.connected_at, 1) if self.state == CONNECTED and self.connected_at else 0,
+            "disconnected_for_seconds": round(now - self.disconnected_at, 1) if self.disconnected_at else 0,
+            "restarts": self.restarts,
+            "disconnects": self.disconnects,
+            "last_error": self.last_error,
+            "message_rate": round(self.message_rate(), 2),
+            "estimated_lost_messages": self.estimated_lost_messages,
+            "reconnect_seconds": {
+                "last": round(self._reconnect_times[-1], 2) if samples else None,
+                "p50": round(samples[len(samples) // 2], 2) if samples else None,
+                "max": round(samples[-1], 2) if samples else None,
+            },
+        }
@@ -0,0 +1,266 @@
+"""
+Mensagens temporizadas (anúncios recorrentes)
+Todos os timers ficam em um único heap de vencimentos atendido por uma só tarefa no loop
+do bot: a tarefa dorme até o próximo vencimento e é acordada quando a agenda muda.
+O envio passa pela fila de saída, então os limites de taxa da Twitch continuam valendo.
+"""
+import time
+import heapq
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, update, bindparam
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import ScheduledMessage
+
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL_SECONDS = 60
+CHANNEL_SPACING_SECONDS = 10   # Intervalo mínimo entre dois timers no mesmo canal
+REFRESH_CHECK_SECONDS = 30     # De quanto em quanto tempo verifica mudanças na agenda
+
+
+@dataclass(frozen=True)
+class TimerEntry:
+    """Cópia imutável dos dados de um timer usados no agendamento"""
+    id: int
+    name: str
+    message: str
+    channel: str
+    interval: int
+    min_chat_messages: int = 0
+
+    @classmethod
+    def from_model(cls, timer: ScheduledMessage, default_channel: str) -> "TimerEntry":
+        return cls(
+            id=timer.id,
+            name=timer.name,
+            message=timer.message,
+            channel=(timer.channel or default_channel).lower(),
+            interval=max(MIN_INTERVAL_SECONDS, timer.interval_seconds or 0),
+            min_chat_messages=timer.min_chat_messages or 0,
+        )
+
+
+class TimerScheduler:
+    """Agenda de mensagens temporizadas em um heap (vencimento, geração, id)"""
+
+    def __init__(self, send_func: Callable[[str, str], bool], default_channel: str):
+        self._send_func = send_func
+        self.default_channel = default_channel
+
+        self._heap: List[Tuple[float, int, int]] = []
+        self._entries: Dict[int, TimerEntry] = {}
+        # Entradas antigas no heap são descartadas ao sair (geração diferente da atual)
+        self._generation: Dict[int, int] = {}
+        self._next_generation = 0
+
+        # Mensagens vistas por canal e o contador no último envio de cada timer
+        self._activity: Dict[str, int] = {}
+        self._activity_mark: Dict[int, int] = {}
+        self._channel_free_at: Dict[str, float] = {}
+
+        # Envios ainda não gravados no banco
+        self._sent: Dict[int, int] = {}
+        self._last_sent: Dict[int, datetime] = {}
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.version = -1
+
+        self.fired = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def activity(self, channel: str):
+        """Conta uma mensagem do chat (usado pelos timers que exigem atividade)"""
+        channel = channel.lower()
+        self._activity[channel] = self._activity.get(channel, 0) + 1
+
+    def _schedule(self, timer_id: int, due: float):
+        self._next_generation += 1
+        self._generation[timer_id] = self._next_generation
+        heapq.heappush(self._heap, (due, self._next_generation, timer_id))
+
+        # Muitas entradas velhas: reconstrói o heap só com as válidas
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [item for item in self._heap if self._generation.get(item[2]) == item[1]]
+            heapq.heapify(self._heap)
+
+        if self._heap[0][2] == timer_id:
+            self._wakeup.set()
+
+    def upsert(self, entry: TimerEntry, due: Optional[float] = None) -> bool:
+        """Insere ou atualiza um timer. Retorna False se nada mudou"""
+        if self._entries.get(entry.id) == entry:
+            return False
+        self._entries[entry.id] = entry
+        self._activity_mark[entry.id] = self._activity.get(entry.channel, 0)
+        self._schedule(entry.id, due if due is not None else time.monotonic() + entry.interval)
+        return True
+
+    def remove(self, timer_id: int) -> bool:
+        if self._entries.pop(timer_id, None) is None:
+            return False
+        self._generation.pop(timer_id, None)
+        self._activity_mark.pop(timer_id, None)
+        return True
+
+    def sync(self, entries: Iterable[Tuple[TimerEntry, float]]) -> int:
+        """Aplica a agenda completa (timer, primeiro vencimento), tocando só no que mudou"""
+        wanted = {entry.id: (entry, due) for entry, due in entries}
+        changes = 0
+        for timer_id in [t for t in self._entries if t not in wanted]:
+            changes += self.remove(timer_id)
+        for entry, due in wanted.values():
+            changes += self.upsert(entry, due)
+        return changes
+
+    async def refresh(self) -> int:
+        """Sincroniza com o banco. Timers novos continuam a contagem a partir do último envio"""
+        version = invalidation.version("timers")
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(ScheduledMessage).where(ScheduledMessage.is_enabled == True)
+            )
+            timers = result.scalars().all()
+
+        now, utcnow = time.monotonic(), datetime.utcnow()
+        entries = []
+        for timer in timers:
+            entry = TimerEntry.from_model(timer, self.default_channel)
+            last_sent = self._last_sent.get(timer.id) or timer.last_sent
+            elapsed = (utcnow - last_sent).total_seconds() if last_sent else 0
+            entries.append((entry, now + max(0.0, entry.interval - elapsed)))
+
+        changes = self.sync(entries)
+        self.version = version
+        if changes:
+            logger.info(f"⏰ Agenda de mensagens atualizada ({changes} mudanças, {len(self)} timers)")
+        return changes
+
+    async def start(self):
+        """Carrega a agenda e inicia a tarefa dos timers (idempotente)"""
+        if self._task and not self._task.done():
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _pop_due(self, now: float) -> List[TimerEntry]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, timer_id = heapq.heappop(self._heap)
+            if self._generation.get(timer_id) == generation:
+                due.append(self._entries[timer_id])
+        return due
+
+    def _fire(self, entry: TimerEntry, now: float):
+        # Não envia dois timers colados no mesmo canal: adia até o canal liberar
+        free_at = self._channel_free_at.get(entry.channel, 0.0)
+        if free_at > now:
+            self._schedule(entry.id, free_at)
+            return
+
+        seen = self._activity.get(entry.channel, 0)
+        if seen - self._activity_mark.get(entry.id, 0) < entry.min_chat_messages:
+            # Chat parado: pula esta rodada
+            self.skipped += 1
+        elif self._send_func(entry.channel, entry.message):
+            self.fired += 1
+            self._activity_mark[entry.id] = seen
+            self._channel_free_at[entry.channel] = now + CHANNEL_SPACING_SECONDS
+            self._sent[entry.id] = self._sent.get(entry.id, 0) + 1
+            self._last_sent[entry.id] = datetime.utcnow()
+        else:
+            self.skipped += 1
+
+        self._schedule(entry.id, now + entry.interval)
+
+    async def _run(self):
+        while True:
+            try:
+                if self.version != invalidation.version("timers"):
+                    await self.refresh()
+
+                now = time.monotonic()
+                for entry in self._pop_due(now):
+                    self._fire(entry, now)
+
+                timeout = REFRESH_CHECK_SECONDS
+                if self._heap:
+                    timeout = min(timeout, max(0.0, self._heap[0][0] - time.monotonic()))
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro na agenda de mensagens: {e}")
+                await asyncio.sleep(REFRESH_CHECK_SECONDS)
+
+    async def flush(self):
+        """Grava os envios acumulados em um único UPDATE em lote"""
+        if not self._sent:
+            return
+
+        batch, self._sent = self._sent, {}
+        table = ScheduledMessage.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                send_count=table.c.send_count + bindparam("b_count"),
+                last_sent=bindparam("b_last")
+            )
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt, [
+                    {"b_id": timer_id, "b_count": count, "b_last": self._last_sent[timer_id]}
+                    for timer_id, count in batch.items()
+                ])
+                await session.commit()
+        except Exception as e:
+            # Devolve o lote para a próxima tentativa
+            for timer_id, count in batch.items():
+                self._sent[timer_id] = self._sent.get(timer_id, 0) + count
+            logger.error(f"Erro ao gravar envios dos timers: {e}")
+
+    def stats(self) -> Dict:
+        # Chamado pela thread da API: trabalha sobre cópias, o loop do bot pode mexer na agenda
+        now = time.monotonic()
+        heap = list(self._heap)
+        entries = dict(self._entries)
+        generations = dict(self._generation)
+        upcoming = sorted(
+            (due, timer_id) for due, generation, timer_id in heap
+            if generations.get(timer_id) == generation and timer_id in entries
+        )[:10]
+        return {
+            "timers": len(entries),
+            "version": self.version,
+            "fired": self.fired,
+            "skipped": self.skipped,
+            "heap_size": len(heap),
+            "upcoming": [
+                {"id": timer_id, "name": entries[timer_id].name, "in_seconds": round(max(0.0, due - now), 1)}
+                for due, timer_id in upcoming
+            ],
+        }
@@ -1,4 +1,13 @@
-from app.core.config import settings
-from app.core.database import get_db, init_db, Base
+# Exportações carregadas sob demanda: importar app.core.runtime ou app.core.startup
+# não deve montar o Settings nem importar o SQLAlchemy
+__all__ = ["settings", "get_db", "init_db", "Base"]
 
-__all__ = ["settings", "get_db", "init_db", "Base"]
\ No newline at end of file
+
+def __getattr__(name: str):
+    if name == "settings":
+        from app.core.config import get_settings
+        return get_settings()
+    if name in ("get_db", "init_db", "Base"):
+        from app.core import database
+        return getattr(database, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing import List
+from functools import lru_cache
 
 class Settings(BaseSettings):
     twitch_bot_username: str
@@ -20,14 +21,68 @@ class Settings(BaseSettings):
     allowed_origins: str = "https://localhost:3000"
 
     command_prefix: str = "!"
+    bot_is_moderator: bool = False
+
+    eventsub_enabled: bool = True
+    eventsub_ws_url: str = "wss://eventsub.wss.twitch.tv/ws"
+    eventsub_subscriptions_url: str = "https://api.twitch.tv/helix/eventsub/subscriptions"
+
+    moderation_enabled: bool = True
+    moderation_caps_min_length: int = 15
+    moderation_caps_ratio: float = 0.7
+    moderation_repeat_limit: int = 3
+    moderation_repeat_window: int = 30
+
+    analytics_enabled: bool = True
+    analytics_analyzers: str = "language,sentiment"
+    analytics_workers: int = 2
+    analytics_batch_size: int = 500
+    analytics_batch_interval: float = 5.0
+
+    stream_poll_interval: int = 60
+
+    points_enabled: bool = True
+    points_per_minute: float = 1.0
+    points_per_message: int = 1
+    points_min_bet: int = 10
+
+    shared_state_url: str = "memory://"
+    shared_state_prefix: str = "twitchbot:"
+    node_id: str = ""
+    leader_lease_ms: int = 10000
+
+    watch_flush_interval: int = 60
+    watch_idle_timeout: int = 600
     enable_debug: bool = False
 
+    user_retention_days: int = 180
+    maintenance_interval_hours: float = 24
+    maintenance_batch_size: int = 500
+
     @property
     def origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.allowed_origins.split(",")]
 
+    @property
+    def analyzers_list(self) -> List[str]:
+        return [name.strip() for name in self.analytics_analyzers.split(",") if name.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = False
 
-settings = Settings()
\ No newline at end of file
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Monta o Settings no primeiro uso (lê o .env apenas uma vez)"""
+    from app.core.startup import profiler
+
+    with profiler.phase("config"):
+        return Settings()
+
+
+def __getattr__(name: str):
+    # `from app.core.config import settings` continua funcionando, mas sem custo no import
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
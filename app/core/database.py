@@ -1,23 +1,61 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import DeclarativeBase
-from app.core.config import settings
+from sqlalchemy import event
+from typing import Optional
+from app.core.config import get_settings
+from app.core.startup import profiler
 
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.enable_debug,
-    future=True
-)
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False
-)
+def get_engine() -> AsyncEngine:
+    """Cria o engine no primeiro uso"""
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        with profiler.phase("db.engine"):
+            _engine = create_async_engine(
+                settings.database_url,
+                echo=settings.enable_debug,
+                future=True
+            )
+            if _engine.dialect.name == "sqlite":
+                event.listen(_engine.sync_engine, "connect", _configure_sqlite)
+    return _engine
+
+def _configure_sqlite(dbapi_conn, _):
+    # WAL deixa leituras seguirem durante escritas longas (migrações, manutenção)
+    # auto_vacuum só tem efeito em bancos novos (antes da primeira tabela) ou após um VACUUM completo
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+def get_sessionmaker() -> async_sessionmaker:
+    """Cria a fábrica de sessões no primeiro uso"""
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False
+        )
+    return _sessionmaker
+
+def AsyncSessionLocal(**kwargs) -> AsyncSession:
+    """Abre uma nova sessão (mantém a interface do antigo sessionmaker global)"""
+    return get_sessionmaker()(**kwargs)
+
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -31,5 +69,13 @@ async def get_db():
             await session.close()
 
 async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+    """Garante que o schema está atualizado (pula o create_all se nada mudou)"""
+    import app.models  # noqa: F401 - registra as tabelas no metadata
+    from app.core.schema import ensure_schema
+    from app.core.migrations import MigrationRunner, head_version
+
+    async def migrate(engine):
+        await MigrationRunner(engine).run()
+
+    with profiler.phase("db.schema"):
+        await ensure_schema(get_engine(), Base.metadata, version=str(head_version()), migrate=migrate)
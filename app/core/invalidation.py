@@ -0,0 +1,53 @@
+"""
+Versões por assunto (tag) usadas para invalidar caches
+Escritas incrementam a versão da tag; quem guarda cache compara a versão que viu com a atual.
+Seguro para uso entre a thread da API e a do bot.
+Ouvintes registrados com `add_listener` são avisados de cada bump local (é assim que a
+invalidação chega às outras instâncias, ver app.services.shared_state).
+"""
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+_listeners: List[Callable[[str], None]] = []
+
+
+def add_listener(listener: Callable[[str], None]):
+    """Registra uma função chamada (em qualquer thread) a cada bump local"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[str], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def bump(tag: str, propagate: bool = True) -> int:
+    """Marca a tag como alterada e retorna a nova versão
+
+    `propagate=False` é usado para bumps vindos de outra instância (não são repassados)
+    """
+    with _lock:
+        _versions[tag] = _versions.get(tag, 0) + 1
+        current = _versions[tag]
+    if propagate:
+        for listener in _listeners:
+            listener(tag)
+    return current
+
+
+def version(tag: str) -> int:
+    """Versão atual da tag"""
+    return _versions.get(tag, 0)
+
+
+def versions(tags: Iterable[str]) -> Tuple[int, ...]:
+    """Versões atuais de várias tags"""
+    return tuple(_versions.get(tag, 0) for tag in tags)
+
+
+def tags() -> List[str]:
+    """Tags que já tiveram algum bump"""
+    return list(_versions)
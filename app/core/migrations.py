@@ -0,0 +1,234 @@
+"""
+Migrações versionadas do schema (SQLite e Postgres)
+Adiciona colunas e índices em tabelas existentes sem segurar locks de escrita longos:
+- Índices no Postgres usam CREATE INDEX CONCURRENTLY (fora de transação)
+- Colunas são adicionadas com ALTER TABLE (operação apenas de metadata) e preenchidas em lotes
+"""
+import asyncio
+import math
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime, select, text, inspect
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# Estimativas grosseiras usadas no dry-run
+INDEX_ROWS_PER_SECOND = 250_000
+BACKFILL_ROWS_PER_SECOND = 50_000
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass
+class CreateIndex:
+    name: str
+    table: str
+    columns: List[str]
+    unique: bool = False
+
+
+@dataclass
+class AddColumn:
+    table: str
+    column: str
+    ddl_type: str                   # Ex: "INTEGER DEFAULT 0"
+    backfill: Optional[str] = None  # Expressão SQL usada para preencher linhas existentes
+
+
+Operation = Union[CreateIndex, AddColumn]
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    operations: List[Operation] = field(default_factory=list)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Índices de desempenho em users e commands", [
+        CreateIndex("ix_users_last_seen", "users", ["last_seen"]),
+        CreateIndex("ix_users_message_count", "users", ["message_count"]),
+        CreateIndex("ix_commands_is_enabled", "commands", ["is_enabled"]),
+    ]),
+    Migration(2, "Tempo assistido em segundos", [
+        AddColumn("users", "watch_seconds", "INTEGER DEFAULT 0"),
+    ]),
+    Migration(3, "Aliases de comandos", [
+        AddColumn("commands", "aliases", "VARCHAR"),
+    ]),
+    Migration(4, "Pontos de fidelidade", [
+        AddColumn("users", "points", "INTEGER DEFAULT 0"),
+        CreateIndex("ix_users_points", "users", ["points"]),
+        AddColumn("users_archive", "points", "INTEGER DEFAULT 0"),
+    ]),
+    Migration(5, "Tempo assistido em segundos no arquivo", [
+        # Sem DEFAULT para que as linhas antigas fiquem NULL e sejam preenchidas a partir das horas
+        AddColumn("users_archive", "watch_seconds", "INTEGER",
+                  backfill="COALESCE(watch_hours, 0) * 3600"),
+    ]),
+]
+
+
+def head_version() -> int:
+    """Versão mais recente declarada"""
+    return max((m.version for m in MIGRATIONS), default=0)
+
+
+class MigrationRunner:
+    """Aplica as migrações pendentes, em ordem"""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        migrations: Optional[List[Migration]] = None,
+        batch_size: int = 1000,
+        batch_pause: float = 0.05
+    ):
+        self.engine = engine
+        self.migrations = sorted(migrations if migrations is not None else MIGRATIONS, key=lambda m: m.version)
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    async def applied_versions(self) -> List[int]:
+        """Versões já aplicadas"""
+        async with self.engine.connect() as conn:
+            if not await self._has_table(conn, schema_migrations.name):
+                return []
+            result = await conn.execute(select(schema_migrations.c.version))
+            return sorted(row[0] for row in result)
+
+    async def pending(self) -> List[Migration]:
+        """Migrações ainda não aplicadas"""
+        applied = set(await self.applied_versions())
+        return [m for m in self.migrations if m.version not in applied]
+
+    async def _has_table(self, conn: AsyncConnection, table: str) -> bool:
+        return await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(table))
+
+    async def _count_rows(self, conn: AsyncConnection, table: str) -> int:
+        if not await self._has_table(conn, table):
+            return 0
+        return (await conn.execute(text(f"SELECT COUNT(*) FROM {table}"))).scalar() or 0
+
+    async def plan(self) -> List[Dict[str, Any]]:
+        """Dry-run: descreve o que seria feito e o custo estimado, sem alterar nada"""
+        report = []
+        async with self.engine.connect() as conn:
+            for migration in await self.pending():
+                steps = []
+                for op in migration.operations:
+                    rows = await self._count_rows(conn, op.table)
+                    steps.append(self._estimate(op, rows))
+                report.append({
+                    "version": migration.version,
+                    "description": migration.description,
+                    "estimated_seconds": round(sum(s["estimated_seconds"] for s in steps), 3),
+                    "steps": steps,
+                })
+        return report
+
+    def _estimate(self, op: Operation, rows: int) -> Dict[str, Any]:
+        if isinstance(op, CreateIndex):
+            seconds = rows * max(1.0, math.log2(rows or 1)) / INDEX_ROWS_PER_SECOND
+            if self.dialect == "postgresql":
+                lock = "nenhum (CONCURRENTLY)"
+            else:
+                lock = "escrita bloqueada durante o build; leituras continuam (WAL)"
+            return {
+                "operation": f"CREATE INDEX {op.name} ON {op.table} ({', '.join(op.columns)})",
+                "rows": rows,
+                "lock": lock,
+                "estimated_seconds": round(seconds, 3),
+            }
+
+        batches = math.ceil(rows / self.batch_size) if op.backfill else 0
+        seconds = (rows / BACKFILL_ROWS_PER_SECOND + batches * self.batch_pause) if op.backfill else 0.0
+        return {
+            "operation": f"ALTER TABLE {op.table} ADD COLUMN {op.column} {op.ddl_type}",
+            "rows": rows,
+            "lock": f"breve, por lote ({batches} lotes de {self.batch_size})" if batches else "breve (apenas metadata)",
+            "estimated_seconds": round(seconds, 3),
+        }
+
+    async def run(self) -> List[int]:
+        """Aplica as migrações pendentes. Retorna as versões aplicadas"""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(schema_migrations.create, checkfirst=True)
+
+        applied = []
+        for migration in await self.pending():
+            logger.info(f"🔧 Aplicando migração {migration.version}: {migration.description}")
+            for op in migration.operations:
+                if isinstance(op, CreateIndex):
+                    await self._create_index(op)
+                else:
+                    await self._add_column(op)
+
+            async with self.engine.begin() as conn:
+                await conn.execute(schema_migrations.insert().values(
+                    version=migration.version,
+                    description=migration.description,
+                    applied_at=datetime.utcnow()
+                ))
+            applied.append(migration.version)
+        return applied
+
+    async def _create_index(self, op: CreateIndex):
+        unique = "UNIQUE " if op.unique else ""
+        columns = ", ".join(op.columns)
+
+        if self.dialect == "postgresql":
+            # CONCURRENTLY não pode rodar dentro de transação
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                try:
+                    await conn.execute(text(
+                        f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {op.name} ON {op.table} ({columns})"
+                    ))
+                except Exception:
+                    # Um build concorrente que falha deixa um índice inválido para trás
+                    await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {op.name}"))
+                    raise
+            return
+
+        async with self.engine.begin() as conn:
+            await conn.execute(text(f"CREATE {unique}INDEX IF NOT EXISTS {op.name} ON {op.table} ({columns})"))
+
+    async def _add_column(self, op: AddColumn):
+        async with self.engine.begin() as conn:
+            existing = await conn.run_sync(
+                lambda sync_conn: [c["name"] for c in inspect(sync_conn).get_columns(op.table)]
+            )
+            if op.column not in existing:
+                await conn.execute(text(f"ALTER TABLE {op.table} ADD COLUMN {op.column} {op.ddl_type}"))
+
+        if not op.backfill:
+            return
+
+        # Preenche em lotes curtos, liberando o lock entre eles
+        while True:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(
+                    text(
+                        f"UPDATE {op.table} SET {op.column} = {op.backfill} "
+                        f"WHERE id IN (SELECT id FROM {op.table} WHERE {op.column} IS NULL LIMIT :limit)"
+                    ),
+                    {"limit": self.batch_size}
+                )
+            if result.rowcount < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
@@ -0,0 +1,32 @@
+"""
+Estado de execução compartilhado entre a API e o bot
+A API roda na thread principal e o bot em uma thread própria
+"""
+from typing import Any, Optional
+
+_bot: Optional[Any] = None
+
+
+def set_bot(bot: Optional[Any]):
+    """Registra a instância ativa do bot"""
+    global _bot
+    _bot = bot
+
+
+def get_bot() -> Optional[Any]:
+    """Retorna a instância ativa do bot (ou None se ele não estiver rodando)"""
+    return _bot
+
+
+_supervisor: Optional[Any] = None
+
+
+def set_supervisor(supervisor: Optional[Any]):
+    """Registra o supervisor da conexão do bot"""
+    global _supervisor
+    _supervisor = supervisor
+
+
+def get_supervisor() -> Optional[Any]:
+    """Retorna o supervisor do bot (ou None se o bot não foi iniciado)"""
+    return _supervisor
@@ -0,0 +1,84 @@
+"""
+Verificação versionada do schema
+Guarda uma impressão digital do metadata (mais a versão das migrações) e só roda o
+create_all e as migrações quando ela muda
+"""
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional
+from sqlalchemy import MetaData, Table, Column, String, select, inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SCHEMA_FINGERPRINT_KEY = "schema_fingerprint"
+
+schema_meta = Table(
+    "schema_meta",
+    MetaData(),
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
+
+_fingerprints: Dict[int, str] = {}
+
+
+def _compute_fingerprint(metadata: MetaData) -> str:
+    digest = hashlib.sha256()
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        digest.update(f"T:{table.name}".encode())
+        for column in table.columns:
+            digest.update(
+                f"C:{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}:"
+                f"{column.unique}:{column.index}".encode()
+            )
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(f"I:{index.name}:{[c.name for c in index.columns]}:{index.unique}".encode())
+    return digest.hexdigest()
+
+
+def schema_fingerprint(metadata: MetaData) -> str:
+    """Calcula (uma vez por processo) a impressão digital do schema declarado nos models"""
+    key = id(metadata)
+    if key not in _fingerprints:
+        _fingerprints[key] = _compute_fingerprint(metadata)
+    return _fingerprints[key]
+
+
+def _read_fingerprint(conn: Connection) -> str:
+    if not inspect(conn).has_table(schema_meta.name):
+        return ""
+    value = conn.execute(
+        select(schema_meta.c.value).where(schema_meta.c.key == SCHEMA_FINGERPRINT_KEY)
+    ).scalar_one_or_none()
+    return value or ""
+
+
+def _write_fingerprint(conn: Connection, fingerprint: str):
+    schema_meta.create(conn, checkfirst=True)
+    conn.execute(schema_meta.delete().where(schema_meta.c.key == SCHEMA_FINGERPRINT_KEY))
+    conn.execute(schema_meta.insert().values(key=SCHEMA_FINGERPRINT_KEY, value=fingerprint))
+
+
+async def ensure_schema(
+    engine: AsyncEngine,
+    metadata: MetaData,
+    version: str = "",
+    migrate: Optional[Callable[[AsyncEngine], Awaitable]] = None
+) -> bool:
+    """Cria as tabelas e aplica migrações apenas se o schema mudou. Retorna True se houve alteração"""
+    fingerprint = f"{schema_fingerprint(metadata)}:{version}"
+
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_read_fingerprint)
+    if current == fingerprint:
+        return False
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    if migrate is not None:
+        await migrate(engine)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(_write_fingerprint, fingerprint)
+    return True
@@ -0,0 +1,88 @@
+"""
+Medição do tempo de inicialização por fase
+Ative com STARTUP_PROFILE=1 e, opcionalmente, defina um orçamento com STARTUP_BUDGET_MS=<ms>
+
+As variáveis são lidas direto do ambiente porque montar o Settings também é uma das fases medidas.
+"""
+import os
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Registra a duração de cada fase de import/inicialização"""
+
+    def __init__(self):
+        self.enabled = os.getenv("STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+        self.budget_ms = float(os.getenv("STARTUP_BUDGET_MS", "0") or 0)
+        self._origin = time.perf_counter()
+        self._phases: List[Tuple[str, str, float, float]] = []
+        self._expected: Set[str] = set()
+        self._ready: Dict[str, float] = {}
+        self._reported = False
+        self._lock = threading.Lock()
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+    @contextmanager
+    def phase(self, name: str):
+        """Mede o tempo de um bloco de código"""
+        start = self._elapsed_ms()
+        try:
+            yield
+        finally:
+            duration = self._elapsed_ms() - start
+            with self._lock:
+                self._phases.append((name, threading.current_thread().name, start, duration))
+
+    def expect(self, *components: str):
+        """Define quais componentes precisam ficar prontos para gerar o relatório"""
+        with self._lock:
+            self._expected.update(components)
+
+    def ready(self, component: str):
+        """Marca um componente como pronto; gera o relatório quando todos estiverem"""
+        with self._lock:
+            self._ready.setdefault(component, self._elapsed_ms())
+            done = self._expected.issubset(self._ready) and not self._reported
+            if done:
+                self._reported = True
+        if done and self.enabled:
+            self.report()
+
+    def summary(self) -> Dict:
+        """Retorna as fases medidas e o tempo até cada componente ficar pronto"""
+        with self._lock:
+            phases = [
+                {"phase": name, "thread": thread, "start_ms": round(start, 1), "duration_ms": round(duration, 1)}
+                for name, thread, start, duration in sorted(self._phases, key=lambda p: p[2])
+            ]
+            ready = {name: round(ms, 1) for name, ms in self._ready.items()}
+        total = max(ready.values()) if ready else round(self._elapsed_ms(), 1)
+        return {"phases": phases, "ready_ms": ready, "total_ms": total, "budget_ms": self.budget_ms or None}
+
+    def report(self):
+        """Escreve o relatório de inicialização no log"""
+        data = self.summary()
+        logger.info("⏱️  Tempo de inicialização por fase:")
+        for phase in data["phases"]:
+            logger.info(
+                f"   {phase['phase']:<24} {phase['duration_ms']:>8.1f} ms "
+                f"(início em {phase['start_ms']:.1f} ms, {phase['thread']})"
+            )
+        for component, ms in data["ready_ms"].items():
+            logger.info(f"   {component} pronto em {ms:.1f} ms")
+
+        if self.budget_ms and data["total_ms"] > self.budget_ms:
+            logger.warning(
+                f"⚠️ Inicialização levou {data['total_ms']:.1f} ms, acima do orçamento de {self.budget_ms:.0f} ms"
+            )
+
+
+profiler = StartupProfiler()
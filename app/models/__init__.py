@@ -1,4 +1,15 @@
 from app.models.user import User, UserRole
 from app.models.command import Command, CommandType
+from app.models.user_archive import UserArchive
+from app.models.moderation_rule import ModerationRule, RuleKind, ModerationAction
+from app.models.scheduled_message import ScheduledMessage
+from app.models.chat_analytics import ChatAnalytics
+from app.models.emote_usage import EmoteUsage
+from app.models.stream_session import StreamSession
+from app.models.points_ledger import PointsLedger, LedgerReason
 
-__all__ = ["User", "UserRole", "Command", "CommandType"]
\ No newline at end of file
+__all__ = [
+    "User", "UserRole", "Command", "CommandType", "UserArchive",
+    "ModerationRule", "RuleKind", "ModerationAction", "ScheduledMessage",
+    "ChatAnalytics", "EmoteUsage", "StreamSession", "PointsLedger", "LedgerReason"
+]
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from datetime import datetime
+from app.core.database import Base
+
+class ChatAnalytics(Base):
+    __tablename__ = "chat_analytics"
+    __table_args__ = (UniqueConstraint("day", "analyzer", "label", name="uq_chat_analytics_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    analyzer = Column(String, nullable=False)  # Ex: "language", "sentiment"
+    label = Column(String, nullable=False)     # Ex: "pt", "positive"
+    count = Column(Integer, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ChatAnalytics {self.day} {self.analyzer}:{self.label}={self.count}>"
@@ -13,11 +13,12 @@ class Command(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    aliases = Column(String, nullable=True)  # Separados por vírgula (ex: "redes,social")
     response = Column(String, nullable=True)  # Para comandos customizados
 
     # Tipo e configuração
     command_type = Column(SQLEnum(CommandType), default=CommandType.CUSTOM)
-    is_enabled = Column(Boolean, default=True)
+    is_enabled = Column(Boolean, default=True, index=True)
 
     # Permissões
     min_role = Column(SQLEnum(UserRole), default=UserRole.VIEWER)
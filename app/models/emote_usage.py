@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from datetime import datetime
+from app.core.database import Base
+
+class EmoteUsage(Base):
+    __tablename__ = "emote_usage"
+    __table_args__ = (UniqueConstraint("day", "emote_id", name="uq_emote_usage_day"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    emote_id = Column(String, nullable=False)
+    emote_name = Column(String, nullable=False)
+    count = Column(Integer, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EmoteUsage {self.day} {self.emote_name}={self.count}>"
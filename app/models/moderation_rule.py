@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEnum
+from datetime import datetime
+from app.core.database import Base
+import enum
+
+class RuleKind(str, enum.Enum):
+    PHRASE = "phrase"   # Frase proibida (sem diferenciar maiúsculas/acentos)
+    REGEX = "regex"     # Expressão regular
+    LINK = "link"       # Links (o padrão é opcional; vazio = qualquer link)
+
+class ModerationAction(str, enum.Enum):
+    DELETE = "delete"
+    TIMEOUT = "timeout"
+
+class ModerationRule(Base):
+    __tablename__ = "moderation_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(SQLEnum(RuleKind), nullable=False)
+    pattern = Column(String, nullable=False, default="")
+
+    action = Column(SQLEnum(ModerationAction), default=ModerationAction.DELETE)
+    timeout_seconds = Column(Integer, default=60)
+    reason = Column(String, nullable=True)
+    is_enabled = Column(Boolean, default=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ModerationRule {self.kind}:{self.pattern} ({self.action})>"
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SqlEnum
+from datetime import datetime
+from app.core.database import Base
+import enum
+
+class LedgerReason(str, enum.Enum):
+    WATCH = "watch"          # Minutos assistidos
+    MESSAGE = "message"      # Mensagens no chat
+    BET = "bet"              # Resultado de !apostar
+    TRANSFER = "transfer"    # !dar (uma linha para cada lado)
+
+class PointsLedger(Base):
+    """Extrato de pontos (só inserção). Acúmulos periódicos viram uma linha por usuário por lote"""
+    __tablename__ = "points_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String, nullable=False, index=True)
+    delta = Column(Integer, nullable=False)
+    reason = Column(SqlEnum(LedgerReason), nullable=False)
+    counterpart = Column(String, nullable=True)  # Outro lado de uma transferência
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<PointsLedger {self.username} {self.delta:+d} ({self.reason})>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+class ScheduledMessage(Base):
+    __tablename__ = "scheduled_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    message = Column(String, nullable=False)
+    channel = Column(String, nullable=True)  # Vazio = canal principal do bot
+
+    # Agendamento (em segundos)
+    interval_seconds = Column(Integer, default=900)
+    # Só envia se houve ao menos N mensagens no chat desde o último envio (0 = sempre)
+    min_chat_messages = Column(Integer, default=0)
+    is_enabled = Column(Boolean, default=True)
+
+    # Stats
+    send_count = Column(Integer, default=0)
+    last_sent = Column(DateTime, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ScheduledMessage {self.name} a cada {self.interval_seconds}s>"
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from app.core.database import Base
+
+class StreamSession(Base):
+    __tablename__ = "stream_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    twitch_stream_id = Column(String, unique=True, index=True, nullable=True)
+    title = Column(String, nullable=True)
+    game_name = Column(String, nullable=True)
+
+    started_at = Column(DateTime, nullable=False, index=True)
+    ended_at = Column(DateTime, nullable=True)  # Vazio = live em andamento
+
+    # Snapshot da live (atualizado periodicamente e fechado no fim)
+    peak_viewers = Column(Integer, default=0)
+    message_count = Column(Integer, default=0)
+    command_count = Column(Integer, default=0)
+    unique_chatters = Column(Integer, default=0)
+    new_chatters = Column(Integer, default=0)
+    emote_count = Column(Integer, default=0)
+    top_chatters = Column(JSON, nullable=True)  # [{"username", "messages"}]
+    top_emotes = Column(JSON, nullable=True)    # [{"emote_id", "name", "count"}]
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def duration_seconds(self) -> int:
+        end = self.ended_at or datetime.utcnow()
+        return int((end - self.started_at).total_seconds())
+
+    def __repr__(self):
+        return f"<StreamSession {self.started_at} ({self.message_count} mensagens)>"
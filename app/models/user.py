@@ -25,10 +25,12 @@ class User(Base):
     is_broadcaster = Column(Boolean, default=False)
 
     first_seen = Column(DateTime, default=datetime.utcnow)
-    last_seen = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    message_count = Column(Integer, default=0)
+    last_seen = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    message_count = Column(Integer, default=0, index=True)
     command_count = Column(Integer, default=0)
-    watch_hours = Column(Integer, default=0)  # Horas assistidas (aproximado)
+    watch_hours = Column(Integer, default=0)  # Horas assistidas (derivado de watch_seconds)
+    watch_seconds = Column(Integer, default=0)
+    points = Column(Integer, default=0, index=True)
 
     subscribed_at = Column(DateTime, nullable=True)
     subscription_tier = Column(String, nullable=True)
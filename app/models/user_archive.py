@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.core.database import Base
+
+class UserArchive(Base):
+    """Usuários inativos movidos para fora da tabela users (apenas os dados que importam)"""
+    __tablename__ = "users_archive"
+
+    id = Column(Integer, primary_key=True)
+    twitch_id = Column(String, unique=True, index=True, nullable=False)
+    username = Column(String, nullable=False)
+    display_name = Column(String)
+
+    message_count = Column(Integer, default=0)
+    command_count = Column(Integer, default=0)
+    watch_hours = Column(Integer, default=0)
+    watch_seconds = Column(Integer, default=0)
+    points = Column(Integer, default=0)
+
+    first_seen = Column(DateTime)
+    last_seen = Column(DateTime)
+    followed_at = Column(DateTime, nullable=True)
+    subscribed_at = Column(DateTime, nullable=True)
+    subscription_tier = Column(String, nullable=True)
+
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<UserArchive {self.username}>"
@@ -0,0 +1,238 @@
+"""
+Análise das mensagens do chat fora do event loop do bot
+As mensagens são acumuladas em lotes e processadas por analisadores plugáveis em um
+ProcessPoolExecutor. Lotes grandes vão por memória compartilhada (sem serializar a lista);
+os resultados voltam de forma assíncrona e são somados em memória e gravados em lote na
+tabela chat_analytics.
+"""
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update, insert, bindparam, and_
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import ChatAnalytics
+from app.services.analyzers import init_worker, analyze_batch, analyze_shared
+
+logger = logging.getLogger(__name__)
+
+SHARED_MEMORY_MIN_BYTES = 64 * 1024   # Abaixo disso, serializar a lista sai mais barato
+MAX_IN_FLIGHT = 4                     # Lotes em processamento ao mesmo tempo
+MAX_BUFFER_BATCHES = 4                # Com o pool ocupado, acumula até N lotes e descarta o resto
+FLUSH_INTERVAL_SECONDS = 30
+
+
+class AnalyticsPipeline:
+    """Fila de análise: o chat só faz um append, o resto roda no pool de processos"""
+
+    def __init__(self):
+        self.batch_size = 500
+        self.batch_interval = 5.0
+        self.analyzers: List[str] = []
+
+        self._buffer: List[str] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._in_flight = 0
+
+        # (dia, analisador, rótulo) -> contagem ainda não gravada
+        self._pending: Dict[Tuple[date, str, str], int] = {}
+        # Totais do dia em memória, para consulta sem ir ao banco
+        self._today: Dict[str, Dict[str, int]] = {}
+        self._today_date: Optional[date] = None
+
+        self.submitted = 0
+        self.analyzed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.shared_batches = 0
+        self.failed = 0
+        self.last_batch_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def submit(self, text: str):
+        """Enfileira uma mensagem para análise (O(1), chamado no caminho do chat)"""
+        if self._task is None:
+            return
+        self._buffer.append(text.replace("\n", " "))
+        self.submitted += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self, analyzers: List[str], workers: int = 2, batch_size: int = 500, batch_interval: float = 5.0):
+        """Cria o pool de processos e inicia o despacho dos lotes (idempotente)"""
+        if self.running:
+            return
+        self.analyzers = analyzers
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+
+        # "spawn": o processo principal tem várias threads (API e bot), fork não é seguro
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(analyzers,)
+        )
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📊 Análise do chat iniciada ({', '.join(analyzers)}; {workers} processos)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        await self.flush()
+
+    async def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.batch_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                self._dispatch()
+                if time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS:
+                    last_flush = time.monotonic()
+                    await self.flush()
+            except Exception as e:
+                logger.error(f"Erro na análise do chat: {e}")
+
+    def _dispatch(self):
+        while self._buffer and self._in_flight < MAX_IN_FLIGHT:
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            self._in_flight += 1
+            asyncio.create_task(self._process(batch))
+
+        # Pool saturado: mantém só os lotes mais recentes
+        overflow = len(self._buffer) - self.batch_size * MAX_BUFFER_BATCHES
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+
+    async def _process(self, batch: List[str]):
+        loop = asyncio.get_running_loop()
+        day = datetime.utcnow().date()
+        started = time.perf_counter()
+        shm = None
+        try:
+            data = "\n".join(batch).encode("utf-8")
+            if len(data) >= SHARED_MEMORY_MIN_BYTES:
+                shm = shared_memory.SharedMemory(create=True, size=len(data))
+                shm.buf[:len(data)] = data
+                result = await loop.run_in_executor(self._pool, analyze_shared, shm.name, len(data))
+                self.shared_batches += 1
+            else:
+                result = await loop.run_in_executor(self._pool, analyze_batch, batch)
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Erro ao analisar lote de {len(batch)} mensagens: {e}")
+            return
+        finally:
+            self._in_flight -= 1
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        self.batches += 1
+        self.analyzed += len(batch)
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._merge(day, result)
+
+    def _merge(self, day: date, result: Dict[str, Dict[str, int]]):
+        if self._today_date != day:
+            self._today_date, self._today = day, {}
+        for analyzer, counts in result.items():
+            today = self._today.setdefault(analyzer, {})
+            for label, count in counts.items():
+                key = (day, analyzer, label)
+                self._pending[key] = self._pending.get(key, 0) + count
+                today[label] = today.get(label, 0) + count
+
+    async def flush(self) -> int:
+        """Soma as contagens pendentes na tabela chat_analytics"""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        table = ChatAnalytics.__table__
+        now = datetime.utcnow()
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(table.c.day, table.c.analyzer, table.c.label)
+                .where(table.c.day.in_({day for day, _, _ in batch}))
+            )
+            existing = {tuple(row) for row in result.all()}
+
+            updates = [
+                {"b_day": day, "b_analyzer": analyzer, "b_label": label, "b_count": count}
+                for (day, analyzer, label), count in batch.items() if (day, analyzer, label) in existing
+            ]
+            inserts = [
+                {"day": day, "analyzer": analyzer, "label": label, "count": count, "updated_at": now}
+                for (day, analyzer, label), count in batch.items() if (day, analyzer, label) not in existing
+            ]
+
+            if updates:
+                await session.execute(
+                    update(table)
+                    .where(and_(
+                        table.c.day == bindparam("b_day"),
+                        table.c.analyzer == bindparam("b_analyzer"),
+                        table.c.label == bindparam("b_label"),
+                    ))
+                    .values(count=table.c.count + bindparam("b_count"), updated_at=now),
+                    updates
+                )
+            if inserts:
+                await session.execute(insert(table), inserts)
+            await session.commit()
+
+        invalidation.bump("analytics")
+        return len(batch)
+
+    def today(self) -> Dict[str, Dict[str, int]]:
+        """Totais do dia atual (inclui o que ainda não foi gravado)"""
+        if self._today_date != datetime.utcnow().date():
+            return {}
+        return {analyzer: dict(counts) for analyzer, counts in self._today.items()}
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "analyzers": self.analyzers,
+            "submitted": self.submitted,
+            "analyzed": self.analyzed,
+            "buffered": len(self._buffer),
+            "in_flight": self._in_flight,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "shared_memory_batches": self.shared_batches,
+            "failed": self.failed,
+            "last_batch_ms": self.last_batch_ms,
+            "pending_rows": len(self._pending),
+        }
+
+
+analytics = AnalyticsPipeline()
@@ -0,0 +1,152 @@
+"""
+Analisadores de mensagens do chat
+Rodam nos processos do pool de análise, então este módulo só depende da biblioteca padrão.
+Cada analisador recebe um lote de mensagens e devolve contagens por rótulo.
+
+Analisadores próprios: herde de Analyzer e registre com @register_analyzer, ou aponte
+`analytics_analyzers` para "modulo:Classe".
+"""
+import re
+import importlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Type
+from app.utils.text import normalize
+
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+ANALYZERS: Dict[str, Type["Analyzer"]] = {}
+
+
+def register_analyzer(cls: Type["Analyzer"]) -> Type["Analyzer"]:
+    """Registra um analisador pelo seu `name`"""
+    ANALYZERS[cls.name] = cls
+    return cls
+
+
+class Analyzer(ABC):
+    """Base dos analisadores: `analyze` recebe um lote e retorna {rótulo: contagem}"""
+    name = ""
+
+    @abstractmethod
+    def analyze(self, texts: List[str]) -> Dict[str, int]:
+        ...
+
+
+def tokenize(text: str) -> List[str]:
+    return WORD_PATTERN.findall(normalize(text))
+
+
+@register_analyzer
+class LanguageAnalyzer(Analyzer):
+    """Idioma provável pela frequência de palavras funcionais"""
+    name = "language"
+
+    STOPWORDS = {
+        "pt": {
+            "de", "que", "nao", "uma", "um", "para", "com", "voce", "mais", "mas", "muito",
+            "isso", "esse", "essa", "tem", "ta", "esta", "eu", "meu", "minha", "ele", "ela",
+            "sim", "vai", "foi", "mano", "kkk", "kkkk", "tudo", "bom", "boa", "obrigado",
+        },
+        "en": {
+            "the", "and", "is", "you", "that", "it", "to", "of", "this", "what", "are",
+            "was", "for", "with", "have", "not", "my", "your", "he", "she", "so", "just",
+            "yes", "no", "lol", "good", "nice", "thanks", "can", "do",
+        },
+        "es": {
+            "el", "la", "los", "las", "que", "es", "por", "con", "una", "pero", "muy",
+            "como", "esta", "yo", "tu", "mi", "si", "bien", "gracias", "jaja", "jajaja",
+            "hola", "del", "lo", "le", "hay", "todo", "bueno",
+        },
+    }
+
+    def analyze(self, texts: List[str]) -> Dict[str, int]:
+        counts: Counter = Counter()
+        for text in texts:
+            words = tokenize(text)
+            best, best_hits = "unknown", 0
+            for language, stopwords in self.STOPWORDS.items():
+                hits = sum(1 for word in words if word in stopwords)
+                if hits > best_hits:
+                    best, best_hits = language, hits
+            counts[best] += 1
+        return dict(counts)
+
+
+@register_analyzer
+class SentimentAnalyzer(Analyzer):
+    """Sentimento por léxico (palavras e emotes comuns do chat)"""
+    name = "sentiment"
+
+    POSITIVE = {
+        "bom", "boa", "otimo", "otima", "lindo", "linda", "top", "demais", "amo", "massa",
+        "incrivel", "parabens", "obrigado", "obrigada", "valeu", "brabo", "gg", "good",
+        "great", "love", "nice", "awesome", "amazing", "thanks", "pog", "pogchamp",
+        "poggers", "kekw", "lul", "lol", "kkk", "kkkk", "hype", "ez", "wp",
+    }
+    NEGATIVE = {
+        "ruim", "pessimo", "pessima", "chato", "chata", "lixo", "odeio", "horrivel", "triste",
+        "bad", "hate", "awful", "terrible", "boring", "sad", "trash", "worst", "cringe",
+        "lag", "notlikethis", "biblethump", "residentsleeper", "f", "rip",
+    }
+
+    def analyze(self, texts: List[str]) -> Dict[str, int]:
+        counts: Counter = Counter()
+        positive, negative = self.POSITIVE, self.NEGATIVE
+        for text in texts:
+            score = 0
+            for word in tokenize(text):
+                if word in positive:
+                    score += 1
+                elif word in negative:
+                    score -= 1
+            counts["positive" if score > 0 else "negative" if score < 0 else "neutral"] += 1
+        return dict(counts)
+
+
+def load_analyzers(names: List[str]) -> List[Analyzer]:
+    """Instancia os analisadores por nome registrado ou por caminho "modulo:Classe\""""
+    analyzers = []
+    for name in names:
+        if ":" in name:
+            module_name, class_name = name.split(":", 1)
+            cls = getattr(importlib.import_module(module_name), class_name)
+        else:
+            cls = ANALYZERS[name]
+        analyzers.append(cls())
+    return analyzers
+
+
+# Estado de cada processo do pool
+_worker_analyzers: List[Analyzer] = []
+
+
+def init_worker(names: List[str]):
+    """Inicializador dos processos do pool"""
+    global _worker_analyzers
+    _worker_analyzers = load_analyzers(names)
+
+
+def analyze_batch(texts: List[str]) -> Dict[str, Dict[str, int]]:
+    """Roda todos os analisadores sobre um lote"""
+    return {analyzer.name: analyzer.analyze(texts) for analyzer in _worker_analyzers}
+
+
+def analyze_shared(shm_name: str, size: int) -> Dict[str, Dict[str, int]]:
+    """Lê um lote de um bloco de memória compartilhada (mensagens separadas por \\n) e analisa"""
+    from multiprocessing import shared_memory
+
+    try:
+        # Quem cria o bloco (o processo do bot) é o responsável por removê-lo
+        shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    except TypeError:
+        # Python < 3.13: o rastreador de recursos é o mesmo do processo pai (spawn)
+        shm = shared_memory.SharedMemory(name=shm_name)
+
+    view = shm.buf[:size]
+    try:
+        texts = str(view, "utf-8").split("\n")
+    finally:
+        view.release()
+        shm.close()
+    return analyze_batch(texts)
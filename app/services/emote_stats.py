@@ -0,0 +1,231 @@
+"""
+Estatísticas de emotes do chat
+Os emotes vêm prontos na tag `emotes` do IRC ("25:0-4,12-16/1902:6-10"): a contagem sai
+das faixas, sem varrer o texto da mensagem (o texto só é fatiado uma vez por emote novo,
+para descobrir o nome). Cada emote ganha um slot e os contadores ficam em arrays:
+por janela de um minuto (última hora), da live atual e pendentes de gravação.
+"""
+import heapq
+import time
+import threading
+import logging
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update, insert, bindparam, and_
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import EmoteUsage
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+WINDOW_COUNT = 60          # Janelas mantidas (última hora)
+MAX_TRACKED_USERS = 5000
+
+
+def parse_emote_tag(tag: Optional[str]) -> List[Tuple[str, int, int, int]]:
+    """Lê a tag de emotes: [(id, início, fim da primeira ocorrência, ocorrências)]"""
+    if not tag:
+        return []
+    emotes = []
+    for part in tag.split("/"):
+        emote_id, _, ranges = part.partition(":")
+        if not emote_id or not ranges:
+            continue
+        first = ranges.split(",", 1)[0]
+        start, _, end = first.partition("-")
+        try:
+            emotes.append((emote_id, int(start), int(end), ranges.count(",") + 1))
+        except ValueError:
+            continue
+    return emotes
+
+
+def _zeros(size: int) -> array:
+    return array("q", bytes(8 * size))
+
+
+class EmoteStats:
+    """Contadores de emotes em memória, seguros para leitura pela thread da API"""
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._names: List[str] = []
+
+        self._windows: List[array] = [_zeros(0) for _ in range(WINDOW_COUNT)]
+        self._window_index = 0
+        self._window_started = time.monotonic()
+        self._hour = _zeros(0)       # Soma das janelas (última hora)
+        self._stream = _zeros(0)     # Desde o início da live (ou do bot)
+        self._pending = _zeros(0)    # Ainda não gravado no banco
+        self._pending_day: date = datetime.utcnow().date()
+
+        # Por usuário (escopo da live): username -> {slot: contagem}
+        self._users: "OrderedDict[str, Dict[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.messages_with_emotes = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _slot(self, emote_id: str, content: str, start: int, end: int) -> int:
+        slot = self._slots.get(emote_id)
+        if slot is not None:
+            return slot
+        slot = len(self._ids)
+        self._slots[emote_id] = slot
+        self._ids.append(emote_id)
+        self._names.append(content[start:end + 1] or emote_id)
+        for counters in (self._hour, self._stream, self._pending, *self._windows):
+            counters.append(0)
+        return slot
+
+    def _rotate(self, now: float):
+        elapsed = int((now - self._window_started) // WINDOW_SECONDS)
+        if elapsed <= 0:
+            return
+        for _ in range(min(elapsed, WINDOW_COUNT)):
+            self._window_index = (self._window_index + 1) % WINDOW_COUNT
+            expired = self._windows[self._window_index]
+            hour = self._hour
+            for slot, count in enumerate(expired):
+                if count:
+                    hour[slot] -= count
+            self._windows[self._window_index] = _zeros(len(self._ids))
+        self._window_started += elapsed * WINDOW_SECONDS
+
+    def record(self, username: str, tag: Optional[str], content: str) -> int:
+        """Conta os emotes de uma mensagem. Retorna quantos foram contados"""
+        emotes = parse_emote_tag(tag)
+        if not emotes:
+            return 0
+
+        username = username.lower()
+        counted = 0
+        with self._lock:
+            self._rotate(time.monotonic())
+            window = self._windows[self._window_index]
+            user = self._users.pop(username, None) or {}
+            for emote_id, start, end, occurrences in emotes:
+                slot = self._slot(emote_id, content, start, end)
+                window[slot] += occurrences
+                self._hour[slot] += occurrences
+                self._stream[slot] += occurrences
+                self._pending[slot] += occurrences
+                user[slot] = user.get(slot, 0) + occurrences
+                counted += occurrences
+
+            self._users[username] = user
+            if len(self._users) > MAX_TRACKED_USERS:
+                self._users.popitem(last=False)
+
+        self.messages_with_emotes += 1
+        self.total += counted
+        return counted
+
+    def _top(self, counters, k: int) -> List[Tuple[str, str, int]]:
+        best = heapq.nlargest(k, range(len(counters)), key=counters.__getitem__)
+        return [(self._ids[slot], self._names[slot], counters[slot]) for slot in best if counters[slot] > 0]
+
+    def top(self, k: int = 10, scope: str = "stream") -> List[Tuple[str, str, int]]:
+        """Top-k como (id, nome, contagem). Escopos: "stream" ou "hour\""""
+        with self._lock:
+            if scope == "hour":
+                self._rotate(time.monotonic())
+                return self._top(self._hour, k)
+            return self._top(self._stream, k)
+
+    def user_top(self, username: str, k: int = 5) -> List[Tuple[str, str, int]]:
+        """Top-k de um usuário na live atual"""
+        with self._lock:
+            counts = self._users.get(username.lower())
+            if not counts:
+                return []
+            best = heapq.nlargest(k, counts.items(), key=lambda item: item[1])
+            return [(self._ids[slot], self._names[slot], count) for slot, count in best]
+
+    def stream_total(self) -> int:
+        """Total de emotes na live atual"""
+        with self._lock:
+            return sum(self._stream)
+
+    def reset_stream(self, seed: Optional[List[Tuple[str, str, int]]] = None):
+        """Zera os contadores da live (chamado quando uma nova live começa)
+
+        `seed` (id, nome, contagem) recomeça a partir do snapshot de uma live retomada
+        """
+        with self._lock:
+            self._stream = _zeros(len(self._ids))
+            self._users.clear()
+            for emote_id, name, count in seed or ():
+                slot = self._slot(emote_id, name or "", 0, len(name or "") - 1)
+                self._stream[slot] += count
+
+    async def flush(self) -> int:
+        """Soma os contadores pendentes na tabela emote_usage (uma linha por emote por dia)"""
+        with self._lock:
+            pending, self._pending = self._pending, _zeros(len(self._ids))
+            day, self._pending_day = self._pending_day, datetime.utcnow().date()
+            batch = {
+                self._ids[slot]: (self._names[slot], count)
+                for slot, count in enumerate(pending) if count
+            }
+        if not batch:
+            return 0
+
+        table = EmoteUsage.__table__
+        now = datetime.utcnow()
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(table.c.emote_id).where(table.c.day == day, table.c.emote_id.in_(list(batch)))
+                )
+                existing = set(result.scalars().all())
+
+                updates = [
+                    {"b_id": emote_id, "b_count": count}
+                    for emote_id, (_, count) in batch.items() if emote_id in existing
+                ]
+                inserts = [
+                    {"day": day, "emote_id": emote_id, "emote_name": name, "count": count, "updated_at": now}
+                    for emote_id, (name, count) in batch.items() if emote_id not in existing
+                ]
+
+                if updates:
+                    await session.execute(
+                        update(table)
+                        .where(and_(table.c.day == day, table.c.emote_id == bindparam("b_id")))
+                        .values(count=table.c.count + bindparam("b_count"), updated_at=now),
+                        updates
+                    )
+                if inserts:
+                    await session.execute(insert(table), inserts)
+                await session.commit()
+        except Exception as e:
+            # Devolve os contadores para a próxima tentativa (no dia do lote)
+            with self._lock:
+                for slot, count in enumerate(pending):
+                    self._pending[slot] += count
+                self._pending_day = day
+            logger.error(f"Erro ao gravar estatísticas de emotes: {e}")
+            return 0
+
+        invalidation.bump("emotes")
+        return len(batch)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "emotes": len(self._ids),
+                "messages_with_emotes": self.messages_with_emotes,
+                "total": self.total,
+                "tracked_users": len(self._users),
+            }
+
+
+emote_stats = EmoteStats()
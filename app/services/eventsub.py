@@ -0,0 +1,405 @@
+"""
+Cliente EventSub via WebSocket
+Recebe follows, subs e raids em tempo real e grava as mudanças nos usuários em lotes,
+substituindo as consultas à Helix feitas a cada novo usuário no chat.
+Inscrições recusadas (ex.: token sem o escopo) ficam em `failed` e o bot volta a consultar a
+Helix para esses tipos. O EventSub não reenvia eventos perdidos: ao abrir a sessão e depois de
+cada queda, os follows que faltam são recuperados pela lista de seguidores da Helix.
+"""
+import asyncio
+import random
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import aiohttp
+from sqlalchemy import select, func
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import User, UserRole
+from app.services.twitch_api import twitch_api
+
+logger = logging.getLogger(__name__)
+
+SEEN_MESSAGES_LIMIT = 2000
+WELCOME_TIMEOUT = 10
+MAX_BACKOFF = 60
+BACKFILL_MAX_PAGES = 10        # Páginas de 100 seguidores consultadas para recuperar follows perdidos
+
+EventHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def subscription_specs(broadcaster_id: str) -> List[Tuple[str, str, Dict[str, str]]]:
+    """Tipos de evento assinados: (tipo, versão, condição)"""
+    return [
+        ("channel.follow", "2", {"broadcaster_user_id": broadcaster_id, "moderator_user_id": broadcaster_id}),
+        ("channel.subscribe", "1", {"broadcaster_user_id": broadcaster_id}),
+        ("channel.subscription.end", "1", {"broadcaster_user_id": broadcaster_id}),
+        ("channel.raid", "1", {"to_broadcaster_user_id": broadcaster_id}),
+        ("stream.online", "1", {"broadcaster_user_id": broadcaster_id}),
+        ("stream.offline", "1", {"broadcaster_user_id": broadcaster_id}),
+    ]
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Converte timestamps RFC3339 da Twitch para datetime sem timezone (UTC)"""
+    if not value:
+        return None
+    value = value.replace("Z", "+00:00")
+    # A Twitch manda nanossegundos; fromisoformat aceita no máximo microssegundos
+    if "." in value:
+        head, tail = value.split(".", 1)
+        digits = "".join(c for c in tail if c.isdigit())
+        value = f"{head}.{digits[:6]}{tail[len(digits):]}"
+    return datetime.fromisoformat(value).replace(tzinfo=None)
+
+
+class EventSubClient:
+    """Mantém uma sessão EventSub aberta, com reconexão sem perda de eventos"""
+
+    def __init__(self, broadcaster_id: str, handler: EventHandler):
+        self.broadcaster_id = broadcaster_id
+        self.handler = handler
+        self.url = settings.eventsub_ws_url
+        self.subscriptions_url = settings.eventsub_subscriptions_url
+
+        self.session_id: Optional[str] = None
+        self.connected = False
+        self.active: Set[str] = set()     # Tipos inscritos na sessão atual
+        self.failed: Set[str] = set()     # Tipos cuja inscrição foi recusada
+        self.reconnects = 0
+        self.events_received = 0
+        self.duplicates_skipped = 0
+        self.backfilled_follows = 0
+        self.last_gap_seconds: Optional[float] = None
+
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._backfill_task: Optional[asyncio.Task] = None
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    def is_active(self, sub_type: str) -> bool:
+        """True se os eventos desse tipo estão chegando pela sessão atual"""
+        return self.connected and sub_type in self.active
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._backfill_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._backfill_task = None
+        if self._http:
+            await self._http.close()
+            self._http = None
+
+    async def _run(self):
+        self._http = aiohttp.ClientSession()
+        backoff = 1.0
+        disconnected_at: Optional[float] = None
+        disconnected_since: Optional[datetime] = None
+        first = True
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                ws, keepalive = await self._connect(self.url)
+                await self._subscribe_all()
+                if disconnected_at is not None:
+                    self.last_gap_seconds = loop.time() - disconnected_at
+                    logger.warning(f"EventSub reconectado após {self.last_gap_seconds:.1f}s sem sessão")
+                    disconnected_at = None
+                if first or disconnected_since is not None:
+                    # Na primeira sessão, desde o último follow conhecido no banco
+                    self._start_backfill(disconnected_since)
+                    first, disconnected_since = False, None
+                backoff = 1.0
+                await self._read(ws, keepalive)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Conexão EventSub perdida: {e}")
+
+            self.connected = False
+            self.session_id = None
+            self.reconnects += 1
+            disconnected_at = disconnected_at or loop.time()
+            if not first:
+                disconnected_since = disconnected_since or datetime.utcnow()
+            await asyncio.sleep(backoff + random.uniform(0, backoff / 2))
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    async def _connect(self, url: str):
+        """Abre o WebSocket e espera a mensagem de boas-vindas"""
+        ws = await self._http.ws_connect(url)
+        msg = await ws.receive_json(timeout=WELCOME_TIMEOUT)
+        if msg["metadata"]["message_type"] != "session_welcome":
+            await ws.close()
+            raise RuntimeError(f"Mensagem inesperada do EventSub: {msg['metadata']['message_type']}")
+
+        session = msg["payload"]["session"]
+        self.session_id = session["id"]
+        self.connected = True
+        keepalive = session.get("keepalive_timeout_seconds") or 10
+        logger.info(f"✅ Sessão EventSub aberta: {self.session_id}")
+        return ws, keepalive
+
+    async def _subscribe_all(self):
+        active, failed = set(), set()
+        for sub_type, version, condition in subscription_specs(self.broadcaster_id):
+            try:
+                ok = await twitch_api.create_eventsub_subscription(
+                    sub_type, version, condition, self.session_id,
+                    url=self.subscriptions_url
+                )
+            except Exception as e:
+                logger.error(f"❌ Erro ao criar inscrição EventSub {sub_type}: {e}")
+                ok = False
+            (active if ok else failed).add(sub_type)
+
+        self.active, self.failed = active, failed
+        if failed:
+            logger.warning(f"⚠️  Inscrições EventSub recusadas, usando a Helix para: {', '.join(sorted(failed))}")
+
+    def _start_backfill(self, since: Optional[datetime]):
+        if "channel.follow" not in self.active:
+            return
+        if self._backfill_task and not self._backfill_task.done():
+            return
+        self._backfill_task = asyncio.create_task(self._backfill_follows(since))
+
+    async def _backfill_follows(self, since: Optional[datetime]):
+        """Repassa ao handler os follows feitos desde `since` (None = último follow gravado)"""
+        try:
+            if since is None:
+                async with AsyncSessionLocal() as session:
+                    since = (await session.execute(select(func.max(User.followed_at)))).scalar()
+
+            found = 0
+            cursor = None
+            for _ in range(BACKFILL_MAX_PAGES):
+                page = await twitch_api.get_followers(self.broadcaster_id, after=cursor)
+                reached = False
+                for follower in page.get("data", []):
+                    followed_at = parse_timestamp(follower.get("followed_at"))
+                    if since and followed_at and followed_at < since:
+                        reached = True
+                        break
+                    await self.handler("channel.follow", {
+                        "user_id": follower["user_id"],
+                        "user_login": follower["user_login"],
+                        "user_name": follower.get("user_name"),
+                        "followed_at": follower.get("followed_at"),
+                    })
+                    found += 1
+                cursor = (page.get("pagination") or {}).get("cursor")
+                if reached or not cursor:
+                    break
+
+            self.backfilled_follows += found
+            if found:
+                logger.info(f"🔁 {found} follows recuperados pela Helix")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Erro ao recuperar follows pela Helix: {e}")
+
+    async def _read(self, ws: aiohttp.ClientWebSocketResponse, keepalive: float):
+        """Lê mensagens até a conexão cair; trata session_reconnect sem perder eventos"""
+        while True:
+            # Sem mensagens por mais que o keepalive significa conexão morta
+            msg = await ws.receive(timeout=keepalive + 5)
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                raise ConnectionError(f"WebSocket fechado ({msg.type.name})")
+
+            data = msg.json()
+            message_type = data["metadata"]["message_type"]
+
+            if message_type == "notification":
+                await self._dispatch(data)
+            elif message_type == "session_reconnect":
+                ws = await self._migrate(ws, data["payload"]["session"]["reconnect_url"])
+            elif message_type == "revocation":
+                sub = data["payload"]["subscription"]
+                logger.warning(f"Inscrição EventSub revogada: {sub['type']} ({sub.get('status')})")
+
+    async def _migrate(self, old_ws, reconnect_url: str):
+        """Troca de conexão: a antiga continua entregando eventos até a nova receber o welcome"""
+        drain = asyncio.create_task(self._drain(old_ws))
+        try:
+            new_ws, _ = await self._connect(reconnect_url)
+        except Exception:
+            drain.cancel()
+            await old_ws.close()
+            raise
+
+        # Depois do welcome a Twitch fecha a conexão antiga; processa o que ainda chegar nela
+        try:
+            await asyncio.wait_for(drain, timeout=WELCOME_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        await old_ws.close()
+        self.reconnects += 1
+        return new_ws
+
+    async def _drain(self, ws):
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            data = msg.json()
+            if data["metadata"]["message_type"] == "notification":
+                await self._dispatch(data)
+
+    async def _dispatch(self, data: Dict[str, Any]):
+        message_id = data["metadata"]["message_id"]
+        if message_id in self._seen:
+            # A Twitch pode reenviar a mesma mensagem (ex: durante a troca de conexão)
+            self.duplicates_skipped += 1
+            return
+        self._seen[message_id] = None
+        if len(self._seen) > SEEN_MESSAGES_LIMIT:
+            self._seen.popitem(last=False)
+
+        self.events_received += 1
+        sub_type = data["payload"]["subscription"]["type"]
+        try:
+            await self.handler(sub_type, data["payload"]["event"])
+        except Exception as e:
+            logger.error(f"Erro ao processar evento {sub_type}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "session_id": self.session_id,
+            "subscriptions": sorted(self.active),
+            "failed_subscriptions": sorted(self.failed),
+            "reconnects": self.reconnects,
+            "events_received": self.events_received,
+            "duplicates_skipped": self.duplicates_skipped,
+            "backfilled_follows": self.backfilled_follows,
+            "last_gap_seconds": self.last_gap_seconds,
+        }
+
+
+class UserEventWriter:
+    """Acumula mudanças vindas do EventSub e grava em lotes na tabela users"""
+
+    def __init__(self, flush_interval: float = 2.0):
+        self.flush_interval = flush_interval
+        # twitch_id -> (login, display_name, campos a atualizar)
+        self._pending: Dict[str, Tuple[str, str, Dict[str, Any]]] = {}
+        self.raids: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def handle(self, sub_type: str, event: Dict[str, Any]):
+        """Handler de eventos para o EventSubClient"""
+        if sub_type == "channel.follow":
+            self._queue(event["user_id"], event["user_login"], event.get("user_name"), {
+                "followed_at": parse_timestamp(event.get("followed_at")) or datetime.utcnow()
+            })
+        elif sub_type == "channel.subscribe":
+            self._queue(event["user_id"], event["user_login"], event.get("user_name"), {
+                "is_subscriber": True,
+                "subscription_tier": event.get("tier", "1000"),
+                "subscribed_at": datetime.utcnow(),
+            })
+        elif sub_type == "channel.subscription.end":
+            self._queue(event["user_id"], event["user_login"], event.get("user_name"), {
+                "is_subscriber": False,
+                "subscription_tier": None,
+                "subscribed_at": None,
+            })
+        elif sub_type == "channel.raid":
+            logger.info(
+                f"🚨 Raid de {event.get('from_broadcaster_user_name')} com {event.get('viewers', 0)} viewers"
+            )
+            self.raids.append({
+                "from": event.get("from_broadcaster_user_login"),
+                "viewers": event.get("viewers", 0),
+                "at": datetime.utcnow(),
+            })
+            self.raids = self.raids[-50:]
+
+    def _queue(self, twitch_id: str, login: str, display_name: Optional[str], fields: Dict[str, Any]):
+        existing = self._pending.get(twitch_id)
+        if existing:
+            merged = dict(existing[2])
+            # Uma renovação de sub não deve apagar a data da primeira inscrição
+            if "subscribed_at" in merged and merged["subscribed_at"] and fields.get("subscribed_at"):
+                fields = {**fields, "subscribed_at": merged["subscribed_at"]}
+            merged.update(fields)
+            fields = merged
+        self._pending[twitch_id] = (login, display_name or login, fields)
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Grava as mudanças pendentes em uma única transação"""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(select(User).where(User.twitch_id.in_(list(batch))))
+                users = {u.twitch_id: u for u in result.scalars().all()}
+
+                for twitch_id, (login, display_name, fields) in batch.items():
+                    user = users.get(twitch_id)
+                    if user is None:
+                        user = User(
+                            twitch_id=twitch_id,
+                            username=login,
+                            display_name=display_name,
+                            role=UserRole.VIEWER,
+                            message_count=0
+                        )
+                        session.add(user)
+                    elif fields.get("subscribed_at") and user.is_subscriber and user.subscribed_at:
+                        # Renovação: mantém a data original da inscrição
+                        fields = {**fields, "subscribed_at": user.subscribed_at}
+
+                    for field, value in fields.items():
+                        setattr(user, field, value)
+
+                    if fields.get("is_subscriber") and user.role == UserRole.VIEWER:
+                        user.role = UserRole.SUBSCRIBER
+                    elif fields.get("is_subscriber") is False and user.role == UserRole.SUBSCRIBER:
+                        user.role = UserRole.VIEWER
+
+                await session.commit()
+        except Exception as e:
+            for twitch_id, item in batch.items():
+                self._pending.setdefault(twitch_id, item)
+            logger.error(f"Erro ao gravar eventos do EventSub: {e}")
+            return 0
+
+        invalidation.bump("users")
+        return len(batch)
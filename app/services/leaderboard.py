@@ -0,0 +1,206 @@
+"""
+Rankings de chatters mantidos em memória
+Uma skip list indexável guarda os usuários ordenados por contador: inserir, remover e
+consultar a posição custam O(log n), e o top-k custa O(k).
+"""
+import random
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+MAX_LEVEL = 24
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        # Distância (em posições) até o próximo nó em cada nível
+        self.width: List[int] = [1] * level
+
+
+class RankedSkipList:
+    """Skip list indexável (ordem crescente de chave)"""
+
+    def __init__(self):
+        self._head = _Node(None, MAX_LEVEL)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _random_level() -> int:
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def _find_predecessors(self, key):
+        update = [self._head] * MAX_LEVEL
+        positions = [0] * MAX_LEVEL
+        node, pos = self._head, 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            positions[level] = pos
+        return update, positions, pos
+
+    def insert(self, key):
+        update, positions, pos = self._find_predecessors(key)
+        level = self._random_level()
+        new = _Node(key, level)
+
+        for lvl in range(MAX_LEVEL):
+            prev = update[lvl]
+            if lvl < level:
+                new.next[lvl] = prev.next[lvl]
+                prev.next[lvl] = new
+                new.width[lvl] = prev.width[lvl] - (pos - positions[lvl])
+                prev.width[lvl] = pos - positions[lvl] + 1
+            else:
+                prev.width[lvl] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        update, _, _ = self._find_predecessors(key)
+        target = update[0].next[0]
+        if target is None or target.key != key:
+            return False
+
+        for lvl in range(MAX_LEVEL):
+            prev = update[lvl]
+            if prev.next[lvl] is target:
+                prev.width[lvl] += target.width[lvl] - 1
+                prev.next[lvl] = target.next[lvl]
+            else:
+                prev.width[lvl] -= 1
+        self._size -= 1
+        return True
+
+    def rank(self, key) -> Optional[int]:
+        """Posição (começando em 1) da chave, ou None se ela não existir"""
+        node, pos = self._head, 0
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key <= key:
+                pos += node.width[level]
+                node = node.next[level]
+        return pos if node is not self._head and node.key == key else None
+
+    def first(self, k: int) -> List:
+        """As k menores chaves, em ordem"""
+        keys = []
+        node = self._head.next[0]
+        while node is not None and len(keys) < k:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class Leaderboard:
+    """Ranking de um contador (maior primeiro). Seguro para uso entre threads"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._scores: Dict[str, int] = {}
+        self._names: Dict[str, str] = {}
+        self._list = RankedSkipList()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._list)
+
+    def set(self, member: str, score: int, username: Optional[str] = None):
+        """Define o valor do contador de um usuário"""
+        with self._lock:
+            old = self._scores.get(member)
+            if old == score:
+                if username:
+                    self._names[member] = username
+                return
+            if old is not None:
+                self._list.remove((-old, member))
+            self._list.insert((-score, member))
+            self._scores[member] = score
+            if username:
+                self._names[member] = username
+
+    def remove(self, member: str):
+        with self._lock:
+            old = self._scores.pop(member, None)
+            if old is not None:
+                self._list.remove((-old, member))
+            self._names.pop(member, None)
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+            self._names.clear()
+            self._list = RankedSkipList()
+
+    def rank(self, member: str) -> Optional[Tuple[int, int]]:
+        """(posição, valor) do usuário, ou None se ele não estiver no ranking"""
+        with self._lock:
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            return self._list.rank((-score, member)), score
+
+    def top(self, k: int) -> List[Tuple[str, str, int]]:
+        """Os k primeiros como (twitch_id, username, valor)"""
+        with self._lock:
+            return [(member, self._names.get(member, member), -neg) for neg, member in self._list.first(k)]
+
+
+class LeaderboardService:
+    """Rankings de mensagens e comandos, reconstruídos do banco ao iniciar"""
+
+    def __init__(self):
+        self.messages = Leaderboard("messages")
+        self.commands = Leaderboard("commands")
+        self.loaded = False
+        self.version = 0   # Versão da tag "users" vista no último rebuild
+
+    def board(self, name: str) -> Leaderboard:
+        return self.commands if name == "commands" else self.messages
+
+    async def rebuild(self):
+        """Recarrega os rankings a partir da tabela users"""
+        version = invalidation.version("users")
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(User.twitch_id, User.username, User.message_count, User.command_count)
+            )
+            rows = result.all()
+
+        self.messages.clear()
+        self.commands.clear()
+        for twitch_id, username, message_count, command_count in rows:
+            self.messages.set(twitch_id, message_count or 0, username)
+            self.commands.set(twitch_id, command_count or 0, username)
+
+        self.loaded = True
+        self.version = version
+        logger.info(f"🏆 Rankings carregados com {len(rows)} usuários")
+
+    def record(self, twitch_id: str, username: str, message_count: int, command_count: int):
+        """Atualiza os rankings com os contadores atuais de um usuário"""
+        self.messages.set(twitch_id, message_count or 0, username)
+        self.commands.set(twitch_id, command_count or 0, username)
+
+    def remove(self, twitch_id: str):
+        self.messages.remove(twitch_id)
+        self.commands.remove(twitch_id)
+
+
+leaderboards = LeaderboardService()
@@ -0,0 +1,149 @@
+"""
+Feed ao vivo de atividade do chat
+O bot publica eventos (de sua própria thread) e a API os distribui para os clientes
+conectados via SSE ou WebSocket. Cada evento é serializado uma única vez; cada cliente
+tem um buffer limitado com política de descarte para não atrasar os demais.
+"""
+import asyncio
+import json
+import time
+import threading
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+DISCONNECT = "disconnect"
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, DISCONNECT)
+
+
+class LiveEvent:
+    """Evento já serializado: JSON para WebSocket e o quadro pronto para SSE"""
+    __slots__ = ("json", "sse")
+
+    def __init__(self, event_type: str, payload: str):
+        self.json = payload
+        self.sse = f"event: {event_type}\ndata: {payload}\n\n".encode()
+
+
+class Subscriber:
+    """Cliente conectado, com buffer limitado"""
+
+    def __init__(self, max_buffer: int = 256, policy: str = DROP_OLDEST):
+        self.max_buffer = max_buffer
+        self.policy = policy
+        self.buffer: Deque[LiveEvent] = deque()
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def offer(self, event: LiveEvent):
+        if self.closed:
+            return
+        if len(self.buffer) >= self.max_buffer:
+            if self.policy == DISCONNECT:
+                # Cliente lento demais: encerra em vez de acumular
+                self.closed = True
+                self._ready.set()
+                return
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                return
+            self.buffer.popleft()
+        self.buffer.append(event)
+        self._ready.set()
+
+    def close(self):
+        """Encerra o cliente e acorda quem espera em next_batch"""
+        self.closed = True
+        self._ready.set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[LiveEvent]:
+        """Espera e retorna todos os eventos acumulados (lista vazia em timeout)"""
+        if not self.buffer and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        batch = list(self.buffer)
+        self.buffer.clear()
+        return batch
+
+
+class LiveBroadcaster:
+    """Distribui eventos do bot para todos os clientes do feed"""
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop):
+        """Define o event loop da API, onde os clientes são atendidos"""
+        self._loop = loop
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, max_buffer: int = 256, policy: str = DROP_OLDEST) -> Subscriber:
+        subscriber = Subscriber(max_buffer, policy)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def serialize(self, event_type: str, data: Dict[str, Any]) -> str:
+        return json.dumps({"type": event_type, "ts": time.time(), "data": data}, ensure_ascii=False, default=str)
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Publica um evento. Pode ser chamado de qualquer thread"""
+        if not self._subscribers or self._loop is None:
+            return
+
+        event = LiveEvent(event_type, self.serialize(event_type, data))
+        self.published += 1
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self._fanout(event)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._fanout, event)
+            except RuntimeError:
+                # Loop da API já foi encerrado
+                pass
+
+    def _fanout(self, event: LiveEvent):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.offer(event)
+        self.delivered += len(subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": sum(s.dropped for s in subscribers),
+            "buffered": sum(len(s.buffer) for s in subscribers),
+        }
+
+
+live_feed = LiveBroadcaster()
@@ -0,0 +1,281 @@
+"""
+Tarefas periódicas de manutenção do banco
+- Arquiva usuários inativos em users_archive
+- Libera espaço com VACUUM incremental
+- Atualiza as estatísticas do planejador de consultas (ANALYZE)
+
+Tudo é feito em lotes curtos com pausas entre eles para não travar as escritas do bot.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import select, delete, func, text
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_engine
+from app.core import invalidation
+from app.models import User, UserArchive
+from app.services.leaderboard import leaderboards
+from app.services.shared_state import shared_state
+
+logger = logging.getLogger(__name__)
+
+VACUUM_PAGES_PER_STEP = 256
+BATCH_PAUSE_SECONDS = 0.1
+
+
+class MaintenanceScheduler:
+    """Agenda e executa as tarefas de manutenção"""
+
+    def __init__(self):
+        self.retention_days = settings.user_retention_days
+        self.interval_hours = settings.maintenance_interval_hours
+        self.batch_size = settings.maintenance_batch_size
+
+        self._task: Optional[asyncio.Task] = None
+        self._manual_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._status: Dict[str, Any] = {
+            "running": False,
+            "job": None,
+            "progress": None,
+            "last_started_at": None,
+            "last_finished_at": None,
+            "next_run_at": None,
+            "archived_users": 0,
+            "reclaimed_bytes": 0,
+            "database_bytes": None,
+            "last_error": None,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """Estado atual e resultado da última execução"""
+        return dict(self._status)
+
+    async def start(self):
+        """Inicia o agendamento periódico"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        for task in (self._task, self._manual_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._manual_task = None
+
+    async def _loop(self):
+        interval = timedelta(hours=self.interval_hours)
+        while True:
+            self._status["next_run_at"] = datetime.utcnow() + interval
+            await asyncio.sleep(interval.total_seconds())
+            # Com várias instâncias, só a líder arquiva e compacta o banco
+            if not shared_state.is_leader:
+                logger.info("🪑 Manutenção agendada ignorada: esta instância não é a líder")
+                continue
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Erro na manutenção do banco: {e}")
+
+    def is_running(self) -> bool:
+        return self._lock.locked() or (self._manual_task is not None and not self._manual_task.done())
+
+    def trigger(self) -> bool:
+        """Dispara uma execução em segundo plano. False se já houver uma em andamento"""
+        if self.is_running():
+            return False
+        self._manual_task = asyncio.create_task(self._run_manual())
+        return True
+
+    async def _run_manual(self):
+        try:
+            await self.run_once()
+        except Exception as e:
+            logger.error(f"Erro na manutenção do banco: {e}")
+
+    async def run_once(self):
+        """Executa todas as tarefas de manutenção uma vez"""
+        async with self._lock:
+            self._status.update({
+                "running": True,
+                "last_started_at": datetime.utcnow(),
+                "last_error": None,
+            })
+            try:
+                self._status["archived_users"] = await self.archive_inactive_users()
+                self._status["reclaimed_bytes"] = await self.vacuum()
+                await self.analyze()
+                self._status["database_bytes"] = await self._database_size()
+            except Exception as e:
+                self._status["last_error"] = str(e)
+                raise
+            finally:
+                self._status.update({
+                    "running": False,
+                    "job": None,
+                    "progress": None,
+                    "last_finished_at": datetime.utcnow(),
+                })
+
+    async def archive_inactive_users(self) -> int:
+        """Move usuários inativos há mais de N dias para users_archive, em lotes
+
+        O DELETE confere de novo a inatividade e devolve as linhas apagadas (RETURNING): quem
+        falou no chat entre a seleção e o DELETE fica, e o arquivo usa os valores do momento
+        em que a linha saiu. Tempo assistido e pontos ainda em memória no bot ficam guardados
+        por nome (ver PresenceTracker.flush e PointsBank.flush) e voltam quando o usuário retorna.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        self._status["job"] = "archive"
+
+        async with AsyncSessionLocal() as session:
+            total = await session.scalar(select(func.count(User.id)).where(User.last_seen < cutoff)) or 0
+
+        archived = 0
+        self._status["progress"] = {"done": 0, "total": total}
+
+        table = User.__table__
+        while True:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(table.c.id).where(table.c.last_seen < cutoff).limit(self.batch_size)
+                )
+                ids = result.scalars().all()
+                if not ids:
+                    break
+
+                result = await session.execute(
+                    delete(table)
+                    .where(table.c.id.in_(ids), table.c.last_seen < cutoff)
+                    .returning(*table.c)
+                )
+                users = result.all()
+                if not users:
+                    # Todos voltaram a ficar ativos no meio do caminho
+                    await session.commit()
+                    continue
+
+                existing = await session.execute(
+                    select(UserArchive).where(UserArchive.twitch_id.in_([u.twitch_id for u in users]))
+                )
+                archives = {a.twitch_id: a for a in existing.scalars().all()}
+
+                for user in users:
+                    archive = archives.get(user.twitch_id)
+                    if archive is None:
+                        archive = UserArchive(
+                            twitch_id=user.twitch_id,
+                            message_count=0,
+                            command_count=0,
+                            watch_hours=0,
+                            watch_seconds=0,
+                            points=0,
+                            first_seen=user.first_seen
+                        )
+                        session.add(archive)
+                    archive.username = user.username
+                    archive.display_name = user.display_name
+                    archive.message_count += user.message_count or 0
+                    archive.command_count += user.command_count or 0
+                    # Usuários anteriores a watch_seconds só têm as horas
+                    seconds = user.watch_seconds or (user.watch_hours or 0) * 3600
+                    archive.watch_seconds = (archive.watch_seconds or 0) + seconds
+                    archive.watch_hours = archive.watch_seconds // 3600
+                    archive.points = (archive.points or 0) + (user.points or 0)
+                    archive.last_seen = user.last_seen
+                    archive.followed_at = user.followed_at
+                    archive.subscribed_at = user.subscribed_at
+                    archive.subscription_tier = user.subscription_tier
+                    archive.archived_at = datetime.utcnow()
+
+                await session.commit()
+
+            for user in users:
+                leaderboards.remove(user.twitch_id)
+            invalidation.bump("users")
+
+            archived += len(users)
+            self._status["progress"] = {"done": archived, "total": total}
+            await asyncio.sleep(BATCH_PAUSE_SECONDS)
+
+        if archived:
+            logger.info(f"🗄️  {archived} usuários inativos arquivados")
+        return archived
+
+    async def vacuum(self) -> int:
+        """Libera páginas livres. Retorna quantos bytes foram recuperados"""
+        engine = get_engine()
+        self._status["job"] = "vacuum"
+
+        if engine.dialect.name == "postgresql":
+            # VACUUM no Postgres não bloqueia escritas, mas precisa rodar fora de transação
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("VACUUM users"))
+                await conn.execute(text("VACUUM users_archive"))
+            return 0
+
+        if engine.dialect.name != "sqlite":
+            return 0
+
+        async with engine.connect() as conn:
+            auto_vacuum = (await conn.execute(text("PRAGMA auto_vacuum"))).scalar()
+            page_size = (await conn.execute(text("PRAGMA page_size"))).scalar() or 0
+            free_before = (await conn.execute(text("PRAGMA freelist_count"))).scalar() or 0
+
+        if auto_vacuum != 2:
+            # Sem auto_vacuum=INCREMENTAL o SQLite só libera espaço com um VACUUM completo,
+            # que trava o banco inteiro; fica para uma janela de manutenção manual
+            logger.info("auto_vacuum não é INCREMENTAL; VACUUM incremental ignorado")
+            return 0
+
+        # Libera poucas páginas por vez, soltando o lock entre os passos
+        remaining = free_before
+        self._status["progress"] = {"done": 0, "total": free_before}
+        while remaining > 0:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})"))
+                left = (await conn.execute(text("PRAGMA freelist_count"))).scalar() or 0
+            if left >= remaining:
+                break
+            remaining = left
+            self._status["progress"] = {"done": free_before - remaining, "total": free_before}
+            await asyncio.sleep(BATCH_PAUSE_SECONDS)
+
+        return (free_before - remaining) * page_size
+
+    async def analyze(self):
+        """Atualiza as estatísticas usadas pelo planejador de consultas"""
+        engine = get_engine()
+        self._status["job"] = "analyze"
+
+        async with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("ANALYZE users"))
+                await conn.execute(text("ANALYZE users_archive"))
+            else:
+                await conn.execute(text("ANALYZE users"))
+                await conn.execute(text("ANALYZE users_archive"))
+                await conn.execute(text("PRAGMA optimize"))
+                await conn.commit()
+
+    async def _database_size(self) -> Optional[int]:
+        engine = get_engine()
+        async with engine.connect() as conn:
+            if engine.dialect.name == "sqlite":
+                page_count = (await conn.execute(text("PRAGMA page_count"))).scalar() or 0
+                page_size = (await conn.execute(text("PRAGMA page_size"))).scalar() or 0
+                return page_count * page_size
+            if engine.dialect.name == "postgresql":
+                return (await conn.execute(text("SELECT pg_database_size(current_database())"))).scalar()
+        return None
+
+
+maintenance = MaintenanceScheduler()
@@ -0,0 +1,320 @@
+"""
+Pontos de fidelidade do canal
+O saldo fica em cache por usuário (valor do banco + o que ainda não foi gravado) e toda
+movimentação vai para um extrato só de inserção. O acúmulo por minuto assistido e por mensagem
+é calculado de uma vez para todos os viewers presentes, e o banco recebe um UPDATE em lote e
+as linhas do extrato a cada flush, não uma escrita por crédito.
+
+Apostas e transferências checam e alteram o saldo sem nenhum await no meio: no event loop do
+bot isso basta para serem atômicas com comandos concorrentes. `load` deve ser chamado antes,
+para garantir que os saldos envolvidos estão em memória.
+
+Viewers que ainda não têm linha em users acumulam pontos só em memória; eles vão para o banco
+no primeiro flush depois da linha existir (ao falar no chat).
+"""
+import random
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, update, insert, bindparam
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import User, PointsLedger, LedgerReason
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_USERS = 20000
+MAX_UNKNOWN_VIEWERS = 20000    # Viewers sem linha em users com pontos guardados em memória
+MAX_MESSAGES_PER_ACCRUAL = 5   # Mensagens que rendem pontos por usuário em cada acúmulo (anti-spam)
+QUERY_CHUNK = 500
+
+
+class PointsError(Exception):
+    """Operação recusada; a mensagem é mostrada no chat"""
+
+
+def _chunks(items: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(items), QUERY_CHUNK):
+        yield items[start:start + QUERY_CHUNK]
+
+
+class PointsBank:
+    """Saldos em memória, acúmulo periódico e extrato gravado em lote"""
+
+    def __init__(self):
+        # username -> saldo atual (banco + pendente); só usuários que existem em users
+        self._balances: "OrderedDict[str, int]" = OrderedDict()
+        # username -> variação ainda não gravada em users.points
+        self._pending: Dict[str, int] = {}
+        # Acúmulos periódicos agregados por (username, motivo) até o próximo flush
+        self._accrued: Dict[Tuple[str, LedgerReason], int] = {}
+        # Lançamentos individuais (apostas e transferências)
+        self._entries: List[Dict] = []
+
+        self._messages: Dict[str, int] = {}
+        self._fractions: Dict[str, float] = {}
+        self._db_lock = asyncio.Lock()
+
+        self.accrued_points = 0
+        self.bets = 0
+        self.bets_won = 0
+        self.transfers = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.dropped_users = 0
+        self.held_users = 0
+        self.flush_errors = 0
+
+    def _apply(self, username: str, delta: int, reason: LedgerReason, counterpart: Optional[str] = None):
+        self._pending[username] = self._pending.get(username, 0) + delta
+        if username in self._balances:
+            self._balances[username] += delta
+
+        if reason in (LedgerReason.WATCH, LedgerReason.MESSAGE):
+            key = (username, reason)
+            self._accrued[key] = self._accrued.get(key, 0) + delta
+        else:
+            self._entries.append({
+                "username": username,
+                "delta": delta,
+                "reason": reason,
+                "counterpart": counterpart,
+                "created_at": datetime.utcnow(),
+            })
+
+    def record_message(self, username: str):
+        """Conta uma mensagem para o próximo acúmulo (O(1), chamado no caminho do chat)"""
+        username = username.lower()
+        self._messages[username] = self._messages.get(username, 0) + 1
+
+    def accrue(self, watched: List[Tuple[str, float]], per_minute: float, per_message: int) -> int:
+        """Credita os pontos de todos os viewers de uma vez. Retorna o total creditado"""
+        rate = per_minute / 60
+        fractions = self._fractions
+        totals = [fractions.get(name, 0.0) + seconds * rate for name, seconds in watched]
+
+        credited = 0
+        present = {}
+        for (name, _), total in zip(watched, totals):
+            whole = int(total)
+            present[name] = total - whole
+            if whole:
+                self._apply(name, whole, LedgerReason.WATCH)
+                credited += whole
+        # Frações de quem saiu são descartadas
+        self._fractions = present
+
+        messages, self._messages = self._messages, {}
+        if per_message:
+            for name, count in messages.items():
+                amount = min(count, MAX_MESSAGES_PER_ACCRUAL) * per_message
+                self._apply(name, amount, LedgerReason.MESSAGE)
+                credited += amount
+
+        self.accrued_points += credited
+        return credited
+
+    async def load(self, *usernames: str):
+        """Garante em memória o saldo dos usuários (quem não existe em users fica de fora)"""
+        names = {name.lower() for name in usernames}
+        missing = [name for name in names if name not in self._balances]
+        for name in names - set(missing):
+            self._balances.move_to_end(name)
+        self.cache_hits += len(names) - len(missing)
+        if not missing:
+            return
+
+        async with self._db_lock:
+            # Outro load pode ter trazido alguns enquanto esperávamos
+            missing = [name for name in missing if name not in self._balances]
+            if not missing:
+                return
+            self.cache_misses += len(missing)
+
+            table = User.__table__
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(table.c.username, table.c.points).where(table.c.username.in_(missing))
+                )
+                rows = result.all()
+
+            for username, stored in rows:
+                self._balances[username] = (stored or 0) + self._pending.get(username, 0)
+            while len(self._balances) > MAX_CACHED_USERS:
+                # Seguro: o pendente é guardado à parte e volta a ser somado no próximo load
+                self._balances.popitem(last=False)
+
+    def balance(self, username: str) -> Optional[int]:
+        """Saldo em memória (None se o usuário não foi carregado ou não existe)"""
+        return self._balances.get(username.lower())
+
+    def pending_for(self, username: str) -> int:
+        """Pontos ainda não gravados no banco"""
+        return self._pending.get(username.lower(), 0)
+
+    def bet(self, username: str, amount: int, min_bet: int) -> Tuple[bool, int]:
+        """Aposta dobro ou nada (50%). Retorna (ganhou, novo saldo)"""
+        username = username.lower()
+        balance = self._balances.get(username)
+        if balance is None:
+            raise PointsError("você ainda não tem pontos!")
+        if amount < min_bet:
+            raise PointsError(f"a aposta mínima é {min_bet} pontos!")
+        if amount > balance:
+            raise PointsError(f"você só tem {balance} pontos!")
+
+        won = random.random() < 0.5
+        self._apply(username, amount if won else -amount, LedgerReason.BET)
+        self.bets += 1
+        if won:
+            self.bets_won += 1
+        return won, self._balances[username]
+
+    def transfer(self, sender: str, receiver: str, amount: int) -> int:
+        """Transfere pontos entre usuários. Retorna o novo saldo de quem deu"""
+        sender, receiver = sender.lower(), receiver.lower()
+        if sender == receiver:
+            raise PointsError("você não pode dar pontos para si mesmo!")
+        if amount <= 0:
+            raise PointsError("a quantia precisa ser positiva!")
+        balance = self._balances.get(sender)
+        if balance is None or amount > balance:
+            raise PointsError(f"você só tem {balance or 0} pontos!")
+        if receiver not in self._balances:
+            raise PointsError(f"não encontrei {receiver}!")
+
+        self._apply(sender, -amount, LedgerReason.TRANSFER, counterpart=receiver)
+        self._apply(receiver, amount, LedgerReason.TRANSFER, counterpart=sender)
+        self.transfers += 1
+        return self._balances[sender]
+
+    async def flush(self) -> int:
+        """Grava os saldos pendentes (UPDATE em lote) e o extrato. Retorna quantos usuários mudaram"""
+        async with self._db_lock:
+            if not self._pending and not self._entries:
+                return 0
+
+            pending, self._pending = self._pending, {}
+            accrued, self._accrued = self._accrued, {}
+            entries, self._entries = self._entries, []
+
+            table = User.__table__
+            now = datetime.utcnow()
+            try:
+                async with AsyncSessionLocal() as session:
+                    existing = set()
+                    for chunk in _chunks(list(pending)):
+                        result = await session.execute(
+                            select(table.c.username).where(table.c.username.in_(chunk))
+                        )
+                        existing.update(result.scalars().all())
+
+                    updates = [
+                        {"b_username": name, "b_delta": delta}
+                        for name, delta in pending.items() if name in existing and delta
+                    ]
+                    rows = [
+                        {"username": name, "delta": delta, "reason": reason, "counterpart": None, "created_at": now}
+                        for (name, reason), delta in accrued.items() if name in existing and delta
+                    ]
+                    rows.extend(entry for entry in entries if entry["username"] in existing)
+
+                    if updates:
+                        await session.execute(
+                            update(table)
+                            .where(table.c.username == bindparam("b_username"))
+                            .values(
+                                points=table.c.points + bindparam("b_delta"),
+                                # Pontos não são atividade: sem isso o onupdate marcaria last_seen = agora
+                                last_seen=table.c.last_seen,
+                                updated_at=table.c.updated_at
+                            ),
+                            updates
+                        )
+                    if rows:
+                        await session.execute(insert(PointsLedger.__table__), rows)
+                    await session.commit()
+            except Exception as e:
+                # Devolve tudo para a próxima tentativa
+                for name, delta in pending.items():
+                    self._pending[name] = self._pending.get(name, 0) + delta
+                for key, delta in accrued.items():
+                    self._accrued[key] = self._accrued.get(key, 0) + delta
+                self._entries[:0] = entries
+                self.flush_errors += 1
+                logger.error(f"Erro ao gravar pontos: {e}")
+                return 0
+
+            # Viewers sem linha em users (nunca falaram no chat) ficam pendentes até ela existir
+            unknown = [name for name in pending if name not in existing]
+            room = max(0, MAX_UNKNOWN_VIEWERS - len(self._pending))
+            held, dropped = set(unknown[:room]), unknown[room:]
+            for name in held:
+                self._pending[name] = self._pending.get(name, 0) + pending[name]
+            for (name, reason), delta in accrued.items():
+                if name in held and delta:
+                    self._accrued[(name, reason)] = self._accrued.get((name, reason), 0) + delta
+            for name in dropped:
+                self._balances.pop(name, None)
+            self.held_users = len(held)
+            self.dropped_users += len(dropped)
+            if dropped:
+                logger.warning(f"Pontos de {len(dropped)} viewers sem cadastro descartados (limite atingido)")
+
+        if updates:
+            invalidation.bump("points")
+        return len(updates)
+
+    def clear(self):
+        """Esquece os saldos em memória (depois de um flush), ex.: ao perder a liderança"""
+        self._balances.clear()
+        self._messages.clear()
+        self._fractions.clear()
+
+    async def release(self, attempts: int = 5, delay: float = 2.0):
+        """Grava o pendente e esquece tudo, ao perder a liderança
+
+        A nova líder carrega os saldos do banco e pode gastá-los; um delta gravado depois disso
+        quebraria a atomicidade de apostas e transferências. Então tenta gravar algumas vezes e,
+        se não conseguir, descarta explicitamente o que ficou pendente.
+        """
+        for attempt in range(attempts):
+            errors = self.flush_errors
+            await self.flush()
+            if self.flush_errors == errors:
+                break
+            if attempt < attempts - 1:
+                await asyncio.sleep(delay)
+        else:
+            logger.error(
+                f"❌ Pontos não gravados descartados ao deixar a liderança "
+                f"({len(self._pending)} usuários, {len(self._entries)} lançamentos)"
+            )
+
+        # Depois de um flush bem-sucedido sobra só o de viewers sem cadastro: a nova líder recomeça
+        self._pending.clear()
+        self._accrued.clear()
+        self._entries.clear()
+        self.held_users = 0
+        self.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "cached_users": len(self._balances),
+            "pending_users": len(self._pending),
+            "pending_entries": len(self._accrued) + len(self._entries),
+            "accrued_points": self.accrued_points,
+            "bets": self.bets,
+            "bets_won": self.bets_won,
+            "transfers": self.transfers,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "dropped_users": self.dropped_users,
+            "held_users": self.held_users,
+            "flush_errors": self.flush_errors,
+        }
+
+
+points = PointsBank()
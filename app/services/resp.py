@@ -0,0 +1,240 @@
+"""
+Cliente mínimo do protocolo do Redis (RESP2) sobre asyncio streams
+Sem dependências: serve para Redis, Valkey, KeyDB ou o servidor falso de desenvolvimento
+(app.utils.fake_redis).
+
+Os comandos são pipelined: cada chamada enfileira os bytes e um future, e uma única tarefa lê as
+respostas na ordem. Tudo que foi enfileirado na mesma volta do event loop sai em uma única
+escrita, então chamadas concorrentes de várias corrotinas dividem a ida e volta ao servidor;
+`pipeline` garante que um grupo de comandos vá junto.
+
+Depois de uma falha ao conectar, os comandos falham na hora por `retry_after` segundos em vez
+de cada um esperar o timeout de conexão (o bot chama isso no caminho das mensagens do chat).
+"""
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Sequence
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class RespError(Exception):
+    """Resposta de erro do servidor (-ERR ...)"""
+
+
+class ServerUnavailable(ConnectionError):
+    """Conexão recusada sem tentar: a última tentativa falhou há menos de `retry_after` segundos"""
+
+
+def encode_command(args: Sequence[Any]) -> bytes:
+    """Codifica um comando como array de bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Lê uma resposta. Erros são devolvidos (não levantados) para não quebrar um pipeline"""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Conexão fechada pelo servidor")
+
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode("utf-8")
+    if kind == b"-":
+        return RespError(rest.decode("utf-8"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        size = int(rest)
+        if size < 0:
+            return None
+        data = await reader.readexactly(size + 2)
+        return data[:-2]
+    if kind == b"*":
+        size = int(rest)
+        if size < 0:
+            return None
+        return [await read_reply(reader) for _ in range(size)]
+    raise ConnectionError(f"Resposta RESP inválida: {line[:32]!r}")
+
+
+def parse_url(url: str):
+    """redis://[:senha@]host[:porta][/db] -> (host, porta, db, senha)"""
+    parsed = urlparse(url)
+    db = int(parsed.path.lstrip("/") or 0)
+    return parsed.hostname or "localhost", parsed.port or 6379, db, parsed.password
+
+
+class RespConnection:
+    """Uma conexão com pipelining implícito e reconexão no próximo uso após uma queda
+
+    Com `on_push`, a conexão fica em modo pub/sub: toda resposta vai para o callback e os
+    comandos são enviados com `send` (sem esperar resposta).
+    """
+
+    def __init__(self, url: str, on_push: Optional[Callable[[List[Any]], None]] = None,
+                 connect_timeout: float = 5.0, retry_after: float = 10.0):
+        self.host, self.port, self.db, self.password = parse_url(url)
+        self.on_push = on_push
+        self.connect_timeout = connect_timeout
+        self.retry_after = retry_after
+        self._down_until = 0.0
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Deque[asyncio.Future] = deque()
+        self._outbox: List[bytes] = []
+        self._flush_scheduled = False
+        self._read_task: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+        self.closed_event = asyncio.Event()
+
+        self.writes = 0
+        self.commands = 0
+        self.reconnects = 0
+        self.failed_connects = 0
+        self.fast_failures = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def available(self) -> bool:
+        """False enquanto o circuito está aberto (última conexão falhou há pouco)"""
+        return time.monotonic() >= self._down_until
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self.connected:
+                return
+            if not self.available:
+                self.fast_failures += 1
+                raise ServerUnavailable(f"{self.host}:{self.port} indisponível, nova tentativa em breve")
+            try:
+                await self._open()
+            except Exception:
+                self.failed_connects += 1
+                self._down_until = time.monotonic() + self.retry_after
+                raise
+            self._down_until = 0.0
+
+    async def _open(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.connect_timeout
+        )
+        self.closed_event.clear()
+        self._read_task = asyncio.create_task(self._read_loop())
+        self.reconnects += 1
+
+        # Handshake no mesmo pipeline, antes de qualquer outro comando
+        handshake = []
+        if self.password:
+            handshake.append(("AUTH", self.password))
+        if self.db:
+            handshake.append(("SELECT", self.db))
+        if handshake:
+            for reply in await self._pipeline(handshake):
+                if isinstance(reply, RespError):
+                    self._abort(reply)
+                    raise reply
+
+    async def execute(self, *args: Any) -> Any:
+        """Executa um comando e devolve a resposta (levanta RespError)"""
+        reply = (await self.pipeline([args]))[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """Executa vários comandos com uma única escrita. Erros vêm como RespError na lista"""
+        if not self.connected:
+            await self.connect()
+        return await self._pipeline(commands)
+
+    async def _pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        writer = self._writer
+        futures = [loop.create_future() for _ in commands]
+        # Sem await entre enfileirar futures e bytes: a ordem das respostas bate
+        self._pending.extend(futures)
+        self._outbox.extend(encode_command(command) for command in commands)
+        self.commands += len(commands)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        await writer.drain()
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self):
+        """Escreve de uma vez tudo o que foi enfileirado nesta volta do loop"""
+        self._flush_scheduled = False
+        if not self._outbox:
+            return
+        data, self._outbox = b"".join(self._outbox), []
+        if self._writer is None:
+            return  # Conexão caiu: os futures já foram falhados em _abort
+        self._writer.write(data)
+        self.writes += 1
+
+    async def send(self, *args: Any):
+        """Envia sem esperar resposta (modo pub/sub)"""
+        if not self.connected:
+            await self.connect()
+        writer = self._writer
+        writer.write(encode_command(args))
+        self.commands += 1
+        self.writes += 1
+        await writer.drain()
+
+    async def _read_loop(self):
+        error: Exception = ConnectionError("Conexão encerrada")
+        try:
+            while True:
+                reply = await read_reply(self._reader)
+                if self.on_push is not None:
+                    try:
+                        self.on_push(reply)
+                    except Exception as e:
+                        logger.error(f"Erro ao tratar mensagem do pub/sub: {e}")
+                    continue
+                if self._pending:
+                    future = self._pending.popleft()
+                    if not future.done():
+                        future.set_result(reply)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            self._abort(error)
+
+    def _abort(self, error: Exception):
+        """Falha os comandos pendentes e fecha; o próximo uso reconecta"""
+        self._outbox.clear()
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError(str(error)))
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        self.closed_event.set()
+
+    async def close(self):
+        if self._read_task:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except asyncio.CancelledError:
+                pass
+            self._read_task = None
+        self._abort(ConnectionError("Conexão encerrada"))
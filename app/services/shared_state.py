@@ -0,0 +1,525 @@
+"""
+Estado compartilhado entre instâncias do bot
+Permite rodar mais de uma instância (failover ou escala) sem respostas em dobro:
+
+- cooldowns distribuídos (SET NX PX: quem grava primeiro executa o comando)
+- eleição de líder por lease com renovação; só o líder responde no chat e roda os serviços
+  que escrevem no banco a partir de eventos (timers, EventSub, acompanhamento da live)
+- invalidação de cache: os bumps de app.core.invalidation são repassados por pub/sub
+
+Backends: "memory://" (padrão, uma instância só, sem rede) e "redis://host:porta/db" (qualquer
+servidor que fale o protocolo do Redis). Configure com SHARED_STATE_URL.
+"""
+import os
+import time
+import socket
+import asyncio
+import inspect
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core import invalidation
+from app.services.resp import RespConnection
+
+logger = logging.getLogger(__name__)
+
+MessageCallback = Callable[[str], None]
+ReadyCallback = Callable[[bool], None]
+
+# Adquire a lease se estiver livre ou renova se ela já for nossa (atômico no servidor)
+LEASE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current == false then
+  redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+  return 1
+end
+if current == ARGV[1] then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+  return 1
+end
+return 0
+"""
+
+# Solta a lease só se ela ainda for nossa
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SharedStateBackend(ABC):
+    """Interface dos backends de estado compartilhado"""
+    name = ""
+    distributed = False
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def acquire_all(self, keys: List[Tuple[str, int]], owner: str) -> bool:
+        """Grava todas as chaves (chave, ttl em ms) se nenhuma existir; tudo ou nada"""
+
+    @abstractmethod
+    async def acquire_lease(self, key: str, owner: str, ttl_ms: int) -> bool:
+        """Adquire ou renova uma lease; False se outro dono a detém"""
+
+    @abstractmethod
+    async def release_lease(self, key: str, owner: str):
+        """Solta a lease se ela ainda for de `owner`"""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str):
+        """Publica uma mensagem no canal"""
+
+    @abstractmethod
+    async def subscribe(self, channel: str, callback: MessageCallback, on_ready: Optional[ReadyCallback] = None):
+        """Assina um canal. `on_ready(primeira_vez)` é chamado a cada (re)inscrição"""
+
+    def stats(self) -> Dict:
+        return {"backend": self.name}
+
+
+class MemoryBackend(SharedStateBackend):
+    """Backend local: mesma semântica, sem rede (uma única instância)"""
+    name = "memory"
+    PURGE_EVERY = 1000
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[str, float]] = {}
+        self._subscribers: Dict[str, List[MessageCallback]] = {}
+        self._writes = 0
+
+    def _alive(self, key: str, now: float) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= now:
+            del self._data[key]
+            return None
+        return item[0]
+
+    def _purge(self, now: float):
+        for key in [key for key, (_, expires) in self._data.items() if expires <= now]:
+            del self._data[key]
+
+    async def acquire_all(self, keys: List[Tuple[str, int]], owner: str) -> bool:
+        now = time.monotonic()
+        if any(self._alive(key, now) is not None for key, _ in keys):
+            return False
+        for key, ttl_ms in keys:
+            self._data[key] = (owner, now + ttl_ms / 1000)
+
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._purge(now)
+        return True
+
+    async def acquire_lease(self, key: str, owner: str, ttl_ms: int) -> bool:
+        now = time.monotonic()
+        current = self._alive(key, now)
+        if current is not None and current != owner:
+            return False
+        self._data[key] = (owner, now + ttl_ms / 1000)
+        return True
+
+    async def release_lease(self, key: str, owner: str):
+        if self._alive(key, time.monotonic()) == owner:
+            del self._data[key]
+
+    async def publish(self, channel: str, message: str):
+        for callback in self._subscribers.get(channel, ()):
+            callback(message)
+
+    async def subscribe(self, channel: str, callback: MessageCallback, on_ready: Optional[ReadyCallback] = None):
+        self._subscribers.setdefault(channel, []).append(callback)
+        if on_ready:
+            on_ready(True)
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, "keys": len(self._data)}
+
+
+class RedisBackend(SharedStateBackend):
+    """Backend sobre o protocolo do Redis: uma conexão pipelined para comandos e outra para pub/sub"""
+    name = "redis"
+    distributed = True
+
+    def __init__(self, url: str):
+        self.url = url
+        self.conn = RespConnection(url)
+        self._callbacks: Dict[str, List[MessageCallback]] = {}
+        self._on_ready: List[ReadyCallback] = []
+        self._subscriber: Optional[RespConnection] = None
+        self._subscriber_task: Optional[asyncio.Task] = None
+        self._subscriptions = 0
+
+    async def start(self):
+        try:
+            await self.conn.connect()
+            logger.info(f"🔗 Estado compartilhado em {self.conn.host}:{self.conn.port}")
+        except Exception as e:
+            # A conexão é refeita no próximo comando; até lá esta instância não vira líder
+            logger.error(f"❌ Estado compartilhado indisponível ({self.conn.host}:{self.conn.port}): {e}")
+
+    async def close(self):
+        if self._subscriber_task:
+            self._subscriber_task.cancel()
+            try:
+                await self._subscriber_task
+            except asyncio.CancelledError:
+                pass
+            self._subscriber_task = None
+        await self.conn.close()
+
+    async def acquire_all(self, keys: List[Tuple[str, int]], owner: str) -> bool:
+        replies = await self.conn.pipeline([("SET", key, owner, "NX", "PX", ttl_ms) for key, ttl_ms in keys])
+        acquired = [key for (key, _), reply in zip(keys, replies) if reply == "OK"]
+        if len(acquired) == len(keys):
+            return True
+        # Alguma já existia: desfaz as que gravamos (só acontece quando há bloqueio)
+        if acquired:
+            await self.conn.execute("DEL", *acquired)
+        return False
+
+    async def acquire_lease(self, key: str, owner: str, ttl_ms: int) -> bool:
+        return await self.conn.execute("EVAL", LEASE_SCRIPT, 1, key, owner, ttl_ms) == 1
+
+    async def release_lease(self, key: str, owner: str):
+        await self.conn.execute("EVAL", RELEASE_SCRIPT, 1, key, owner)
+
+    async def publish(self, channel: str, message: str):
+        await self.conn.execute("PUBLISH", channel, message)
+
+    async def subscribe(self, channel: str, callback: MessageCallback, on_ready: Optional[ReadyCallback] = None):
+        is_new = channel not in self._callbacks
+        self._callbacks.setdefault(channel, []).append(callback)
+        if on_ready:
+            self._on_ready.append(on_ready)
+
+        if self._subscriber_task is None:
+            self._subscriber_task = asyncio.create_task(self._subscriber_loop())
+        elif is_new and self._subscriber is not None and self._subscriber.connected:
+            await self._subscriber.send("SUBSCRIBE", channel)
+
+    async def _subscriber_loop(self):
+        """Mantém a conexão de pub/sub, reassinando os canais a cada reconexão"""
+        delay = 1.0
+        first = True
+        while True:
+            conn = RespConnection(self.url, on_push=self._on_push)
+            try:
+                await conn.connect()
+                await conn.send("SUBSCRIBE", *self._callbacks)
+                self._subscriber = conn
+                self._subscriptions += 1
+                delay = 1.0
+                for on_ready in self._on_ready:
+                    on_ready(first)
+                first = False
+                await conn.closed_event.wait()
+                logger.warning("⚠️  Conexão de pub/sub do estado compartilhado caiu")
+            except asyncio.CancelledError:
+                await conn.close()
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️  Falha ao assinar canais do estado compartilhado: {e}")
+            finally:
+                self._subscriber = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _on_push(self, reply: Any):
+        if not isinstance(reply, list) or len(reply) != 3 or reply[0] != b"message":
+            return
+        channel, data = reply[1].decode("utf-8"), reply[2].decode("utf-8")
+        for callback in self._callbacks.get(channel, ()):
+            callback(data)
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "connected": self.conn.connected,
+            "writes": self.conn.writes,
+            "commands": self.conn.commands,
+            "connections": self.conn.reconnects,
+            "failed_connects": self.conn.failed_connects,
+            "fast_failures": self.conn.fast_failures,
+            "pubsub_connected": self._subscriber is not None and self._subscriber.connected,
+            "pubsub_subscriptions": self._subscriptions,
+        }
+
+
+def create_backend(url: str) -> SharedStateBackend:
+    """Instancia o backend pelo esquema da URL"""
+    if not url or url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith("redis://"):
+        return RedisBackend(url)
+    raise ValueError(f"Backend de estado compartilhado desconhecido: {url}")
+
+
+class LeaderElector:
+    """Eleição de líder por lease: adquire/renova a cada terço do TTL
+
+    A liderança local expira junto com a lease (se uma renovação atrasar, a instância deixa
+    de se considerar líder antes de outra poder assumir). As trocas são repassadas a
+    `on_change` uma de cada vez, na ordem em que aconteceram.
+    """
+
+    def __init__(self, backend: SharedStateBackend, key: str, node_id: str, lease_ms: int):
+        self.backend = backend
+        self.key = key
+        self.node_id = node_id
+        self.lease_ms = lease_ms
+        self.on_change: Optional[Callable[[bool], Any]] = None
+
+        self._leader = False
+        self._valid_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._transition_lock = asyncio.Lock()
+        self._transitions: Set[asyncio.Task] = set()
+        self.changes = 0
+        self.errors = 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader and time.monotonic() < self._valid_until
+
+    async def start(self):
+        # Primeira tentativa antes de retornar: sem concorrência, já sobe como líder
+        await self.attempt()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._leader:
+            try:
+                await self.backend.release_lease(self.key, self.node_id)
+            except Exception as e:
+                logger.warning(f"Erro ao soltar a liderança: {e}")
+            self._set(False)
+        if self._transitions:
+            await asyncio.wait(set(self._transitions))
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.lease_ms / 3000)
+            await self.attempt()
+
+    async def attempt(self):
+        started = time.monotonic()
+        try:
+            leader = await self.backend.acquire_lease(self.key, self.node_id, self.lease_ms)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️  Erro ao renovar a liderança: {e}")
+            leader = False
+        if leader:
+            self._valid_until = started + self.lease_ms / 1000
+        self._set(leader)
+
+    def _set(self, leader: bool):
+        if leader == self._leader:
+            return
+        self._leader = leader
+        self.changes += 1
+        if leader:
+            logger.warning(f"👑 Instância {self.node_id} assumiu a liderança")
+        else:
+            logger.warning(f"🪑 Instância {self.node_id} deixou a liderança")
+
+        if self.on_change:
+            task = asyncio.ensure_future(self._notify(leader))
+            self._transitions.add(task)
+            task.add_done_callback(self._transitions.discard)
+
+    async def _notify(self, leader: bool):
+        # O lock é FIFO: um stop nunca se intercala com o start anterior (ou o seguinte)
+        async with self._transition_lock:
+            try:
+                result = self.on_change(leader)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Erro ao tratar troca de liderança: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "is_leader": self.is_leader,
+            "lease_ms": self.lease_ms,
+            "changes": self.changes,
+            "errors": self.errors,
+        }
+
+
+class InvalidationBridge:
+    """Repassa os bumps locais de invalidação às outras instâncias e aplica os delas
+
+    Bumps podem vir de qualquer thread (API ou bot); são agrupados no loop do bot e publicados
+    em uma única mensagem por ciclo ("node|tag1,tag2").
+    """
+
+    def __init__(self, backend: SharedStateBackend, channel: str, node_id: str):
+        self.backend = backend
+        self.channel = channel
+        self.node_id = node_id
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queued: Set[str] = set()
+        self._scheduled = False
+        self.published = 0
+        self.received = 0
+        self.failed = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.backend.subscribe(self.channel, self._on_message, on_ready=self._on_ready)
+        invalidation.add_listener(self._on_local_bump)
+
+    def stop(self):
+        invalidation.remove_listener(self._on_local_bump)
+
+    def _on_local_bump(self, tag: str):
+        try:
+            self._loop.call_soon_threadsafe(self._queue, tag)
+        except RuntimeError:
+            # Loop do bot já encerrado
+            pass
+
+    def _queue(self, tag: str):
+        self._queued.add(tag)
+        if not self._scheduled:
+            self._scheduled = True
+            asyncio.ensure_future(self._publish())
+
+    async def _publish(self):
+        await asyncio.sleep(0)  # Junta os bumps do mesmo ciclo do loop
+        tags, self._queued = self._queued, set()
+        self._scheduled = False
+        try:
+            await self.backend.publish(self.channel, f"{self.node_id}|{','.join(sorted(tags))}")
+            self.published += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"⚠️  Erro ao publicar invalidação ({', '.join(sorted(tags))}): {e}")
+
+    def _on_message(self, data: str):
+        node_id, _, tags = data.partition("|")
+        if node_id == self.node_id:
+            return
+        self.received += 1
+        for tag in tags.split(","):
+            if tag:
+                invalidation.bump(tag, propagate=False)
+
+    def _on_ready(self, first: bool):
+        # Mensagens podem ter se perdido com o pub/sub fora: invalida tudo localmente
+        if not first:
+            for tag in invalidation.tags():
+                invalidation.bump(tag, propagate=False)
+
+    def stats(self) -> Dict:
+        return {"published": self.published, "received": self.received, "failed": self.failed}
+
+
+class SharedState:
+    """Ponto de acesso ao estado compartilhado (backend, liderança e invalidação)"""
+
+    def __init__(self):
+        self.backend: SharedStateBackend = MemoryBackend()
+        self.node_id = ""
+        self.elector: Optional[LeaderElector] = None
+        self.bridge: Optional[InvalidationBridge] = None
+        self.cooldown_allowed = 0
+        self.cooldown_blocked = 0
+        self.cooldown_errors = 0
+
+    @property
+    def started(self) -> bool:
+        return self.elector is not None
+
+    @property
+    def is_leader(self) -> bool:
+        """Sem start (scripts, testes) a instância se considera líder"""
+        return self.elector is None or self.elector.is_leader
+
+    def key(self, name: str) -> str:
+        return f"{settings.shared_state_prefix}{name}"
+
+    async def start(self):
+        """Conecta ao backend, entra na eleição e liga a invalidação (idempotente)"""
+        if self.started:
+            return
+        self.node_id = settings.node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.backend = create_backend(settings.shared_state_url)
+        await self.backend.start()
+
+        if self.backend.distributed:
+            self.bridge = InvalidationBridge(self.backend, self.key("invalidation"), self.node_id)
+            await self.bridge.start()
+
+        self.elector = LeaderElector(self.backend, self.key("leader"), self.node_id, settings.leader_lease_ms)
+        await self.elector.start()
+        logger.info(f"🧭 Estado compartilhado: {self.backend.name} (instância {self.node_id})")
+
+    async def stop(self):
+        if self.elector:
+            await self.elector.stop()
+            self.elector = None
+        if self.bridge:
+            self.bridge.stop()
+            self.bridge = None
+        await self.backend.close()
+
+    async def acquire_cooldown(self, command_name: str, user_id: str, global_cd: int, user_cd: int) -> bool:
+        """Tenta iniciar os cooldowns global e do usuário; False se algum ainda está ativo"""
+        keys = []
+        if global_cd > 0:
+            keys.append((self.key(f"cd:g:{command_name}"), global_cd * 1000))
+        if user_cd > 0:
+            keys.append((self.key(f"cd:u:{user_id}:{command_name}"), user_cd * 1000))
+        if not keys:
+            self.cooldown_allowed += 1
+            return True
+
+        try:
+            allowed = await self.backend.acquire_all(keys, self.node_id)
+        except Exception as e:
+            # Sem o backend não dá para garantir resposta única: na dúvida, não executa
+            self.cooldown_errors += 1
+            logger.warning(f"⚠️  Erro ao verificar cooldown de {command_name}: {e}")
+            return False
+
+        if allowed:
+            self.cooldown_allowed += 1
+        else:
+            self.cooldown_blocked += 1
+        return allowed
+
+    def stats(self) -> Dict:
+        return {
+            "node_id": self.node_id,
+            **self.backend.stats(),
+            "leader": self.elector.stats() if self.elector else None,
+            "invalidation": self.bridge.stats() if self.bridge else None,
+            "cooldowns": {
+                "allowed": self.cooldown_allowed,
+                "blocked": self.cooldown_blocked,
+                "errors": self.cooldown_errors,
+            },
+        }
+
+
+shared_state = SharedState()
@@ -0,0 +1,296 @@
+"""
+Sessões de live
+Detecta início e fim da live (consulta à Helix em cache e, com EventSub, pelos eventos
+stream.online/stream.offline) e mantém os agregados da live atual em memória.
+O snapshot vai para a tabela stream_sessions periodicamente e é fechado no fim da live,
+então os relatórios por live não precisam reprocessar mensagens.
+"""
+import time
+import asyncio
+import threading
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core import invalidation
+from app.models import StreamSession
+from app.services.twitch_api import twitch_api
+from app.services.emote_stats import emote_stats
+from app.services.eventsub import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+OFFLINE_GRACE_POLLS = 2        # Consultas seguidas sem live antes de encerrar (quedas rápidas da Helix)
+CHECKPOINT_SECONDS = 300
+TOP_SIZE = 10
+
+
+@dataclass
+class LiveAggregates:
+    """Contadores da live atual"""
+    session_id: int
+    started_at: datetime
+    twitch_stream_id: Optional[str] = None
+    title: Optional[str] = None
+    game_name: Optional[str] = None
+    peak_viewers: int = 0
+    viewers: int = 0
+    messages: int = 0
+    commands: int = 0
+    new_chatters: int = 0
+    chatters: Dict[str, int] = field(default_factory=dict)
+    # Chatters únicos antes de um reinício do bot no meio da live (aproximado: quem voltar a
+    # falar conta de novo)
+    previous_unique: int = 0
+    # Emotes do snapshot retomado que não estão no top (os do top voltam para emote_stats)
+    previous_emotes: int = 0
+
+    @property
+    def unique_chatters(self) -> int:
+        return self.previous_unique + len(self.chatters)
+
+    def top_chatters(self, k: int = TOP_SIZE):
+        ranked = sorted(self.chatters.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [{"username": username, "messages": count} for username, count in ranked]
+
+
+class StreamTracker:
+    """Acompanha a live do canal e grava um snapshot por sessão"""
+
+    def __init__(self):
+        self.channel = ""
+        self.live: Optional[LiveAggregates] = None
+        self._stream: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._offline_polls = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._last_checkpoint = 0.0
+        # Os agregados são escritos no loop do bot e lidos pela API
+        self._counters_lock = threading.Lock()
+
+    @property
+    def is_live(self) -> bool:
+        return self.live is not None
+
+    async def start(self, channel: str):
+        """Inicia a consulta periódica (idempotente)"""
+        self.channel = channel
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.checkpoint()
+
+    async def release(self):
+        """Para de acompanhar e esquece a live em memória (outra instância retoma do snapshot)"""
+        await self.stop()
+        self.live = None
+        self._stream, self._fetched_at = None, 0.0
+        # Se esta instância voltar a liderar, retoma do snapshot e não destes contadores
+        emote_stats.reset_stream()
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.poll()
+                if self.live and time.monotonic() - self._last_checkpoint >= CHECKPOINT_SECONDS:
+                    await self.checkpoint()
+            except Exception as e:
+                logger.error(f"Erro ao acompanhar a live: {e}")
+            await asyncio.sleep(settings.stream_poll_interval)
+
+    async def get_stream(self, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Dados da live atual (None se offline), consultando a Helix só se o cache expirou"""
+        max_age = settings.stream_poll_interval if max_age is None else max_age
+        if time.monotonic() - self._fetched_at > max_age:
+            await self.poll()
+        return self._stream
+
+    async def poll(self):
+        """Consulta a Helix e aplica a transição online/offline"""
+        stream = await twitch_api.get_stream(self.channel)
+        self._stream, self._fetched_at = stream, time.monotonic()
+
+        if stream:
+            self._offline_polls = 0
+            await self._online(stream)
+            if self.live:
+                self.live.viewers = stream.get("viewer_count", 0)
+                self.live.peak_viewers = max(self.live.peak_viewers, self.live.viewers)
+                self.live.title = stream.get("title") or self.live.title
+                self.live.game_name = stream.get("game_name") or self.live.game_name
+        elif self.live:
+            self._offline_polls += 1
+            if self._offline_polls >= OFFLINE_GRACE_POLLS:
+                await self._offline()
+
+    async def handle_event(self, sub_type: str, event: Dict[str, Any]):
+        """Handler dos eventos stream.online / stream.offline do EventSub"""
+        if sub_type == "stream.online":
+            self._fetched_at = 0.0
+            await self._online({
+                "id": event.get("id"),
+                "started_at": event.get("started_at"),
+            })
+        elif sub_type == "stream.offline":
+            self._stream, self._fetched_at = None, time.monotonic()
+            await self._offline()
+
+    async def _online(self, stream: Dict[str, Any]):
+        async with self._lock:
+            stream_id = stream.get("id")
+            if self.live and (not stream_id or self.live.twitch_stream_id in (None, stream_id)):
+                if stream_id and not self.live.twitch_stream_id:
+                    self.live.twitch_stream_id = stream_id
+                return
+            if self.live:
+                # Outra live começou sem o fim da anterior ter sido visto
+                await self._close(self.live)
+
+            started_at = parse_timestamp(stream.get("started_at")) or datetime.utcnow()
+            async with AsyncSessionLocal() as session:
+                row = None
+                if stream_id:
+                    result = await session.execute(
+                        select(StreamSession).where(StreamSession.twitch_stream_id == stream_id)
+                    )
+                    row = result.scalar_one_or_none()
+
+                if row is None:
+                    row = StreamSession(
+                        twitch_stream_id=stream_id,
+                        title=stream.get("title"),
+                        game_name=stream.get("game_name"),
+                        started_at=started_at,
+                    )
+                    session.add(row)
+                    resumed = False
+                else:
+                    row.ended_at = None
+                    resumed = True
+                await session.commit()
+                await session.refresh(row)
+
+            self.live = LiveAggregates(
+                session_id=row.id,
+                started_at=row.started_at,
+                twitch_stream_id=stream_id,
+                title=row.title,
+                game_name=row.game_name,
+            )
+            if resumed:
+                # Bot reiniciado (ou troca de líder) no meio da live: continua do último snapshot.
+                # O top de chatters e de emotes volta para a memória; o resto vira deslocamento
+                self.live.peak_viewers = row.peak_viewers or 0
+                self.live.messages = row.message_count or 0
+                self.live.commands = row.command_count or 0
+                self.live.new_chatters = row.new_chatters or 0
+                self.live.chatters = {
+                    item["username"]: item["messages"] for item in row.top_chatters or ()
+                }
+                self.live.previous_unique = max(0, (row.unique_chatters or 0) - len(self.live.chatters))
+                seed = [(item["emote_id"], item.get("name"), item["count"]) for item in row.top_emotes or ()]
+                emote_stats.reset_stream(seed)
+                self.live.previous_emotes = max(0, (row.emote_count or 0) - sum(c for _, _, c in seed))
+                logger.info(f"📺 Live retomada (sessão {row.id})")
+            else:
+                emote_stats.reset_stream()
+                logger.info(f"📺 Live iniciada (sessão {row.id})")
+            self._last_checkpoint = time.monotonic()
+
+        invalidation.bump("streams")
+
+    async def _offline(self):
+        async with self._lock:
+            live, self.live = self.live, None
+            self._offline_polls = 0
+            if live:
+                await self._close(live)
+                logger.info(f"📴 Live encerrada (sessão {live.session_id}, {live.messages} mensagens)")
+        invalidation.bump("streams")
+
+    def record_message(self, username: str, is_command: bool):
+        """Conta uma mensagem na live atual (não faz nada com o canal offline)"""
+        live = self.live
+        if live is None:
+            return
+        username = username.lower()
+        with self._counters_lock:
+            live.messages += 1
+            if is_command:
+                live.commands += 1
+            live.chatters[username] = live.chatters.get(username, 0) + 1
+
+    def record_new_chatter(self):
+        if self.live is not None:
+            self.live.new_chatters += 1
+
+    def snapshot(self, live: LiveAggregates) -> Dict[str, Any]:
+        """Campos do snapshot da live para a tabela stream_sessions"""
+        top_emotes = emote_stats.top(TOP_SIZE)
+        with self._counters_lock:
+            top_chatters = live.top_chatters()
+            unique_chatters = live.unique_chatters
+        return {
+            "title": live.title,
+            "game_name": live.game_name,
+            "peak_viewers": live.peak_viewers,
+            "message_count": live.messages,
+            "command_count": live.commands,
+            "unique_chatters": unique_chatters,
+            "new_chatters": live.new_chatters,
+            "emote_count": live.previous_emotes + emote_stats.stream_total(),
+            "top_chatters": top_chatters,
+            "top_emotes": [{"emote_id": i, "name": n, "count": c} for i, n, c in top_emotes],
+        }
+
+    async def _write(self, live: LiveAggregates, ended_at: Optional[datetime] = None):
+        async with AsyncSessionLocal() as session:
+            row = await session.get(StreamSession, live.session_id)
+            if row is None:
+                return
+            for name, value in self.snapshot(live).items():
+                setattr(row, name, value)
+            if ended_at:
+                row.ended_at = ended_at
+            await session.commit()
+
+    async def _close(self, live: LiveAggregates):
+        await self._write(live, ended_at=datetime.utcnow())
+
+    async def checkpoint(self):
+        """Grava o snapshot parcial da live em andamento"""
+        live = self.live
+        if live is None:
+            return
+        await self._write(live)
+        self._last_checkpoint = time.monotonic()
+        invalidation.bump("streams")
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """Relatório da live em andamento, direto da memória"""
+        live = self.live
+        if live is None:
+            return None
+        return {
+            "id": live.session_id,
+            "started_at": live.started_at,
+            "duration_seconds": int((datetime.utcnow() - live.started_at).total_seconds()),
+            "viewers": live.viewers,
+            **self.snapshot(live),
+        }
+
+
+stream_tracker = StreamTracker()
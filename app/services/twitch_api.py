@@ -102,6 +102,13 @@ class TwitchAPIService:
         followers = data.get("data", [])
         return followers[0] if followers else None
 
+    async def get_followers(self, broadcaster_id: str, after: Optional[str] = None) -> Dict[str, Any]:
+        """Página de seguidores, do mais recente ao mais antigo (USA TOKEN DO STREAMER)"""
+        params = {"broadcaster_id": broadcaster_id, "first": 100}
+        if after:
+            params["after"] = after
+        return await self._make_request("channels/followers", params=params, use_streamer_token=True)
+
     async def get_subscriber_info(self, broadcaster_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Verifica se usuário é subscriber (USA TOKEN DO STREAMER)"""
         try:
@@ -139,6 +146,66 @@ class TwitchAPIService:
                     logger.error(f"❌ Erro ao atualizar canal: {response.status} - {text}")
                     return False
 
+    async def create_eventsub_subscription(
+        self,
+        sub_type: str,
+        version: str,
+        condition: Dict[str, str],
+        session_id: str,
+        url: Optional[str] = None
+    ) -> bool:
+        """Cria uma inscrição EventSub via WebSocket (USA TOKEN DO STREAMER)"""
+        token = settings.twitch_streamer_token.replace("oauth:", "")
+
+        headers = {
+            "Client-ID": self.client_id,
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        body = {
+            "type": sub_type,
+            "version": version,
+            "condition": condition,
+            "transport": {"method": "websocket", "session_id": session_id}
+        }
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(url or f"{self.BASE_URL}/eventsub/subscriptions", headers=headers, json=body) as response:
+                if response.status in (200, 202):
+                    return True
+                text = await response.text()
+                logger.error(f"❌ Erro ao criar inscrição EventSub {sub_type}: {response.status} - {text}")
+                return False
+
+    async def _moderation_request(self, method: str, endpoint: str, params: Dict, json_body: Optional[Dict] = None) -> bool:
+        """Requisição de moderação (USA TOKEN DO STREAMER, que é moderador do próprio canal)"""
+        token = settings.twitch_streamer_token.replace("oauth:", "")
+
+        headers = {
+            "Client-ID": self.client_id,
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, f"{self.BASE_URL}/{endpoint}", headers=headers, params=params, json=json_body) as response:
+                if response.status in (200, 204):
+                    return True
+                text = await response.text()
+                logger.error(f"❌ Erro de moderação ({endpoint}): {response.status} - {text}")
+                return False
+
+    async def delete_chat_message(self, broadcaster_id: str, moderator_id: str, message_id: str) -> bool:
+        """Apaga uma mensagem do chat (USA TOKEN DO STREAMER)"""
+        params = {"broadcaster_id": broadcaster_id, "moderator_id": moderator_id, "message_id": message_id}
+        return await self._moderation_request("DELETE", "moderation/chat", params)
+
+    async def timeout_user(self, broadcaster_id: str, moderator_id: str, user_id: str, duration: int, reason: str = "") -> bool:
+        """Aplica timeout em um usuário (USA TOKEN DO STREAMER)"""
+        params = {"broadcaster_id": broadcaster_id, "moderator_id": moderator_id}
+        body = {"data": {"user_id": user_id, "duration": duration, "reason": reason}}
+        return await self._moderation_request("POST", "moderation/bans", params, body)
+
     async def search_categories(self, query: str) -> List[Dict[str, Any]]:
         """Busca categorias/jogos pelo nome (usa app token)"""
         data = await self._make_request("search/categories", params={"query": query}, use_streamer_token=True)
@@ -0,0 +1,106 @@
+"""
+Benchmark do feed ao vivo
+Modo local (padrão): mede o fan-out do LiveBroadcaster com centenas de clientes em memória,
+incluindo uma fração de clientes lentos.
+Modo HTTP: abre centenas de conexões SSE contra a API rodando e mede eventos recebidos.
+
+Execute:
+    python -m app.utils.bench_live --clients 500 --events 2000
+    python -m app.utils.bench_live --url http://localhost:8000/live/events --clients 300 --seconds 30
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from app.services.live_feed import live_feed, DROP_OLDEST
+
+
+async def bench_local(clients: int, events: int, slow_ratio: float, buffer: int):
+    """Fan-out em memória: um publicador e N consumidores"""
+    live_feed.attach_loop(asyncio.get_running_loop())
+    subscribers = [live_feed.subscribe(buffer, DROP_OLDEST) for _ in range(clients)]
+    slow = set(range(int(clients * slow_ratio)))
+    latencies = []
+    received = [0] * clients
+    done = asyncio.Event()
+
+    async def consume(index: int):
+        subscriber = subscribers[index]
+        while not done.is_set():
+            batch = await subscriber.next_batch(timeout=0.5)
+            now = time.perf_counter()
+            for event in batch:
+                received[index] += 1
+                if index % 50 == 0:
+                    latencies.append(now - json.loads(event.json)["data"]["sent"])
+            if index in slow:
+                await asyncio.sleep(0.05)
+
+    tasks = [asyncio.create_task(consume(i)) for i in range(clients)]
+
+    start = time.perf_counter()
+    for i in range(events):
+        live_feed.publish("chat", {"user": f"user{i % 100}", "content": "Kappa " * 5, "sent": time.perf_counter()})
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    publish_time = time.perf_counter() - start
+
+    await asyncio.sleep(1)
+    done.set()
+    await asyncio.gather(*tasks)
+    for subscriber in subscribers:
+        live_feed.unsubscribe(subscriber)
+
+    dropped = sum(s.dropped for s in subscribers)
+    print(f"Clientes: {clients} ({len(slow)} lentos) | eventos: {events} | buffer: {buffer}")
+    print(f"Publicação: {events / publish_time:,.0f} eventos/s ({publish_time * 1000:.1f} ms)")
+    print(f"Entregas: {sum(received):,} | descartadas: {dropped:,}")
+    if latencies:
+        latencies.sort()
+        print(
+            f"Latência de entrega: p50={statistics.median(latencies) * 1000:.2f} ms "
+            f"p95={latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms"
+        )
+
+
+async def bench_http(url: str, clients: int, seconds: float):
+    """Abre N conexões SSE e conta os eventos recebidos"""
+    import aiohttp
+
+    counts = [0] * clients
+
+    async def client(index: int, session: aiohttp.ClientSession):
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=None)) as response:
+            async for line in response.content:
+                if line.startswith(b"data:"):
+                    counts[index] += 1
+
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [asyncio.create_task(client(i, session)) for i in range(clients)]
+        await asyncio.sleep(seconds)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    total = sum(counts)
+    print(f"Clientes: {clients} | duração: {seconds}s")
+    print(f"Eventos recebidos: {total:,} ({total / seconds:,.0f}/s no total)")
+    print(f"Por cliente: min={min(counts)} max={max(counts)} média={total / clients:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do feed ao vivo")
+    parser.add_argument("--url")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--slow-ratio", type=float, default=0.1)
+    parser.add_argument("--buffer", type=int, default=256)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(bench_http(args.url, args.clients, args.seconds))
+    else:
+        asyncio.run(bench_local(args.clients, args.events, args.slow_ratio, args.buffer))
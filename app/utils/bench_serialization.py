@@ -0,0 +1,89 @@
+"""
+Benchmark das rotas de listagem /users/ e /commands/
+Compara o caminho antigo (select do model + Pydantic from_attributes + encoder padrão do
+FastAPI) com o caminho rápido (select de colunas + dicts + orjson), usando um SQLite temporário.
+
+Execute: python -m app.utils.bench_serialization [--rows 100] [--rounds 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.database import Base
+from app.models import User, Command, CommandType, UserRole
+from app.api.routes.users import UserResponse, USER_FIELDS, USER_COLUMNS
+from app.api.routes.commands import CommandResponse, COMMAND_FIELDS, COMMAND_COLUMNS
+from app.api.serialization import dumps, rows_to_dicts, orjson
+
+
+async def seed(session: AsyncSession, rows: int):
+    now = datetime.utcnow()
+    for i in range(rows):
+        session.add(User(
+            twitch_id=str(1000 + i), username=f"user{i}", display_name=f"User{i}",
+            role=UserRole.VIEWER, message_count=i * 3, command_count=i, watch_hours=i // 10,
+            first_seen=now - timedelta(days=i), last_seen=now - timedelta(minutes=i)
+        ))
+        session.add(Command(
+            name=f"cmd{i}", response=f"Resposta do comando {i}", command_type=CommandType.CUSTOM,
+            min_role=UserRole.VIEWER, usage_count=i, description=f"Comando {i}"
+        ))
+    await session.commit()
+
+
+async def timed(label: str, rounds: int, fn) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await fn()
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+    print(f"  {label:<8} {elapsed:8.3f} ms/req")
+    return elapsed
+
+
+async def main(rows: int, rounds: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as session:
+        await seed(session, rows)
+
+    print(f"Encoder rápido: {'orjson' if orjson else 'json (orjson não instalado)'} | {rows} linhas | {rounds} rodadas")
+
+    for name, model, response, fields, columns, order in [
+        ("/users/", User, UserResponse, USER_FIELDS, USER_COLUMNS, User.last_seen.desc()),
+        ("/commands/", Command, CommandResponse, COMMAND_FIELDS, COMMAND_COLUMNS, Command.name),
+    ]:
+        async def legacy():
+            async with Session() as session:
+                result = await session.execute(select(model).order_by(order).limit(rows))
+                items = [response.model_validate(obj) for obj in result.scalars().all()]
+                json.dumps(jsonable_encoder(items)).encode()
+
+        async def fast():
+            async with Session() as session:
+                result = await session.execute(select(*columns).order_by(order).limit(rows))
+                dumps(rows_to_dicts(fields, result.all()))
+
+        print(name)
+        before = await timed("antigo", rounds, legacy)
+        after = await timed("rápido", rounds, fast)
+        print(f"  ganho    {before / after:8.2f}x")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialização das rotas de listagem")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.rounds))
@@ -0,0 +1,148 @@
+"""
+Servidor EventSub falso para desenvolvimento e testes locais
+Simula o WebSocket e o endpoint de inscrições da Twitch, e permite disparar eventos na mão.
+
+Execute: python -m app.utils.fake_eventsub [--port 8081]
+Depois configure no .env:
+    EVENTSUB_WS_URL=ws://localhost:8081/ws
+    EVENTSUB_SUBSCRIPTIONS_URL=http://localhost:8081/eventsub/subscriptions
+
+Simular um token sem escopo (a inscrição é recusada com 403):
+    python -m app.utils.fake_eventsub --reject channel.follow channel.subscribe
+
+Disparar eventos:
+    curl -X POST localhost:8081/trigger/channel.follow -d '{"user_id": "1", "user_login": "fulano"}'
+    curl -X POST localhost:8081/reconnect
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from aiohttp import web
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _message(message_type: str, payload: Dict[str, Any], sub_type: Optional[str] = None) -> Dict[str, Any]:
+    metadata = {
+        "message_id": str(uuid.uuid4()),
+        "message_type": message_type,
+        "message_timestamp": _now(),
+    }
+    if sub_type:
+        metadata["subscription_type"] = sub_type
+    return {"metadata": metadata, "payload": payload}
+
+
+class FakeEventSubServer:
+    """Estado do servidor falso: uma sessão ativa e as inscrições feitas nela"""
+
+    def __init__(self, keepalive: int = 10, reject: Iterable[str] = ()):
+        self.keepalive = keepalive
+        self.reject = set(reject)   # Tipos recusados como se faltasse escopo no token
+        self.sockets: List[web.WebSocketResponse] = []
+        self.subscriptions: List[Dict[str, Any]] = []
+        self.session_id: Optional[str] = None
+        self.sent: List[Dict[str, Any]] = []
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/ws", self.websocket)
+        app.router.add_post("/eventsub/subscriptions", self.create_subscription)
+        app.router.add_post("/trigger/{sub_type}", self.trigger)
+        app.router.add_post("/reconnect", self.reconnect)
+        return app
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        # Reconexões mantêm a sessão (e as inscrições); conexões novas começam do zero
+        if "reconnect" not in request.query or not self.session_id:
+            self.session_id = str(uuid.uuid4())
+            self.subscriptions = []
+
+        await ws.send_json(_message("session_welcome", {"session": {
+            "id": self.session_id,
+            "status": "connected",
+            "keepalive_timeout_seconds": self.keepalive,
+            "reconnect_url": None,
+            "connected_at": _now(),
+        }}))
+
+        old_sockets, self.sockets = self.sockets, [ws]
+        for old in old_sockets:
+            await old.close()
+
+        try:
+            while not ws.closed:
+                try:
+                    await ws.receive(timeout=self.keepalive / 2)
+                except asyncio.TimeoutError:
+                    await ws.send_json(_message("session_keepalive", {}))
+        finally:
+            if ws in self.sockets:
+                self.sockets.remove(ws)
+        return ws
+
+    async def create_subscription(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        session_id = body.get("transport", {}).get("session_id")
+        if session_id != self.session_id:
+            return web.json_response({"error": "Bad Request", "message": "session id inválido"}, status=400)
+        if body["type"] in self.reject:
+            return web.json_response(
+                {"error": "Forbidden", "status": 403, "message": "subscription missing proper authorization"},
+                status=403
+            )
+
+        subscription = {
+            "id": str(uuid.uuid4()),
+            "status": "enabled",
+            "type": body["type"],
+            "version": body["version"],
+            "condition": body["condition"],
+            "transport": body["transport"],
+            "created_at": _now(),
+        }
+        self.subscriptions.append(subscription)
+        return web.json_response({"data": [subscription]}, status=202)
+
+    async def trigger(self, request: web.Request) -> web.Response:
+        sub_type = request.match_info["sub_type"]
+        event = await request.json() if request.can_read_body else {}
+        subscription = next((s for s in self.subscriptions if s["type"] == sub_type), None)
+        if subscription is None:
+            return web.json_response({"error": f"Sem inscrição para {sub_type}"}, status=404)
+
+        message = _message("notification", {"subscription": subscription, "event": event}, sub_type)
+        for ws in list(self.sockets):
+            await ws.send_json(message)
+        self.sent.append(message)
+        return web.json_response({"message_id": message["metadata"]["message_id"]})
+
+    async def reconnect(self, request: web.Request) -> web.Response:
+        url = str(request.url.with_path("/ws").with_query({"reconnect": "1"})).replace("http", "ws", 1)
+        message = _message("session_reconnect", {"session": {
+            "id": self.session_id,
+            "status": "reconnecting",
+            "keepalive_timeout_seconds": None,
+            "reconnect_url": url,
+            "connected_at": _now(),
+        }})
+        for ws in list(self.sockets):
+            await ws.send_json(message)
+        return web.json_response({"reconnect_url": url})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor EventSub falso")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--reject", nargs="*", default=[], help="Tipos de inscrição recusados")
+    args = parser.parse_args()
+
+    print(f"🧪 EventSub falso em ws://localhost:{args.port}/ws")
+    web.run_app(FakeEventSubServer(reject=args.reject).app(), port=args.port)
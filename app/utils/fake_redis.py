@@ -0,0 +1,212 @@
+"""
+Servidor falso do protocolo do Redis para desenvolvimento e testes locais
+Implementa só o que o estado compartilhado usa: GET/SET (NX, XX, PX, EX), DEL, PEXPIRE, PTTL,
+PUBLISH/SUBSCRIBE e EVAL dos dois scripts de lease (reconhecidos pelo conteúdo).
+
+Execute: python -m app.utils.fake_redis [--port 6390]
+Depois rode duas instâncias do bot com:
+    SHARED_STATE_URL=redis://localhost:6390/0
+    NODE_ID=a   (e NODE_ID=b na outra)
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class SimpleString(str):
+    pass
+
+
+OK = SimpleString("OK")
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, SimpleString):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+    if isinstance(value, str):
+        value = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRedis:
+    """Chaves com expiração e canais de pub/sub, compartilhados por todas as conexões"""
+
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.commands = 0
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return item[0]
+
+    def _set(self, key: bytes, value: bytes, ttl_ms: Optional[int]):
+        expires = time.monotonic() + ttl_ms / 1000 if ttl_ms is not None else None
+        self.data[key] = (value, expires)
+
+    def cmd_ping(self, args: List[bytes]):
+        return SimpleString("PONG")
+
+    def cmd_auth(self, args: List[bytes]):
+        return OK
+
+    def cmd_select(self, args: List[bytes]):
+        return OK
+
+    def cmd_get(self, args: List[bytes]):
+        return self._get(args[0])
+
+    def cmd_set(self, args: List[bytes]):
+        key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+        ttl_ms = None
+        if b"PX" in options:
+            ttl_ms = int(args[2 + options.index(b"PX") + 1])
+        elif b"EX" in options:
+            ttl_ms = int(args[2 + options.index(b"EX") + 1]) * 1000
+        exists = self._get(key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return None
+        self._set(key, value, ttl_ms)
+        return OK
+
+    def cmd_del(self, args: List[bytes]):
+        removed = 0
+        for key in args:
+            if self._get(key) is not None:
+                del self.data[key]
+                removed += 1
+        return removed
+
+    def cmd_pexpire(self, args: List[bytes]):
+        value = self._get(args[0])
+        if value is None:
+            return 0
+        self._set(args[0], value, int(args[1]))
+        return 1
+
+    def cmd_pttl(self, args: List[bytes]):
+        if self._get(args[0]) is None:
+            return -2
+        expires = self.data[args[0]][1]
+        return -1 if expires is None else int((expires - time.monotonic()) * 1000)
+
+    def cmd_eval(self, args: List[bytes]):
+        script, numkeys = args[0], int(args[1])
+        keys, argv = args[2:2 + numkeys], args[2 + numkeys:]
+        current = self._get(keys[0])
+        if b"PEXPIRE" in script:
+            # Script de lease: adquire se livre, renova se for do mesmo dono
+            if current is None or current == argv[0]:
+                self._set(keys[0], argv[0], int(argv[1]))
+                return 1
+            return 0
+        if b"DEL" in script:
+            # Script de release: apaga se for do mesmo dono
+            if current == argv[0]:
+                del self.data[keys[0]]
+                return 1
+            return 0
+        return RuntimeError("script não suportado pelo servidor falso")
+
+    def cmd_publish(self, args: List[bytes]):
+        subscribers = self.channels.get(args[0], set())
+        message = _encode([b"message", args[0], args[1]])
+        for writer in list(subscribers):
+            if writer.is_closing():
+                subscribers.discard(writer)
+            else:
+                writer.write(message)
+        return len(subscribers)
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(size + 2))[:-2])
+        return args
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: Set[bytes] = set()
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                self.commands += 1
+                name = args[0].decode().lower()
+
+                if name in ("subscribe", "unsubscribe"):
+                    for channel in args[1:]:
+                        members = self.channels.setdefault(channel, set())
+                        if name == "subscribe":
+                            members.add(writer)
+                            subscribed.add(channel)
+                        else:
+                            members.discard(writer)
+                            subscribed.discard(channel)
+                        writer.write(_encode([name.encode(), channel, len(subscribed)]))
+                    await writer.drain()
+                    continue
+
+                handler = getattr(self, f"cmd_{name}", None)
+                if handler is None:
+                    reply: Any = RuntimeError(f"unknown command '{name}'")
+                else:
+                    try:
+                        reply = handler(args[1:])
+                    except (IndexError, ValueError) as e:
+                        reply = RuntimeError(f"argumentos inválidos: {e}")
+                writer.write(_encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+
+async def serve(host: str, port: int):
+    fake = FakeRedis()
+    server = await asyncio.start_server(fake.handle, host, port)
+    print(f"🧪 Redis falso em redis://{host}:{port}/0")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor falso do protocolo do Redis")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Script para aplicar migrações do banco de dados
+Pode rodar com o bot no ar: índices e preenchimentos são feitos sem locks longos
+Execute: python -m app.utils.migrate [--dry-run]
+"""
+import asyncio
+import sys
+from app.core.database import get_engine, init_db
+from app.core.migrations import MigrationRunner
+
+
+async def migrate(dry_run: bool = False):
+    """Aplica (ou apenas descreve) as migrações pendentes"""
+    runner = MigrationRunner(get_engine())
+
+    if dry_run:
+        plan = await runner.plan()
+        if not plan:
+            print("✅ Nenhuma migração pendente")
+            return
+        for migration in plan:
+            print(f"🔧 {migration['version']}: {migration['description']} (~{migration['estimated_seconds']}s)")
+            for step in migration["steps"]:
+                print(f"   - {step['operation']}")
+                print(f"     linhas: {step['rows']} | lock: {step['lock']} | ~{step['estimated_seconds']}s")
+        return
+
+    pending = [m.version for m in await runner.pending()]
+
+    # init_db cria as tabelas que faltam, aplica as migrações e atualiza a versão do schema
+    await init_db()
+
+    if pending:
+        print(f"\n✨ Migrações aplicadas: {', '.join(map(str, pending))}")
+    else:
+        print("✅ Nenhuma migração pendente")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate(dry_run="--dry-run" in sys.argv))
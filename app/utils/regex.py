@@ -0,0 +1,30 @@
+"""
+Validação de regex que serão combinadas em uma única expressão
+As regras de moderação viram `(?P<r1>...)|(?P<r2>...)`, então uma regex válida sozinha pode
+quebrar a combinação: flags globais fora do início, grupos nomeados repetidos e referências
+numéricas (que passam a apontar para o grupo de outra regra).
+"""
+import re
+from typing import Optional
+
+_ESCAPED_BACKSLASH = re.compile(r"\\\\")
+_GLOBAL_FLAGS = re.compile(r"(?<!\\)\(\?[aiLmsux]+\)")
+_NAMED_GROUP = re.compile(r"(?<!\\)\(\?P[<=]")
+_NUMBERED_BACKREF = re.compile(r"\\[1-9]")
+
+
+def combinable_pattern_error(pattern: str) -> Optional[str]:
+    """Motivo pelo qual a regex não pode entrar na expressão combinada (None se pode)"""
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        return f"regex inválida: {e}"
+
+    plain = _ESCAPED_BACKSLASH.sub("", pattern)
+    if _GLOBAL_FLAGS.search(plain):
+        return "flags globais como (?i) não são permitidas; use a forma com escopo, ex.: (?i:...)"
+    if _NAMED_GROUP.search(plain):
+        return "grupos nomeados (?P<nome>...) não são permitidos"
+    if _NUMBERED_BACKREF.search(plain):
+        return "referências numéricas como \\1 não são permitidas"
+    return None
@@ -67,6 +67,30 @@ async def seed_builtin_commands():
             "min_role": UserRole.VIEWER,
             "global_cooldown": 10,
             "user_cooldown": 20
+        },
+        {
+            "name": "rank",
+            "description": "Mostra sua posição no ranking do chat",
+            "command_type": CommandType.BUILTIN,
+            "min_role": UserRole.VIEWER,
+            "global_cooldown": 5,
+            "user_cooldown": 30
+        },
+        {
+            "name": "top",
+            "description": "Mostra quem mais conversa no chat",
+            "command_type": CommandType.BUILTIN,
+            "min_role": UserRole.VIEWER,
+            "global_cooldown": 15,
+            "user_cooldown": 30
+        },
+        {
+            "name": "topemotes",
+            "description": "Mostra os emotes mais usados na live",
+            "command_type": CommandType.BUILTIN,
+            "min_role": UserRole.VIEWER,
+            "global_cooldown": 15,
+            "user_cooldown": 30
         }
     ]
 
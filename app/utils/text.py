@@ -0,0 +1,17 @@
+"""
+Funções de normalização de texto do chat
+"""
+import unicodedata
+
+
+def strip_accents(text: str) -> str:
+    """Remove acentos (título -> titulo)"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize(text: str) -> str:
+    """Normaliza para comparação: sem acentos e sem diferenciar maiúsculas"""
+    if text.isascii():
+        return text.casefold()
+    return strip_accents(text).casefold()
@@ -2,6 +2,7 @@ import asyncio
 import uvicorn
 import logging
 import threading
+from app.core.startup import profiler
 from app.core.config import settings
 
 # Configura logging
@@ -10,6 +11,9 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+if profiler.enabled:
+    logging.getLogger("app.core.startup").setLevel(logging.INFO)
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,16 +22,28 @@ def run_bot():
 
     async def start_bot():
         """Função assíncrona para iniciar o bot"""
-        from app.bot.bot import TwitchBot
-        from app.bot.commands import register_commands
-
-        bot = TwitchBot()
-
-        # Registra os comandos
-        register_commands(bot)
-
-        # Inicia o bot
-        await bot.start()
+        with profiler.phase("bot.import"):
+            from app.bot.bot import TwitchBot
+            from app.bot.commands import register_commands
+            from app.bot.supervisor import BotSupervisor
+            from app.core import runtime
+            from app.services.shared_state import shared_state
+
+        def create_bot(warm=None):
+            """Cria o bot (reaproveitando o estado de uma conexão anterior) e registra os comandos"""
+            with profiler.phase("bot.init"):
+                bot = TwitchBot(warm)
+                register_commands(bot)
+            return bot
+
+        # Cooldowns, liderança e invalidação compartilhados com outras instâncias
+        with profiler.phase("bot.shared_state"):
+            await shared_state.start()
+
+        # Roda o bot sob o supervisor, que reconecta se a conexão cair
+        supervisor = BotSupervisor(create_bot)
+        runtime.set_supervisor(supervisor)
+        await supervisor.run()
 
     try:
         logger.info("🤖 Iniciando bot da Twitch...")
@@ -51,7 +67,8 @@ def run_api():
     """Executa a API FastAPI"""
     try:
         logger.info("🚀 Iniciando API FastAPI...")
-        from app.api.main import app
+        with profiler.phase("api.import"):
+            from app.api.main import app
 
         uvicorn.run(
             app,
@@ -76,6 +93,8 @@ def main():
     logger.info(f"📚 Docs: http://{settings.api_host}:{settings.api_port}/docs")
     logger.info("=" * 50)
 
+    profiler.expect("api", "bot")
+
     # Inicia o bot em uma thread separada
     bot_thread = threading.Thread(target=run_bot, name="TwitchBot", daemon=True)
     bot_thread.start()
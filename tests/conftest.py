@@ -0,0 +1,31 @@
+"""
+Configuração comum dos testes: credenciais falsas e um banco SQLite temporário
+(definidos antes de qualquer import de app.*, que lê as configurações no primeiro uso)
+"""
+import os
+import asyncio
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="twitch-bot-tests-")
+
+for name, value in {
+    "TWITCH_BOT_USERNAME": "bot_teste",
+    "TWITCH_BOT_TOKEN": "oauth:teste",
+    "TWITCH_CHANNEL": "canal_teste",
+    "TWITCH_STREAMER_TOKEN": "oauth:teste",
+    "TWITCH_CLIENT_ID": "teste",
+    "TWITCH_CLIENT_SECRET": "teste",
+    "SECRET_KEY": "teste",
+    "DATABASE_URL": f"sqlite+aiosqlite:///{_tmp}/test.db",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    """Espera até `condition()` ser verdadeira (falha o teste no timeout)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("condição não satisfeita a tempo")
+        await asyncio.sleep(0.01)
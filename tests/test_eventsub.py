@@ -0,0 +1,133 @@
+"""EventSubClient contra o servidor falso (app.utils.fake_eventsub)"""
+import asyncio
+import aiohttp
+from aiohttp import web
+from app.core.database import Base, get_engine
+from app.services.eventsub import EventSubClient, UserEventWriter
+from app.services.twitch_api import twitch_api
+from app.utils.fake_eventsub import FakeEventSubServer
+from conftest import wait_for
+
+BROADCASTER_ID = "1000"
+
+
+async def _with_client(scenario, reject=(), followers=()):
+    """Sobe o servidor falso, conecta um EventSubClient ligado a um UserEventWriter e roda o cenário"""
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    fake = FakeEventSubServer(reject=reject)
+    runner = web.AppRunner(fake.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    base = f"http://127.0.0.1:{port}"
+
+    async def get_followers(broadcaster_id, after=None):
+        return {"data": list(followers), "pagination": {}}
+
+    original = twitch_api.get_followers
+    twitch_api.get_followers = get_followers
+
+    writer = UserEventWriter()
+    client = EventSubClient(BROADCASTER_ID, writer.handle)
+    client.url = f"ws://127.0.0.1:{port}/ws"
+    client.subscriptions_url = f"{base}/eventsub/subscriptions"
+    try:
+        await client.start()
+        await wait_for(lambda: client.connected and len(client.active | client.failed) == 6)
+        async with aiohttp.ClientSession() as http:
+            async def trigger(sub_type, event):
+                async with http.post(f"{base}/trigger/{sub_type}", json=event) as response:
+                    return response.status, await response.json()
+
+            async def reconnect():
+                async with http.post(f"{base}/reconnect") as response:
+                    assert response.status == 200
+
+            await scenario(fake, client, writer, trigger, reconnect)
+        # Deixa a recuperação de follows terminar a consulta ao banco antes de fechar
+        if client._backfill_task:
+            await asyncio.wait({client._backfill_task}, timeout=5)
+    finally:
+        twitch_api.get_followers = original
+        await client.stop()
+        await runner.cleanup()
+        await get_engine().dispose()
+
+
+def test_follow_sub_and_raid_are_ingested():
+    async def scenario(fake, client, writer, trigger, reconnect):
+        assert client.is_active("channel.follow")
+        assert client.status()["failed_subscriptions"] == []
+
+        await trigger("channel.follow", {"user_id": "1", "user_login": "ana", "user_name": "Ana",
+                                         "followed_at": "2024-05-01T12:00:00.123456789Z"})
+        await trigger("channel.subscribe", {"user_id": "2", "user_login": "bia", "tier": "2000"})
+        await trigger("channel.raid", {"from_broadcaster_user_login": "caio",
+                                       "from_broadcaster_user_name": "Caio", "viewers": 42})
+        await wait_for(lambda: client.events_received == 3)
+
+        login, display_name, fields = writer._pending["1"]
+        assert (login, display_name) == ("ana", "Ana")
+        assert fields["followed_at"].isoformat() == "2024-05-01T12:00:00.123456"
+        assert writer._pending["2"][2]["subscription_tier"] == "2000"
+        assert writer._pending["2"][2]["is_subscriber"] is True
+        assert writer.raids[-1]["from"] == "caio" and writer.raids[-1]["viewers"] == 42
+
+    asyncio.run(_with_client(scenario))
+
+
+def test_session_reconnect_keeps_session_and_events():
+    async def scenario(fake, client, writer, trigger, reconnect):
+        session_id = client.session_id
+        await reconnect()
+        await wait_for(lambda: len(fake.sockets) == 1 and client.reconnects == 1)
+
+        await trigger("channel.follow", {"user_id": "3", "user_login": "duda"})
+        await wait_for(lambda: "3" in writer._pending)
+        assert client.session_id == session_id
+        assert client.connected
+
+    asyncio.run(_with_client(scenario))
+
+
+def test_duplicate_messages_are_skipped():
+    async def scenario(fake, client, writer, trigger, reconnect):
+        await trigger("channel.follow", {"user_id": "4", "user_login": "edu"})
+        await wait_for(lambda: client.events_received == 1)
+
+        # A Twitch pode reenviar a mesma mensagem (mesmo message_id)
+        for ws in fake.sockets:
+            await ws.send_json(fake.sent[-1])
+        await wait_for(lambda: client.duplicates_skipped == 1)
+        assert client.events_received == 1
+
+    asyncio.run(_with_client(scenario))
+
+
+def test_rejected_subscriptions_are_reported():
+    async def scenario(fake, client, writer, trigger, reconnect):
+        status = client.status()
+        assert status["failed_subscriptions"] == ["channel.follow", "channel.subscribe"]
+        assert not client.is_active("channel.follow")
+        assert client.is_active("channel.raid")
+        status, _ = await trigger("channel.follow", {"user_id": "5", "user_login": "fabi"})
+        assert status == 404
+
+    asyncio.run(_with_client(scenario, reject=("channel.follow", "channel.subscribe")))
+
+
+def test_follows_missed_before_the_session_are_backfilled():
+    followers = [
+        {"user_id": "6", "user_login": "gabi", "user_name": "Gabi", "followed_at": "2024-05-02T10:00:00Z"},
+        {"user_id": "7", "user_login": "hugo", "user_name": "Hugo", "followed_at": "2024-05-01T10:00:00Z"},
+    ]
+
+    async def scenario(fake, client, writer, trigger, reconnect):
+        await wait_for(lambda: client.backfilled_follows == 2)
+        assert writer._pending["6"][2]["followed_at"].isoformat() == "2024-05-02T10:00:00"
+        assert "7" in writer._pending
+
+    asyncio.run(_with_client(scenario, followers=followers))
@@ -0,0 +1,119 @@
+"""Backend Redis do estado compartilhado contra o servidor falso (app.utils.fake_redis)"""
+import time
+import asyncio
+import pytest
+from app.services.resp import RespConnection, ServerUnavailable
+from app.services.shared_state import LeaderElector, RedisBackend, SharedStateBackend
+from app.utils.fake_redis import FakeRedis
+from conftest import wait_for
+
+
+async def _with_server(scenario):
+    fake = FakeRedis()
+    server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        await scenario(fake, f"redis://127.0.0.1:{port}/0")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SharedStateBackend()
+
+
+def test_acquire_all_rolls_back_partial_sets():
+    async def scenario(fake, url):
+        backend = RedisBackend(url)
+        await backend.start()
+        try:
+            assert await backend.acquire_all([("cd:u:1:hug", 60000)], "a")
+            # A chave global é gravada, a do usuário já existe: tudo ou nada
+            assert not await backend.acquire_all([("cd:g:hug", 60000), ("cd:u:1:hug", 60000)], "b")
+            assert await backend.conn.execute("GET", "cd:g:hug") is None
+            assert await backend.conn.execute("GET", "cd:u:1:hug") == b"a"
+        finally:
+            await backend.close()
+
+    asyncio.run(_with_server(scenario))
+
+
+def test_concurrent_commands_share_one_write():
+    async def scenario(fake, url):
+        conn = RespConnection(url)
+        await conn.connect()
+        try:
+            writes = conn.writes
+            replies = await asyncio.gather(*(conn.execute("SET", f"k{i}", i) for i in range(50)))
+            assert replies == ["OK"] * 50
+            assert conn.writes - writes == 1
+
+            values = await conn.pipeline([("GET", "k0"), ("GET", "k49"), ("GET", "nada")])
+            assert values == [b"0", b"49", None]
+            assert conn.writes - writes == 2
+        finally:
+            await conn.close()
+
+    asyncio.run(_with_server(scenario))
+
+
+def test_pubsub_delivers_to_other_instances():
+    async def scenario(fake, url):
+        publisher, subscriber = RedisBackend(url), RedisBackend(url)
+        received, ready = [], []
+        await subscriber.subscribe("inv", received.append, on_ready=ready.append)
+        try:
+            await wait_for(lambda: ready == [True])
+            await publisher.publish("inv", "a|users,commands")
+            await wait_for(lambda: received == ["a|users,commands"])
+        finally:
+            await publisher.close()
+            await subscriber.close()
+
+    asyncio.run(_with_server(scenario))
+
+
+def test_lease_hands_over_when_the_leader_stops():
+    async def scenario(fake, url):
+        backend_a, backend_b = RedisBackend(url), RedisBackend(url)
+        a = LeaderElector(backend_a, "leader", "a", lease_ms=3000)
+        b = LeaderElector(backend_b, "leader", "b", lease_ms=3000)
+        try:
+            await a.attempt()
+            await b.attempt()
+            assert a.is_leader and not b.is_leader
+
+            await a.stop()
+            await b.attempt()
+            assert b.is_leader and not a.is_leader
+        finally:
+            await b.stop()
+            await backend_a.close()
+            await backend_b.close()
+
+    asyncio.run(_with_server(scenario))
+
+
+def test_failed_connect_fails_fast_until_retry_after():
+    async def scenario():
+        # Porta sem servidor: abre e fecha um listener para obter uma porta livre
+        server = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+
+        conn = RespConnection(f"redis://127.0.0.1:{port}/0", retry_after=30)
+        with pytest.raises(OSError):
+            await conn.execute("GET", "x")
+        assert conn.failed_connects == 1 and not conn.available
+
+        started = time.monotonic()
+        for _ in range(20):
+            with pytest.raises(ServerUnavailable):
+                await conn.execute("GET", "x")
+        assert time.monotonic() - started < 0.5
+        assert conn.failed_connects == 1 and conn.fast_failures == 20
+
+    asyncio.run(scenario())